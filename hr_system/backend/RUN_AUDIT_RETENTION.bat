@@ -0,0 +1,9 @@
+@echo off
+setlocal
+cd /d "%~dp0"
+
+REM Export closed audit months to audit_archive\ and drop them from the hot table
+echo [AUDIT] Running retention ...
+".\.venv\Scripts\python.exe" -m app.core.audit_retention run
+
+endlocal
@@ -1,11 +1,11 @@
-from fastapi import APIRouter, Request, Form
-from fastapi.responses import RedirectResponse
-from fastapi.templating import Jinja2Templates
+from fastapi import APIRouter, Depends, Request, Form, UploadFile, File
+from fastapi.responses import RedirectResponse, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
-from app.api.endpoints.auth import require_login
+from app.db.session import get_uow, get_read_db
+from app.core.templating import templates
+from app.core.current_user import CurrentUser, get_current_user, mark_user_changed
 from app.models.user import User
 
 # نفس فكرة bcrypt/passlib اللي عندك في المشروع
@@ -17,13 +17,10 @@ except Exception:
 
 import bcrypt
 
-router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
-
+from app.core.security import run_hashing
+from app.core.provisioning import parse_csv, provision_users, report_csv
 
-async def get_current_user(db: AsyncSession, user_id: int) -> User | None:
-    res = await db.execute(select(User).where(User.id == user_id))
-    return res.scalar_one_or_none()
+router = APIRouter()
 
 
 def _hash_pw(pw: str) -> str:
@@ -35,25 +32,22 @@ def _hash_pw(pw: str) -> str:
 
 
 @router.get("")
-async def users_page(request: Request):
-    if not require_login(request):
+async def users_page(
+    request: Request,
+    me: CurrentUser | None = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if not me:
         return RedirectResponse("/login", status_code=302)
+    if not me.is_admin:
+        return RedirectResponse("/?error=forbidden", status_code=302)
 
-    user_id = request.session.get("user_id")
-
-    async for db in get_db():
-        db: AsyncSession
-        me = await get_current_user(db, user_id)
-        if not (me and getattr(me, "is_admin", False)):
-            return RedirectResponse("/?error=forbidden", status_code=302)
+    users = (await db.execute(select(User).order_by(User.id.asc()))).scalars().all()
 
-
-        users = (await db.execute(select(User).order_by(User.id.asc()))).scalars().all()
-
-        return templates.TemplateResponse(
-            "users.html",
-            {"request": request, "users": users},
-        )
+    return templates.TemplateResponse(
+        "users.html",
+        {"request": request, "users": users},
+    )
 
 
 @router.post("/new")
@@ -62,11 +56,13 @@ async def create_user(
     username: str = Form(...),
     password: str = Form(...),
     is_admin: str = Form("0"),
+    me: CurrentUser | None = Depends(get_current_user),
+    db: AsyncSession = Depends(get_uow),
 ):
-    if not require_login(request):
+    if not me:
         return RedirectResponse("/login", status_code=302)
-
-    user_id = request.session.get("user_id")
+    if not me.is_admin:
+        return RedirectResponse("/?error=forbidden", status_code=302)
 
     username = (username or "").strip()
     password = (password or "").strip()
@@ -79,23 +75,51 @@ async def create_user(
     if len(password.encode("utf-8")) > 72:
         return RedirectResponse("/users?error=password_too_long", status_code=302)
 
-    async for db in get_db():
-        db: AsyncSession
-        me = await get_current_user(db, user_id)
-        if not (me and getattr(me, "is_admin", False)):
-            return RedirectResponse("/?error=forbidden", status_code=302)
+    exists = (await db.execute(select(User.id).where(User.username == username))).scalar_one_or_none()
+    if exists:
+        return RedirectResponse("/users?error=username_exists", status_code=302)
 
+    u = User(
+        username=username,
+        password_hash=await run_hashing(_hash_pw, password),
+        is_admin=flag_admin,
+    )
+    db.add(u)
+    await db.flush()
+    await mark_user_changed(db, u.id)
 
-        exists = (await db.execute(select(User.id).where(User.username == username))).scalar_one_or_none()
-        if exists:
-            return RedirectResponse("/users?error=username_exists", status_code=302)
+    return RedirectResponse("/users?success=1", status_code=302)
 
-        u = User(
-            username=username,
-            password_hash=_hash_pw(password),
-            is_admin=flag_admin,
-        )
-        db.add(u)
-        await db.commit()
 
-        return RedirectResponse("/users?success=1", status_code=302)
+@router.post("/bulk")
+async def bulk_create_users(
+    request: Request,
+    file: UploadFile = File(...),
+    me: CurrentUser | None = Depends(get_current_user),
+    db: AsyncSession = Depends(get_uow),
+):
+    if not me:
+        return RedirectResponse("/login", status_code=302)
+    if not me.is_admin:
+        return RedirectResponse("/?error=forbidden", status_code=302)
+
+    try:
+        data = (await file.read()).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return RedirectResponse("/users?error=bad_csv", status_code=302)
+
+    rows = parse_csv(data)
+    if not rows:
+        return RedirectResponse("/users?error=empty_csv", status_code=302)
+
+    await provision_users(db, rows)
+
+    # التقرير فيه الباسوردات المتولدة — بيتحمل مرة واحدة بس
+    return Response(
+        content=report_csv(rows),
+        media_type="text/csv",
+        headers={
+            "Content-Disposition": 'attachment; filename="users_report.csv"',
+            "Cache-Control": "no-store",
+        },
+    )
@@ -1,15 +1,19 @@
-from fastapi import APIRouter, Request, Form
+from fastapi import APIRouter, Depends, Request, Form
 from fastapi.responses import RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
+from app.core.templating import templates
 from app.models.user import User
-from app.core.security import verify_password
+from app.core.security import (
+    verify_password_async,
+    login_blocked,
+    record_login_failure,
+    reset_login_failures,
+)
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 def require_login(request: Request):
     return request.session.get("user_id")
@@ -23,21 +27,32 @@ async def login_action(
     request: Request,
     username: str = Form(...),
     password: str = Form(...),
+    db: AsyncSession = Depends(get_db),
 ):
-    async for db in get_db():
-        db: AsyncSession
-        q = await db.execute(select(User).where(User.username == username))
-        user = q.scalar_one_or_none()
-
-        if not user or not verify_password(password, user.password_hash):
-            return templates.TemplateResponse(
-                "login.html",
-                {"request": request, "error": "اسم المستخدم أو كلمة المرور غير صحيحة"},
-                status_code=401,
-            )
-
-        request.session["user_id"] = user.id
-        return RedirectResponse(url="/", status_code=302)
+    client_ip = request.client.host if request.client else None
+
+    # ✅ throttle قبل bcrypt — brute force مايحرقش CPU
+    if login_blocked(username, client_ip):
+        return templates.TemplateResponse(
+            "login.html",
+            {"request": request, "error": "محاولات كتير غلط، جرّب تاني بعد شوية"},
+            status_code=429,
+        )
+
+    q = await db.execute(select(User.id, User.password_hash).where(User.username == username))
+    user = q.first()
+
+    if not user or not await verify_password_async(password, user.password_hash):
+        record_login_failure(username, client_ip)
+        return templates.TemplateResponse(
+            "login.html",
+            {"request": request, "error": "اسم المستخدم أو كلمة المرور غير صحيحة"},
+            status_code=401,
+        )
+
+    reset_login_failures(username, client_ip)
+    request.session["user_id"] = user.id
+    return RedirectResponse(url="/", status_code=302)
 
 @router.get("/logout")
 async def logout(request: Request):
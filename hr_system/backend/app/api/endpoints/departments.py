@@ -1,27 +1,61 @@
-from fastapi import APIRouter, Request, Form
-from fastapi.responses import RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import select, delete
+from fastapi import APIRouter, Depends, Request, Form
+from fastapi.responses import RedirectResponse, StreamingResponse
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.db.session import get_uow, get_read_db
+from app.core.templating import templates
 from app.models.department import Department
+from app.models.employee import Employee
 from app.api.endpoints.auth import require_login
+from app.core.refcache import department_refs, mark_changed
+from app.core.conditional import validators
+from app.core.current_user import CurrentUser, get_current_user
+from app.core.page_cache import cached_page
+from app.core.fragments import removed, wants_fragment
+from app.core.export import DEPARTMENT_COLUMNS, FORMATS, department_export_query, export_headers, parse_columns, stream_export
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 @router.get("")
-async def list_departments(request: Request):
-    if not require_login(request):
+async def list_departments(
+    request: Request,
+    current_user: CurrentUser | None = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if not current_user:
         return RedirectResponse("/login", status_code=302)
 
-    async for db in get_db():
-        db: AsyncSession
-        res = await db.execute(select(Department).order_by(Department.name))
-        items = res.scalars().all()
+    v = await validators(request, db, ("departments",))
+    if v.matches(request):
+        return v.not_modified()
+
+    async def render():
+        items = await department_refs(db)
         return templates.TemplateResponse("departments.html", {"request": request, "items": items})
 
+    return v.apply(await cached_page(request, db, current_user, ("departments",), render))
+
+@router.get("/export")
+async def export_departments(
+    request: Request,
+    format: str = "csv",
+    columns: str = "",
+    gzip: int = 0,
+):
+    if not require_login(request):
+        return RedirectResponse("/login", status_code=302)
+
+    fmt = format if format in FORMATS else "csv"
+    cols = parse_columns(columns, DEPARTMENT_COLUMNS)
+    media_type, headers = export_headers("departments", fmt, bool(gzip))
+    return StreamingResponse(
+        stream_export(department_export_query(cols), cols, fmt, bool(gzip)),
+        media_type=media_type,
+        headers=headers,
+    )
+
 @router.get("/new")
 async def new_department_form(request: Request):
     if not require_login(request):
@@ -29,27 +63,39 @@ async def new_department_form(request: Request):
     return templates.TemplateResponse("department_form.html", {"request": request, "item": None})
 
 @router.post("/new")
-async def create_department(request: Request, name: str = Form(...)):
+async def create_department(
+    request: Request,
+    name: str = Form(...),
+    db: AsyncSession = Depends(get_uow),
+):
     if not require_login(request):
         return RedirectResponse("/login", status_code=302)
 
-    async for db in get_db():
-        db: AsyncSession
-        dep = Department(name=name.strip())
-        db.add(dep)
-        try:
-            await db.commit()
-        except Exception:
-            await db.rollback()
+    dep = Department(name=name.strip())
+    db.add(dep)
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
         return RedirectResponse("/departments", status_code=302)
+    await mark_changed(db, "departments")
+    return RedirectResponse("/departments", status_code=302)
 
 @router.post("/{dep_id}/delete")
-async def delete_department(request: Request, dep_id: int):
+async def delete_department(
+    request: Request,
+    dep_id: int,
+    db: AsyncSession = Depends(get_uow),
+):
     if not require_login(request):
         return RedirectResponse("/login", status_code=302)
 
-    async for db in get_db():
-        db: AsyncSession
-        await db.execute(delete(Department).where(Department.id == dep_id))
-        await db.commit()
-        return RedirectResponse("/departments", status_code=302)
+    # employees.department_id من غير ON DELETE: الموظفين يبقوا Unassigned بدل FK error
+    res = await db.execute(update(Employee).where(Employee.department_id == dep_id).values(department_id=None))
+    if res.rowcount:
+        await mark_changed(db, "employees")
+    await db.execute(delete(Department).where(Department.id == dep_id))
+    await mark_changed(db, "departments")
+    if wants_fragment(request):
+        return removed()
+    return RedirectResponse("/departments", status_code=302)
@@ -1,54 +1,143 @@
 from datetime import date
 
-from fastapi import APIRouter, Request, Form
-from fastapi.responses import RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import select, delete
+from fastapi import APIRouter, Depends, Request, Form, UploadFile, File
+from fastapi.responses import JSONResponse, RedirectResponse, Response, StreamingResponse
+from sqlalchemy import select, delete, func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from app.db.session import get_db
+from app.db.session import get_uow, get_read_db
+from app.core.templating import templates
 from app.models.employee import Employee
 from app.models.department import Department
+from app.models.attendance import Attendance
+from app.models.leave_request import LeaveRequest
 from app.api.endpoints.auth import require_login
+from app.core.audit import log_event
+from app.core.current_user import CurrentUser, get_current_user
+from app.core.refcache import department_refs, mark_changed
+from app.core.conditional import validators
+from app.core.page_cache import cached_page
+from app.core.fragments import removed, wants_fragment
+from app.core import kpi
+from app.core.export import (
+    EMPLOYEE_COLUMNS, FORMATS, employee_export_query, export_headers, parse_columns, stream_export,
+)
+from app.core.employee_import import ImportFileError, import_employees, iter_rows, report_csv, summarize
+from app.queries.employees import DEFAULT_SORT, PAGE_SIZE, SORTS, EmployeeFilter, directory_page_query
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 
 @router.get("")
-async def list_employees(request: Request):
-    if not require_login(request):
+async def list_employees(
+    request: Request,
+    department_id: str = "",
+    job_title: str = "",
+    sort: str = DEFAULT_SORT,
+    dir: str = "asc",
+    cursor: str | None = None,
+    limit: int = PAGE_SIZE,
+    format: str = "html",
+    current_user: CurrentUser | None = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if not current_user:
         return RedirectResponse("/login", status_code=302)
 
-    async for db in get_db():
-        db: AsyncSession
+    # 304 لو employees/departments ماتغيروش من آخر مرة (نفس الـ URL ونفس الـ user)
+    v = await validators(request, db, ("employees", "departments"))
+    if v.matches(request):
+        return v.not_modified()
+
+    f = EmployeeFilter(
+        department_id=int(department_id) if department_id.strip().isdigit() else None,
+        job_title=job_title.strip() or None,
+    )
+    sort = sort if sort in SORTS else DEFAULT_SORT
+    desc = dir == "desc"
+
+    async def render():
+        items, next_cursor = await directory_page_query(db, f, sort, desc, cursor, limit)
+
+        if format == "json":
+            return JSONResponse({
+                "items": [
+                    {
+                        "id": e.id,
+                        "full_name": e.full_name,
+                        "email": e.email,
+                        "job_title": e.job_title,
+                        "hire_date": e.hire_date.isoformat() if e.hire_date else None,
+                        "department_id": e.department_id,
+                        "department": e.department_name,
+                    }
+                    for e in items
+                ],
+                "next_cursor": next_cursor,
+            })
+
+        deps = await department_refs(db)
+
+        # نفس الفلاتر + الترتيب للصفحة اللي بعدها
+        params = {k: v for k, v in request.query_params.items() if k not in ("cursor", "format") and v}
 
-        # مهم: نحمّل department مسبقًا عشان مانعملش lazy load داخل Jinja
-        res = await db.execute(
-            select(Employee)
-            .options(selectinload(Employee.department))
-            .order_by(Employee.full_name)
-        )
-        items = res.scalars().all()
         return templates.TemplateResponse(
             "employees.html",
-            {"request": request, "items": items},
+            {
+                "request": request,
+                "items": items,
+                "deps": deps,
+                "filters": params,
+                "sort": sort,
+                "desc": desc,
+                "next_cursor": next_cursor,
+                "is_first_page": not cursor,
+            },
         )
 
+    return v.apply(await cached_page(request, db, current_user, ("employees", "departments"), render))
+
+
+@router.get("/export")
+async def export_employees(
+    request: Request,
+    format: str = "csv",
+    columns: str = "",
+    department_id: str = "",
+    job_title: str = "",
+    gzip: int = 0,
+):
+    if not require_login(request):
+        return RedirectResponse("/login", status_code=302)
+
+    fmt = format if format in FORMATS else "csv"
+    cols = parse_columns(columns, EMPLOYEE_COLUMNS)
+    f = EmployeeFilter(
+        department_id=int(department_id) if department_id.strip().isdigit() else None,
+        job_title=job_title.strip() or None,
+    )
+    media_type, headers = export_headers("employees", fmt, bool(gzip))
+    return StreamingResponse(
+        stream_export(employee_export_query(f, cols), cols, fmt, bool(gzip)),
+        media_type=media_type,
+        headers=headers,
+    )
+
 
 @router.get("/new")
-async def new_employee_form(request: Request):
+async def new_employee_form(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+):
     if not require_login(request):
         return RedirectResponse("/login", status_code=302)
 
-    async for db in get_db():
-        db: AsyncSession
-        deps = (await db.execute(select(Department).order_by(Department.name))).scalars().all()
-        return templates.TemplateResponse(
-            "employee_form.html",
-            {"request": request, "deps": deps, "item": None},
-        )
+    deps = await department_refs(db)
+    return templates.TemplateResponse(
+        "employee_form.html",
+        {"request": request, "deps": deps, "item": None},
+    )
 
 
 @router.post("/new")
@@ -59,6 +148,7 @@ async def create_employee(
     job_title: str = Form(""),
     hire_date: str = Form(""),
     department_id: str = Form(""),
+    db: AsyncSession = Depends(get_uow),
 ):
     if not require_login(request):
         return RedirectResponse("/login", status_code=302)
@@ -73,31 +163,89 @@ async def create_employee(
 
     dep_id = int(department_id) if department_id.strip().isdigit() else None
 
-    async for db in get_db():
-        db: AsyncSession
-        emp = Employee(
-            full_name=full_name.strip(),
-            email=email.strip().lower(),
-            job_title=job_title.strip(),
-            hire_date=parsed_date,
-            department_id=dep_id,
+    emp = Employee(
+        full_name=full_name.strip(),
+        email=email.strip().lower(),
+        job_title=job_title.strip(),
+        hire_date=parsed_date,
+        department_id=dep_id,
+    )
+    db.add(emp)
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        return RedirectResponse("/employees/new?error=email_exists", status_code=302)
+    await mark_changed(db, "employees")
+    await kpi.bump(db, "employees", 1)
+
+    return RedirectResponse("/employees", status_code=302)
+
+
+@router.post("/import")
+async def import_employees_file(
+    request: Request,
+    file: UploadFile = File(...),
+    dry_run: str = Form(""),
+    me: CurrentUser | None = Depends(get_current_user),
+    db: AsyncSession = Depends(get_uow),
+):
+    if not me:
+        return RedirectResponse("/login", status_code=302)
+    if not me.is_admin:
+        return RedirectResponse("/employees?error=forbidden", status_code=302)
+
+    is_dry_run = dry_run == "1"
+    try:
+        report = await import_employees(db, iter_rows(file.file, file.filename or ""), dry_run=is_dry_run)
+    except ImportFileError as e:
+        await db.rollback()
+        return RedirectResponse(f"/employees?error={e}", status_code=302)
+
+    if not is_dry_run:
+        await mark_changed(db, "employees")
+        await kpi.bump(db, "employees", summarize(report).get("created", 0))
+        await log_event(
+            db,
+            actor_user_id=me.id,
+            action="employee.import",
+            entity="employee",
+            entity_id=None,
+            meta={"file": file.filename, **summarize(report)},
         )
-        db.add(emp)
-        try:
-            await db.commit()
-        except Exception:
-            await db.rollback()
 
-        return RedirectResponse("/employees", status_code=302)
+    name = "employees_dry_run.csv" if is_dry_run else "employees_import_report.csv"
+    return Response(
+        content=report_csv(report),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{name}"'},
+    )
 
 
 @router.post("/{emp_id}/delete")
-async def delete_employee(request: Request, emp_id: int):
+async def delete_employee(
+    request: Request,
+    emp_id: int,
+    db: AsyncSession = Depends(get_uow),
+):
     if not require_login(request):
         return RedirectResponse("/login", status_code=302)
 
-    async for db in get_db():
-        db: AsyncSession
-        await db.execute(delete(Employee).where(Employee.id == emp_id))
-        await db.commit()
-        return RedirectResponse("/employees", status_code=302)
+    # ON DELETE CASCADE (SQLite: PRAGMA foreign_keys=ON) بيمسح attendance و leaves بتوعه — الـ counters تنزل معاهم
+    open_shifts = await db.scalar(
+        select(func.count()).select_from(Attendance)
+        .where(Attendance.employee_id == emp_id, Attendance.check_out.is_(None), Attendance.check_in.is_not(None))
+    )
+    pending = await db.scalar(
+        select(func.count()).select_from(LeaveRequest)
+        .where(LeaveRequest.employee_id == emp_id, LeaveRequest.status == "pending")
+    )
+    res = await db.execute(delete(Employee).where(Employee.id == emp_id))
+    await mark_changed(db, "employees")
+    if res.rowcount:
+        await kpi.bump(db, "employees", -res.rowcount)
+        await kpi.bump(db, "on_site", -(open_shifts or 0))
+        await kpi.bump(db, "pending_leaves", -(pending or 0))
+    if wants_fragment(request):
+        return removed()
+    return RedirectResponse("/employees", status_code=302)
@@ -2,18 +2,23 @@
 
 from datetime import date, datetime
 
-from fastapi import APIRouter, Request, Form
+from fastapi import APIRouter, Depends, Request, Form
 from fastapi.responses import RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import select, desc, func
+from sqlalchemy import select, desc, func, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
-from app.api.endpoints.auth import require_login
+from app.db.session import get_uow, get_read_db
+from app.core.templating import templates
+from app.core.current_user import CurrentUser, get_current_user
 from app.core.rbac import user_has_permission
 from app.core.audit import log_event  # ✅ AUDIT
+from app.core.refcache import department_refs, employee_refs, mark_changed
+from app.core.conditional import validators
+from app.core.fragments import fragment, wants_fragment
+from app.core import kpi
+from app.queries.department_costs import snapshot_stmt
+from app.queries.payroll import pay_history_page, run_items_page, run_totals, runs_page
 
-from app.models.user import User
 from app.models.employee import Employee
 from app.models.allowance import Allowance
 from app.models.deduction import Deduction
@@ -21,15 +26,9 @@ from app.models.payroll_run import PayrollRun
 from app.models.payroll_item import PayrollItem
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 
-async def get_current_user(db: AsyncSession, user_id: int) -> User | None:
-    res = await db.execute(select(User).where(User.id == user_id))
-    return res.scalar_one_or_none()
-
-
-async def is_admin_or(db: AsyncSession, user: User | None, perm: str) -> bool:
+async def is_admin_or(db: AsyncSession, user: CurrentUser | None, perm: str) -> bool:
     if not user:
         return False
     if getattr(user, "is_admin", False):
@@ -37,213 +36,315 @@ async def is_admin_or(db: AsyncSession, user: User | None, perm: str) -> bool:
     return await user_has_permission(db, user.id, perm)
 
 
-@router.get("")
-async def payroll_page(request: Request, employee_id: int | None = None):
-    if not require_login(request):
-        return RedirectResponse("/login", status_code=302)
+async def _allowances(db: AsyncSession, employee_id: int):
+    return (
+        await db.execute(
+            select(Allowance)
+            .where(Allowance.employee_id == employee_id)
+            .order_by(desc(Allowance.created_at))
+        )
+    ).scalars().all()
 
-    user_id = request.session.get("user_id")
-
-    async for db in get_db():
-        db: AsyncSession
-        current_user = await get_current_user(db, user_id)
-
-        can_view = await is_admin_or(db, current_user, "payroll.view")
-        can_run = await is_admin_or(db, current_user, "payroll.run")
-        can_update_salary = await is_admin_or(db, current_user, "payroll.salary.update")
-
-        # ✅ SECURITY: block payroll page if no view permission
-        if not can_view:
-            return RedirectResponse("/?error=forbidden", status_code=302)
-
-
-        emp_rows = (await db.execute(select(Employee).order_by(Employee.full_name.asc()))).scalars().all()
-        if not emp_rows:
-            return templates.TemplateResponse(
-                "payroll.html",
-                {
-                    "request": request,
-                    "employees": [],
-                    "employee": None,
-                    "allowances": [],
-                    "deductions": [],
-                    "runs": [],
-                    "can_view": can_view,
-                    "can_run": can_run,
-                    "can_update_salary": can_update_salary,
-                },
-            )
 
-        if employee_id is None:
-            employee_id = emp_rows[0].id
+async def _deductions(db: AsyncSession, employee_id: int):
+    return (
+        await db.execute(
+            select(Deduction)
+            .where(Deduction.employee_id == employee_id)
+            .order_by(desc(Deduction.created_at))
+        )
+    ).scalars().all()
 
-        employee = next((e for e in emp_rows if e.id == employee_id), None)
-        if not employee:
-            return RedirectResponse("/payroll?error=employee_not_found", status_code=302)
 
-        allowances = (
-            await db.execute(
-                select(Allowance)
-                .where(Allowance.employee_id == employee_id)
-                .order_by(desc(Allowance.created_at))
-            )
-        ).scalars().all()
+@router.get("")
+async def payroll_page(
+    request: Request,
+    employee_id: int | None = None,
+    current_user: CurrentUser | None = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if not current_user:
+        return RedirectResponse("/login", status_code=302)
 
-        deductions = (
-            await db.execute(
-                select(Deduction)
-                .where(Deduction.employee_id == employee_id)
-                .order_by(desc(Deduction.created_at))
-            )
-        ).scalars().all()
+    can_view = await is_admin_or(db, current_user, "payroll.view")
+    can_run = await is_admin_or(db, current_user, "payroll.run")
+    can_update_salary = await is_admin_or(db, current_user, "payroll.salary.update")
 
-        runs = (
-            await db.execute(
-                select(PayrollRun).order_by(desc(PayrollRun.created_at)).limit(10)
-            )
-        ).scalars().all()
+    # ✅ SECURITY: block payroll page if no view permission
+    if not can_view:
+        return RedirectResponse("/?error=forbidden", status_code=302)
 
-        return templates.TemplateResponse(
+    # الأزرار بتعتمد على الصلاحيات => جزء من الـ ETag
+    v = await validators(request, db, ("employees", "payroll"), can_run, can_update_salary)
+    if v.matches(request):
+        return v.not_modified()
+
+    emp_rows = await employee_refs(db)
+    if not emp_rows:
+        return v.apply(templates.TemplateResponse(
             "payroll.html",
             {
                 "request": request,
-                "employees": emp_rows,
-                "employee": employee,
-                "allowances": allowances,
-                "deductions": deductions,
-                "runs": runs,
+                "employees": [],
+                "employee": None,
+                "allowances": [],
+                "deductions": [],
+                "runs": [],
                 "can_view": can_view,
                 "can_run": can_run,
                 "can_update_salary": can_update_salary,
             },
-        )
+        ))
+
+    if employee_id is None:
+        employee_id = emp_rows[0].id
+
+    employee = None
+    if any(e.id == employee_id for e in emp_rows):
+        employee = await db.get(Employee, employee_id)
+    if not employee:
+        return RedirectResponse("/payroll?error=employee_not_found", status_code=302)
+
+    allowances = await _allowances(db, employee_id)
+    deductions = await _deductions(db, employee_id)
+
+    runs, _ = await runs_page(db, limit=10)
+
+    return v.apply(templates.TemplateResponse(
+        "payroll.html",
+        {
+            "request": request,
+            "employees": emp_rows,
+            "employee": employee,
+            "allowances": allowances,
+            "deductions": deductions,
+            "runs": runs,
+            "can_view": can_view,
+            "can_run": can_run,
+            "can_update_salary": can_update_salary,
+        },
+    ))
+
+
+@router.get("/runs/{run_id}")
+async def payroll_run_detail(
+    request: Request,
+    run_id: int,
+    department_id: str = "",
+    cursor: str | None = None,
+    current_user: CurrentUser | None = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if not current_user:
+        return RedirectResponse("/login", status_code=302)
+    if not await is_admin_or(db, current_user, "payroll.view"):
+        return RedirectResponse("/?error=forbidden", status_code=302)
+
+    v = await validators(request, db, ("employees", "departments", "payroll"))
+    if v.matches(request):
+        return v.not_modified()
+
+    run = await db.get(PayrollRun, run_id)
+    if not run:
+        return RedirectResponse("/payroll?error=run_not_found", status_code=302)
+
+    dep_id = int(department_id) if department_id.strip().isdigit() else None
+    items, next_cursor = await run_items_page(db, run_id, dep_id, cursor)
+    totals = await run_totals(db, run_id, dep_id)
+
+    return v.apply(templates.TemplateResponse(
+        "payroll_run.html",
+        {
+            "request": request,
+            "run": run,
+            "items": items,
+            "totals": totals,
+            "deps": await department_refs(db),
+            "department_id": department_id.strip(),
+            "next_cursor": next_cursor,
+            "is_first_page": not cursor,
+        },
+    ))
+
+
+@router.get("/employee/{employee_id}/history")
+async def pay_history(
+    request: Request,
+    employee_id: int,
+    cursor: str | None = None,
+    current_user: CurrentUser | None = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if not current_user:
+        return RedirectResponse("/login", status_code=302)
+    if not await is_admin_or(db, current_user, "payroll.view"):
+        return RedirectResponse("/?error=forbidden", status_code=302)
+
+    v = await validators(request, db, ("employees", "payroll"))
+    if v.matches(request):
+        return v.not_modified()
+
+    employee = await db.get(Employee, employee_id)
+    if not employee:
+        return RedirectResponse("/payroll?error=employee_not_found", status_code=302)
+
+    items, next_cursor = await pay_history_page(db, employee_id, cursor)
+    return v.apply(templates.TemplateResponse(
+        "payroll_history.html",
+        {
+            "request": request,
+            "employee": employee,
+            "items": items,
+            "next_cursor": next_cursor,
+            "is_first_page": not cursor,
+        },
+    ))
 
 
 @router.post("/employee/{employee_id}/salary")
-async def update_salary(request: Request, employee_id: int, base_salary: float = Form(...)):
-    if not require_login(request):
+async def update_salary(
+    request: Request,
+    employee_id: int,
+    base_salary: float = Form(...),
+    actor: CurrentUser | None = Depends(get_current_user),
+    db: AsyncSession = Depends(get_uow),
+):
+    if not actor:
         return RedirectResponse("/login", status_code=302)
 
-    actor_id = request.session.get("user_id")
-
-    async for db in get_db():
-        db: AsyncSession
-        actor = await get_current_user(db, actor_id)
+    actor_id = actor.id
 
-        # ✅ permission gate
-        allowed = await is_admin_or(db, actor, "payroll.salary.update")
-        if not allowed:
-            return RedirectResponse("/payroll?error=forbidden", status_code=302)
+    # ✅ permission gate
+    allowed = await is_admin_or(db, actor, "payroll.salary.update")
+    if not allowed:
+        return RedirectResponse("/payroll?error=forbidden", status_code=302)
 
-        emp = (await db.execute(select(Employee).where(Employee.id == employee_id))).scalar_one_or_none()
-        if not emp:
-            return RedirectResponse("/payroll?error=employee_not_found", status_code=302)
+    emp = (await db.execute(select(Employee).where(Employee.id == employee_id))).scalar_one_or_none()
+    if not emp:
+        return RedirectResponse("/payroll?error=employee_not_found", status_code=302)
 
-        emp.base_salary = base_salary
-        await db.commit()
+    emp.base_salary = base_salary
+    await mark_changed(db, "payroll")
 
-        # ✅ AUDIT
-        await log_event(
-            db,
-            actor_user_id=actor_id,
-            action="payroll.salary.update",
-            entity="employee",
-            entity_id=employee_id,
-            meta={"base_salary": float(base_salary)},
-        )
-        await db.commit()
+    # ✅ AUDIT
+    await log_event(
+        db,
+        actor_user_id=actor_id,
+        action="payroll.salary.update",
+        entity="employee",
+        entity_id=employee_id,
+        meta={"base_salary": float(base_salary)},
+    )
 
-        return RedirectResponse(f"/payroll?employee_id={employee_id}", status_code=302)
+    if wants_fragment(request):
+        return fragment(request, "_payroll_salary.html", {"employee": emp})
+    return RedirectResponse(f"/payroll?employee_id={employee_id}", status_code=302)
 
 
 @router.post("/employee/{employee_id}/allowances/new")
-async def add_allowance(request: Request, employee_id: int, name: str = Form(...), amount: float = Form(...)):
-    if not require_login(request):
+async def add_allowance(
+    request: Request,
+    employee_id: int,
+    name: str = Form(...),
+    amount: float = Form(...),
+    actor: CurrentUser | None = Depends(get_current_user),
+    db: AsyncSession = Depends(get_uow),
+):
+    if not actor:
         return RedirectResponse("/login", status_code=302)
 
-    actor_id = request.session.get("user_id")
-
-    async for db in get_db():
-        db: AsyncSession
-        actor = await get_current_user(db, actor_id)
-
-        # ✅ permission gate
-        allowed = await is_admin_or(db, actor, "payroll.run")
-        if not allowed:
-            return RedirectResponse("/payroll?error=forbidden", status_code=302)
-
-        emp = (await db.execute(select(Employee.id).where(Employee.id == employee_id))).scalar_one_or_none()
-        if not emp:
-            return RedirectResponse("/payroll?error=employee_not_found", status_code=302)
-
-        a = Allowance(
-            employee_id=employee_id,
-            name=name.strip(),
-            amount=amount,
-            active=True,
-            created_at=datetime.utcnow(),
-        )
-        db.add(a)
-        await db.commit()
-        await db.refresh(a)
-
-        # ✅ AUDIT
-        await log_event(
-            db,
-            actor_user_id=actor_id,
-            action="payroll.allowance.create",
-            entity="allowance",
-            entity_id=a.id,
-            meta={"employee_id": employee_id, "name": a.name, "amount": float(amount)},
+    actor_id = actor.id
+
+    # ✅ permission gate
+    allowed = await is_admin_or(db, actor, "payroll.run")
+    if not allowed:
+        return RedirectResponse("/payroll?error=forbidden", status_code=302)
+
+    emp = (await db.execute(select(Employee.id).where(Employee.id == employee_id))).scalar_one_or_none()
+    if not emp:
+        return RedirectResponse("/payroll?error=employee_not_found", status_code=302)
+
+    a = Allowance(
+        employee_id=employee_id,
+        name=name.strip(),
+        amount=amount,
+        active=True,
+        created_at=datetime.utcnow(),
+    )
+    db.add(a)
+    await db.flush()  # id للـ audit من غير commit تاني
+    await mark_changed(db, "payroll")
+
+    # ✅ AUDIT
+    await log_event(
+        db,
+        actor_user_id=actor_id,
+        action="payroll.allowance.create",
+        entity="allowance",
+        entity_id=a.id,
+        meta={"employee_id": employee_id, "name": a.name, "amount": float(amount)},
+    )
+
+    if wants_fragment(request):
+        return fragment(
+            request,
+            "_payroll_allowances.html",
+            {"employee": {"id": employee_id}, "allowances": await _allowances(db, employee_id)},
         )
-        await db.commit()
-
-        return RedirectResponse(f"/payroll?employee_id={employee_id}", status_code=302)
+    return RedirectResponse(f"/payroll?employee_id={employee_id}", status_code=302)
 
 
 @router.post("/employee/{employee_id}/deductions/new")
-async def add_deduction(request: Request, employee_id: int, name: str = Form(...), amount: float = Form(...)):
-    if not require_login(request):
+async def add_deduction(
+    request: Request,
+    employee_id: int,
+    name: str = Form(...),
+    amount: float = Form(...),
+    actor: CurrentUser | None = Depends(get_current_user),
+    db: AsyncSession = Depends(get_uow),
+):
+    if not actor:
         return RedirectResponse("/login", status_code=302)
 
-    actor_id = request.session.get("user_id")
-
-    async for db in get_db():
-        db: AsyncSession
-        actor = await get_current_user(db, actor_id)
-
-        # ✅ permission gate
-        allowed = await is_admin_or(db, actor, "payroll.run")
-        if not allowed:
-            return RedirectResponse("/payroll?error=forbidden", status_code=302)
-
-        emp = (await db.execute(select(Employee.id).where(Employee.id == employee_id))).scalar_one_or_none()
-        if not emp:
-            return RedirectResponse("/payroll?error=employee_not_found", status_code=302)
-
-        d = Deduction(
-            employee_id=employee_id,
-            name=name.strip(),
-            amount=amount,
-            active=True,
-            created_at=datetime.utcnow(),
-        )
-        db.add(d)
-        await db.commit()
-        await db.refresh(d)
-
-        # ✅ AUDIT
-        await log_event(
-            db,
-            actor_user_id=actor_id,
-            action="payroll.deduction.create",
-            entity="deduction",
-            entity_id=d.id,
-            meta={"employee_id": employee_id, "name": d.name, "amount": float(amount)},
+    actor_id = actor.id
+
+    # ✅ permission gate
+    allowed = await is_admin_or(db, actor, "payroll.run")
+    if not allowed:
+        return RedirectResponse("/payroll?error=forbidden", status_code=302)
+
+    emp = (await db.execute(select(Employee.id).where(Employee.id == employee_id))).scalar_one_or_none()
+    if not emp:
+        return RedirectResponse("/payroll?error=employee_not_found", status_code=302)
+
+    d = Deduction(
+        employee_id=employee_id,
+        name=name.strip(),
+        amount=amount,
+        active=True,
+        created_at=datetime.utcnow(),
+    )
+    db.add(d)
+    await db.flush()  # id للـ audit من غير commit تاني
+    await mark_changed(db, "payroll")
+
+    # ✅ AUDIT
+    await log_event(
+        db,
+        actor_user_id=actor_id,
+        action="payroll.deduction.create",
+        entity="deduction",
+        entity_id=d.id,
+        meta={"employee_id": employee_id, "name": d.name, "amount": float(amount)},
+    )
+
+    if wants_fragment(request):
+        return fragment(
+            request,
+            "_payroll_deductions.html",
+            {"employee": {"id": employee_id}, "deductions": await _deductions(db, employee_id)},
         )
-        await db.commit()
-
-        return RedirectResponse(f"/payroll?employee_id={employee_id}", status_code=302)
+    return RedirectResponse(f"/payroll?employee_id={employee_id}", status_code=302)
 
 
 @router.post("/run")
@@ -252,8 +353,10 @@ async def run_payroll(
     period_start: str = Form(...),
     period_end: str = Form(...),
     notes: str = Form(""),
+    current_user: CurrentUser | None = Depends(get_current_user),
+    db: AsyncSession = Depends(get_uow),
 ):
-    if not require_login(request):
+    if not current_user:
         return RedirectResponse("/login", status_code=302)
 
     try:
@@ -265,78 +368,85 @@ async def run_payroll(
     if pe < ps:
         return RedirectResponse("/payroll?error=range", status_code=302)
 
-    user_id = request.session.get("user_id")
-
-    async for db in get_db():
-        db: AsyncSession
-        current_user = await get_current_user(db, user_id)
-        if not current_user:
-            return RedirectResponse("/payroll?error=forbidden", status_code=302)
-
-        # ✅ permission gate
-        allowed = await is_admin_or(db, current_user, "payroll.run")
-        if not allowed:
-            return RedirectResponse("/payroll?error=forbidden", status_code=302)
-
-        run = PayrollRun(
-            period_start=ps,
-            period_end=pe,
-            status="draft",
-            notes=(notes or "").strip() or None,
-            created_by=current_user.id,
-            created_at=datetime.utcnow(),
-        )
-        db.add(run)
-        await db.commit()
-        await db.refresh(run)
-
-        employees = (await db.execute(select(Employee))).scalars().all()
-        for emp in employees:
-            allow_total = (
-                await db.execute(
-                    select(func.coalesce(func.sum(Allowance.amount), 0)).where(
-                        Allowance.employee_id == emp.id,
-                        Allowance.active.is_(True),
-                    )
-                )
-            ).scalar_one()
-
-            ded_total = (
-                await db.execute(
-                    select(func.coalesce(func.sum(Deduction.amount), 0)).where(
-                        Deduction.employee_id == emp.id,
-                        Deduction.active.is_(True),
-                    )
-                )
-            ).scalar_one()
-
-            base = emp.base_salary or 0
-            net = base + allow_total - ded_total
-
-            db.add(
-                PayrollItem(
-                    run_id=run.id,
-                    employee_id=emp.id,
-                    base_salary=base,
-                    allowances_total=allow_total,
-                    deductions_total=ded_total,
-                    net_pay=net,
-                    generated_at=datetime.utcnow(),
-                )
+    # ✅ permission gate
+    allowed = await is_admin_or(db, current_user, "payroll.run")
+    if not allowed:
+        return RedirectResponse("/payroll?error=forbidden", status_code=302)
+
+    run = PayrollRun(
+        period_start=ps,
+        period_end=pe,
+        status="draft",
+        notes=(notes or "").strip() or None,
+        created_by=current_user.id,
+        created_at=datetime.utcnow(),
+    )
+    db.add(run)
+    await db.flush()  # run.id للـ items
+
+    # totals لكل الموظفين في query واحدة بدل 2 queries لكل موظف
+    allow_totals = dict(
+        (
+            await db.execute(
+                select(Allowance.employee_id, func.sum(Allowance.amount))
+                .where(Allowance.active.is_(True))
+                .group_by(Allowance.employee_id)
+            )
+        ).all()
+    )
+    ded_totals = dict(
+        (
+            await db.execute(
+                select(Deduction.employee_id, func.sum(Deduction.amount))
+                .where(Deduction.active.is_(True))
+                .group_by(Deduction.employee_id)
+            )
+        ).all()
+    )
+
+    generated_at = datetime.utcnow()
+    items = []
+    employees = (await db.execute(select(Employee.id, Employee.base_salary))).all()
+    for emp in employees:
+        allow_total = allow_totals.get(emp.id) or 0
+        ded_total = ded_totals.get(emp.id) or 0
+
+        base = emp.base_salary or 0
+        net = base + allow_total - ded_total
+
+        items.append(
+            dict(
+                run_id=run.id,
+                employee_id=emp.id,
+                base_salary=base,
+                allowances_total=allow_total,
+                deductions_total=ded_total,
+                net_pay=net,
+                generated_at=generated_at,
             )
-
-        run.status = "posted"
-        await db.commit()
-
-        # ✅ AUDIT
-        await log_event(
-            db,
-            actor_user_id=current_user.id,
-            action="payroll.run",
-            entity="payroll_run",
-            entity_id=run.id,
-            meta={"period_start": str(ps), "period_end": str(pe), "status": run.status},
         )
-        await db.commit()
 
-        return RedirectResponse("/payroll?success=1", status_code=302)
+    # executemany واحد لكل الـ items
+    if items:
+        await db.execute(insert(PayrollItem), items)
+        # snapshot لكل قسم في نفس الـ transaction — التقارير القديمة مش بتتحسب تاني
+        await db.execute(snapshot_stmt(run.id, generated_at))
+
+    run.status = "posted"
+    await mark_changed(db, "payroll")
+    await kpi.set_value(db, "last_payroll_net", sum(i["net_pay"] for i in items))
+
+    # ✅ AUDIT
+    await log_event(
+        db,
+        actor_user_id=current_user.id,
+        action="payroll.run",
+        entity="payroll_run",
+        entity_id=run.id,
+        meta={"period_start": str(ps), "period_end": str(pe), "status": run.status},
+    )
+
+    if wants_fragment(request):
+        runs, _ = await runs_page(db, limit=10)
+        return fragment(request, "_payroll_runs.html", {"runs": runs, "run_posted": True})
+    return RedirectResponse("/payroll?success=1", status_code=302)
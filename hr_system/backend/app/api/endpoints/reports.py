@@ -1,29 +1,205 @@
-from fastapi import APIRouter, Request
-from fastapi.responses import RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import select, desc
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse, RedirectResponse, Response
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
-from app.api.endpoints.auth import require_login
-from app.models.audit_log import AuditLog
+from app.db.session import get_read_db
+from app.core.templating import templates
+from app.api.endpoints.payroll import is_admin_or
+from app.core.current_user import CurrentUser, get_current_user
+from app.core.conditional import validators
+from app.core.page_cache import cached_page
+from app.core.report_engine import REPORTS, month_label, parse_params, run_report, to_csv, to_json
+from app.queries import workforce  # noqa: F401  (registers the report definitions)
+from app.core.audit_retention import search_archive
+from app.queries.audit import AuditFilter, PAGE_SIZE, audit_page_query, parse_when, resolve_actor
+from app.queries.department_costs import current_department_costs, run_department_costs, totals
+from app.queries.pagination import decode_cursor, encode_cursor
+from app.models.payroll_run import PayrollRun
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 
 @router.get("/audit")
-async def audit_page(request: Request):
-    if not require_login(request):
+async def audit_page(
+    request: Request,
+    action: str = "",
+    entity: str = "",
+    entity_id: int | None = None,
+    actor: str = "",
+    employee_id: int | None = None,
+    since: str = "",
+    until: str = "",
+    source: str = "live",
+    cursor: str | None = None,
+    current_user: CurrentUser | None = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if not current_user:
         return RedirectResponse("/login", status_code=302)
 
-    async for db in get_db():
-        db: AsyncSession
-        items = (await db.execute(
-            select(AuditLog).order_by(desc(AuditLog.created_at)).limit(50)
-        )).scalars().all()
+    # archive بيتغير مع الـ retention اللي بيحرك نفس الـ version
+    v = await validators(request, db, ("audit",))
+    if v.matches(request):
+        return v.not_modified()
+
+    async def render():
+        f = AuditFilter(
+            action=action.strip() or None,
+            entity=entity.strip() or None,
+            entity_id=entity_id,
+            actor_user_id=await resolve_actor(db, actor),
+            employee_id=employee_id,
+            since=parse_when(since),
+            until=parse_when(until, end_of_day=True),
+        )
+        if source == "archive":
+            # on-demand scan of exported months (gzip NDJSON)
+            after = decode_cursor(cursor)
+            before = (after[0], after[1]) if after and len(after) == 2 else None
+            # gzip + json.loads = blocking؛ برا الـ event loop
+            items = await run_in_threadpool(search_archive, f, PAGE_SIZE + 1, before)
+            next_cursor = None
+            if len(items) > PAGE_SIZE:
+                items = items[:PAGE_SIZE]
+                next_cursor = encode_cursor(items[-1]["created_at"], items[-1]["id"])
+        else:
+            items, next_cursor = await audit_page_query(db, f, cursor)
+
+        # نفس الفلاتر + cursor للصفحة اللي بعدها
+        params = {k: v for k, v in request.query_params.items() if k != "cursor" and v}
 
         return templates.TemplateResponse(
             "audit.html",
-            {"request": request, "items": items},
+            {
+                "request": request,
+                "items": items,
+                "filters": params,
+                "next_cursor": next_cursor,
+                "is_first_page": not cursor,
+            },
+        )
+
+    return v.apply(await cached_page(request, db, current_user, ("audit",), render))
+
+
+@router.get("/departments")
+async def department_costs_page(
+    request: Request,
+    run_id: int | None = None,
+    format: str = "html",
+    current_user: CurrentUser | None = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if not current_user:
+        return RedirectResponse("/login", status_code=302)
+    if not await is_admin_or(db, current_user, "payroll.view"):
+        return RedirectResponse("/?error=forbidden", status_code=302)
+
+    v = await validators(request, db, ("employees", "departments", "payroll"))
+    if v.matches(request):
+        return v.not_modified()
+
+    # run_id => snapshot محفوظ وقت الـ run؛ من غيره => الأرقام الحالية (cached)
+    if run_id is not None:
+        rows = await run_department_costs(db, run_id)
+    else:
+        rows = list(await current_department_costs(db))
+    total = totals(rows)
+
+    if format == "json":
+        return v.apply(JSONResponse({
+            "run_id": run_id,
+            "items": [vars(r) for r in rows],
+            "total": vars(total),
+        }))
+
+    runs = (
+        await db.execute(
+            select(PayrollRun.id, PayrollRun.period_start, PayrollRun.period_end)
+            .where(PayrollRun.status == "posted")
+            .order_by(PayrollRun.created_at.desc(), PayrollRun.id.desc())
+            .limit(24)
         )
+    ).all()
+
+    return v.apply(templates.TemplateResponse(
+        "department_costs.html",
+        {
+            "request": request,
+            "items": rows,
+            "total": total,
+            "runs": runs,
+            "run_id": run_id,
+        },
+    ))
+
+
+async def _visible_reports(db: AsyncSession, user: CurrentUser):
+    return [r for r in REPORTS.values() if not r.permission or await is_admin_or(db, user, r.permission)]
+
+
+@router.get("/workforce")
+async def workforce_index(
+    request: Request,
+    current_user: CurrentUser | None = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if not current_user:
+        return RedirectResponse("/login", status_code=302)
+
+    return templates.TemplateResponse(
+        "workforce_report.html",
+        {"request": request, "reports": await _visible_reports(db, current_user), "report": None},
+    )
+
+
+@router.get("/workforce/{name}")
+async def workforce_report(
+    request: Request,
+    name: str,
+    since: str = "",
+    until: str = "",
+    format: str = "html",
+    current_user: CurrentUser | None = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if not current_user:
+        return RedirectResponse("/login", status_code=302)
+
+    defn = REPORTS.get(name)
+    if not defn:
+        return RedirectResponse("/reports/workforce?error=not_found", status_code=302)
+    if defn.permission and not await is_admin_or(db, current_user, defn.permission):
+        return RedirectResponse("/reports/workforce?error=forbidden", status_code=302)
+
+    params = parse_params(since, until)
+    result = await run_report(db, defn, params)
+
+    # لسه شغال في الـ background => الصفحة بتعمل refresh لحد ما النتيجة تتكاش
+    if result is None and format in ("json", "csv"):
+        return JSONResponse({"status": "running"}, status_code=202, headers={"Retry-After": "2"})
+    if format == "json":
+        return Response(to_json(result), media_type="application/json")
+    if format == "csv":
+        return Response(
+            to_csv(result),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{name}_{month_label(params.since)}.csv"'},
+        )
+
+    response = templates.TemplateResponse(
+        "workforce_report.html",
+        {
+            "request": request,
+            "reports": await _visible_reports(db, current_user),
+            "report": defn,
+            "result": result,
+            "since": month_label(params.since),
+            "until": month_label(params.last_month),
+        },
+    )
+    if result is None:
+        response.headers["Refresh"] = "2"
+    return response
@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse, RedirectResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_read_db
+from app.core.current_user import CurrentUser, get_current_user
+from app.core.rbac import user_has_permission
+from app.core.templating import templates
+from app.queries.search import KIND_CODES, PAGE_SIZE, search_page_query
+
+# audit meta فيها مرتبات (payroll.salary.update) — admin أو الـ permission دي بس
+AUDIT_PERMISSION = "audit.view"
+
+router = APIRouter()
+
+
+@router.get("")
+async def search_page(
+    request: Request,
+    q: str = "",
+    kind: str = "",
+    cursor: str | None = None,
+    format: str = "html",
+    current_user: CurrentUser | None = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if not current_user:
+        return RedirectResponse("/login", status_code=302)
+
+    audit_ok = current_user.is_admin or await user_has_permission(db, current_user.id, AUDIT_PERMISSION)
+    kinds = [k for k in KIND_CODES if audit_ok or k != "audit"]
+    kind = kind if kind in kinds else ""
+    hits, next_cursor = await search_page_query(db, q, kind or None, cursor, PAGE_SIZE, include_audit=audit_ok)
+
+    if format == "json":
+        return JSONResponse({
+            "items": [h.__dict__ for h in hits],
+            "next_cursor": next_cursor,
+        })
+
+    params = {k: v for k, v in request.query_params.items() if k not in ("cursor", "format") and v}
+
+    return templates.TemplateResponse(
+        "search.html",
+        {
+            "request": request,
+            "q": q,
+            "kind": kind,
+            "kinds": kinds,
+            "items": hits,
+            "filters": params,
+            "next_cursor": next_cursor,
+            "is_first_page": not cursor,
+        },
+    )
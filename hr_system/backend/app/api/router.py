@@ -2,7 +2,8 @@ from fastapi import APIRouter
 
 from app.api.endpoints import auth, employees, departments, leaves, payroll, reports, rbac_admin
 from app.routers import attendance
-from app.api.endpoints import auth, employees, departments, leaves, payroll, reports, rbac_admin, admin_users
+from app.api.endpoints import auth, employees, departments, leaves, payroll, reports, rbac_admin, admin_users, search
+from app.api.v1.router import router as v1_router
 
 
 router = APIRouter()
@@ -19,3 +20,6 @@ router.include_router(reports.router, prefix="/reports", tags=["reports"])
 router.include_router(rbac_admin.router, prefix="/rbac", tags=["rbac"])
 
 router.include_router(admin_users.router, prefix="/users", tags=["users"])
+router.include_router(search.router, prefix="/search", tags=["search"])
+
+router.include_router(v1_router)
@@ -0,0 +1,42 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.common import (
+    PAGE_SIZE, STREAM_PAGE_SIZE, api_user, clamp_limit, page_response, parse_fields, stream_response,
+)
+from app.api.v1.schemas import AttendanceOut, Page
+from app.core.conditional import validators
+from app.db.session import get_read_db
+from app.queries.attendance import attendance_page
+from app.queries.audit import parse_when
+
+router = APIRouter()
+
+
+@router.get("", response_model=Page[AttendanceOut], dependencies=[Depends(api_user)])
+async def list_attendance(
+    request: Request,
+    employee_id: Optional[int] = None,
+    since: str = "",
+    until: str = "",
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+    fields: str = "",
+    stream: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+):
+    cols = parse_fields(fields, AttendanceOut)
+    start, end = parse_when(since), parse_when(until, end_of_day=True)
+
+    if stream:
+        return stream_response(
+            lambda s, c: attendance_page(s, employee_id, start, end, c, STREAM_PAGE_SIZE), cols
+        )
+
+    v = await validators(request, db, ("attendance", "employees"))
+    if v.matches(request):
+        return v.not_modified()
+    rows, next_cursor = await attendance_page(db, employee_id, start, end, cursor, clamp_limit(limit))
+    return page_response(rows, next_cursor, cols, v)
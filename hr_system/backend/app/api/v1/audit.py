@@ -0,0 +1,51 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.common import (
+    PAGE_SIZE, STREAM_PAGE_SIZE, api_user, clamp_limit, page_response, parse_fields, stream_response,
+)
+from app.api.v1.schemas import AuditOut, Page
+from app.core.conditional import validators
+from app.db.session import get_read_db
+from app.queries.audit import AuditFilter, audit_page_query, parse_when, resolve_actor
+
+router = APIRouter()
+
+
+@router.get("", response_model=Page[AuditOut], dependencies=[Depends(api_user)])
+async def list_audit(
+    request: Request,
+    action: str = "",
+    entity: str = "",
+    entity_id: Optional[int] = None,
+    actor: str = "",
+    employee_id: Optional[int] = None,
+    since: str = "",
+    until: str = "",
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+    fields: str = "",
+    stream: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Live (hot) audit rows only; archived months stay on /reports/audit?source=archive."""
+    cols = parse_fields(fields, AuditOut)
+    f = AuditFilter(
+        action=action.strip() or None,
+        entity=entity.strip() or None,
+        entity_id=entity_id,
+        actor_user_id=await resolve_actor(db, actor),
+        employee_id=employee_id,
+        since=parse_when(since),
+        until=parse_when(until, end_of_day=True),
+    )
+    if stream:
+        return stream_response(lambda s, c: audit_page_query(s, f, c, STREAM_PAGE_SIZE), cols)
+
+    v = await validators(request, db, ("audit",))
+    if v.matches(request):
+        return v.not_modified()
+    rows, next_cursor = await audit_page_query(db, f, cursor, clamp_limit(limit))
+    return page_response(rows, next_cursor, cols, v)
@@ -0,0 +1,113 @@
+"""Shared pieces of the /api/v1 routes: session auth, fields= projection, orjson, NDJSON streaming."""
+
+from decimal import Decimal
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, Type
+
+import orjson
+from fastapi import Depends, HTTPException, Request
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import Response, StreamingResponse
+
+from app.core.conditional import Validators
+from app.core.current_user import CurrentUser, get_current_user
+from app.core.rbac import user_has_permission
+from app.db.session import ReadSessionLocal, get_read_db
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+STREAM_PAGE_SIZE = 1000
+
+# (db, cursor) -> (rows, next_cursor) — نفس الـ page functions بتاعة app/queries
+FetchPage = Callable[[AsyncSession, Optional[str]], Awaitable[tuple[list[Any], Optional[str]]]]
+
+
+# ---------- auth ----------
+
+async def api_user(user: CurrentUser | None = Depends(get_current_user)) -> CurrentUser:
+    if not user:
+        raise HTTPException(status_code=401, detail="not authenticated")
+    return user
+
+
+def require_permission(code: str):
+    async def dep(
+        user: CurrentUser = Depends(api_user),
+        db: AsyncSession = Depends(get_read_db),
+    ) -> CurrentUser:
+        if not user.is_admin and not await user_has_permission(db, user.id, code):
+            raise HTTPException(status_code=403, detail=f"missing permission {code}")
+        return user
+
+    return dep
+
+
+# ---------- encoding ----------
+
+def _default(v: Any) -> Any:
+    if isinstance(v, Decimal):
+        return float(v)
+    raise TypeError
+
+
+def dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj, default=_default)
+
+
+class APIResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def clamp_limit(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def parse_fields(value: Optional[str], model: Type[BaseModel]) -> tuple[str, ...]:
+    """"id,full_name" -> the listed fields (unknown => 400); empty => every field of the model."""
+    available = tuple(model.model_fields)
+    picked = [f.strip() for f in (value or "").split(",") if f.strip()]
+    unknown = [f for f in picked if f not in available]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail={"unknown_fields": unknown, "available": list(available)},
+        )
+    return tuple(dict.fromkeys(picked)) or available
+
+
+# من الـ row على طول (نفس أسماء schemas.py) — من غير pydantic model لكل row
+def project(row: Any, fields: tuple[str, ...]) -> dict[str, Any]:
+    return {f: getattr(row, f) for f in fields}
+
+
+def page_response(
+    rows: list[Any], next_cursor: Optional[str], fields: tuple[str, ...], v: Optional[Validators] = None
+) -> Response:
+    response = APIResponse({"items": [project(r, fields) for r in rows], "next_cursor": next_cursor})
+    return v.apply(response) if v else response
+
+
+# ---------- streaming ----------
+
+async def _ndjson(fetch: FetchPage, fields: tuple[str, ...]) -> AsyncIterator[bytes]:
+    # session خاصة بالـ stream: الـ request session بتتقفل قبل ما الـ body يتبعت
+    async with ReadSessionLocal() as db:
+        cursor = None
+        while True:
+            rows, cursor = await fetch(db, cursor)
+            if rows:
+                yield b"".join(dumps(project(r, fields)) + b"\n" for r in rows)
+            if not cursor:
+                return
+            db.expunge_all()  # ORM rows من الصفحة اللي فاتت مالهاش لازمة
+
+
+def stream_response(fetch: FetchPage, fields: tuple[str, ...]) -> StreamingResponse:
+    return StreamingResponse(
+        _ndjson(fetch, fields),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-store"},
+    )
@@ -0,0 +1,47 @@
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.common import PAGE_SIZE, api_user, clamp_limit, page_response, parse_fields
+from app.api.v1.schemas import DepartmentOut, Page
+from app.core.conditional import validators
+from app.core.export import DEPARTMENT_COLUMNS, department_export_query
+from app.db.session import get_read_db
+from app.models.department import Department
+from app.queries.pagination import decode_cursor, encode_cursor
+
+router = APIRouter()
+
+
+async def departments_page(
+    db: AsyncSession, cursor: Optional[str] = None, limit: int = PAGE_SIZE
+) -> tuple[list[Any], Optional[str]]:
+    # نفس query بتاعة الـ export (id, name, headcount) + keyset على id
+    q = department_export_query(list(DEPARTMENT_COLUMNS))
+    after = decode_cursor(cursor)
+    if after and len(after) == 1:
+        q = q.where(Department.id > after[0])
+    rows = list((await db.execute(q.limit(limit + 1))).all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].id)
+    return rows, next_cursor
+
+
+@router.get("", response_model=Page[DepartmentOut], dependencies=[Depends(api_user)])
+async def list_departments(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+    fields: str = "",
+    db: AsyncSession = Depends(get_read_db),
+):
+    cols = parse_fields(fields, DepartmentOut)
+    v = await validators(request, db, ("employees", "departments"))
+    if v.matches(request):
+        return v.not_modified()
+    rows, next_cursor = await departments_page(db, cursor, clamp_limit(limit))
+    return page_response(rows, next_cursor, cols, v)
@@ -0,0 +1,91 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.common import (
+    PAGE_SIZE, STREAM_PAGE_SIZE, APIResponse, api_user, clamp_limit, page_response, parse_fields, project,
+    require_permission, stream_response,
+)
+from app.api.v1.schemas import EmployeeOut, Page, PayHistoryOut
+from app.core.conditional import validators
+from app.db.session import get_read_db
+from app.models.department import Department
+from app.models.employee import Employee
+from app.queries.employees import DEFAULT_SORT, DIRECTORY_COLUMNS, SORTS, EmployeeFilter, directory_page_query
+from app.queries.payroll import pay_history_page
+
+router = APIRouter()
+
+
+@router.get("", response_model=Page[EmployeeOut], dependencies=[Depends(api_user)])
+async def list_employees(
+    request: Request,
+    department_id: Optional[int] = None,
+    job_title: str = "",
+    sort: str = DEFAULT_SORT,
+    dir: str = "asc",
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+    fields: str = "",
+    stream: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+):
+    f = EmployeeFilter(department_id=department_id, job_title=job_title.strip() or None)
+    sort = sort if sort in SORTS else DEFAULT_SORT
+    desc = dir == "desc"
+    cols = parse_fields(fields, EmployeeOut)
+
+    if stream:
+        return stream_response(lambda s, c: directory_page_query(s, f, sort, desc, c, STREAM_PAGE_SIZE), cols)
+
+    v = await validators(request, db, ("employees", "departments"))
+    if v.matches(request):
+        return v.not_modified()
+    rows, next_cursor = await directory_page_query(db, f, sort, desc, cursor, clamp_limit(limit))
+    return page_response(rows, next_cursor, cols, v)
+
+
+@router.get("/{employee_id}", response_model=EmployeeOut, dependencies=[Depends(api_user)])
+async def get_employee(
+    employee_id: int,
+    fields: str = "",
+    db: AsyncSession = Depends(get_read_db),
+):
+    cols = parse_fields(fields, EmployeeOut)
+    row = (
+        await db.execute(
+            select(*DIRECTORY_COLUMNS)
+            .outerjoin(Department, Department.id == Employee.department_id)
+            .where(Employee.id == employee_id)
+        )
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="employee not found")
+    return APIResponse(project(row, cols))
+
+
+@router.get(
+    "/{employee_id}/pay-history",
+    response_model=Page[PayHistoryOut],
+    dependencies=[Depends(require_permission("payroll.view"))],
+)
+async def pay_history(
+    request: Request,
+    employee_id: int,
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+    fields: str = "",
+    stream: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+):
+    cols = parse_fields(fields, PayHistoryOut)
+    if stream:
+        return stream_response(lambda s, c: pay_history_page(s, employee_id, c, STREAM_PAGE_SIZE), cols)
+
+    v = await validators(request, db, ("payroll",))
+    if v.matches(request):
+        return v.not_modified()
+    rows, next_cursor = await pay_history_page(db, employee_id, cursor, clamp_limit(limit))
+    return page_response(rows, next_cursor, cols, v)
@@ -0,0 +1,38 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.common import (
+    PAGE_SIZE, STREAM_PAGE_SIZE, api_user, clamp_limit, page_response, parse_fields, stream_response,
+)
+from app.api.v1.schemas import LeaveOut, Page
+from app.core.conditional import validators
+from app.db.session import get_read_db
+from app.queries.leaves import STATUSES, leave_page
+
+router = APIRouter()
+
+
+@router.get("", response_model=Page[LeaveOut], dependencies=[Depends(api_user)])
+async def list_leaves(
+    request: Request,
+    employee_id: Optional[int] = None,
+    status: str = "",
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+    fields: str = "",
+    stream: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+):
+    cols = parse_fields(fields, LeaveOut)
+    status = status if status in STATUSES else ""
+
+    if stream:
+        return stream_response(lambda s, c: leave_page(s, employee_id, status, c, STREAM_PAGE_SIZE), cols)
+
+    v = await validators(request, db, ("leaves", "employees"))
+    if v.matches(request):
+        return v.not_modified()
+    rows, next_cursor = await leave_page(db, employee_id, status, cursor, clamp_limit(limit))
+    return page_response(rows, next_cursor, cols, v)
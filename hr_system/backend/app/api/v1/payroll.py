@@ -0,0 +1,76 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.common import (
+    PAGE_SIZE, STREAM_PAGE_SIZE, APIResponse, clamp_limit, page_response, parse_fields, project,
+    require_permission, stream_response,
+)
+from app.api.v1.schemas import Page, PayrollItemOut, PayrollRunDetail, PayrollRunOut, RunTotalsOut
+from app.core.conditional import validators
+from app.db.session import get_read_db
+from app.models.payroll_run import PayrollRun
+from app.queries.payroll import run_items_page, run_totals, runs_page
+
+router = APIRouter(dependencies=[Depends(require_permission("payroll.view"))])
+
+
+@router.get("/runs", response_model=Page[PayrollRunOut])
+async def list_runs(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+    fields: str = "",
+    db: AsyncSession = Depends(get_read_db),
+):
+    cols = parse_fields(fields, PayrollRunOut)
+    v = await validators(request, db, ("payroll",))
+    if v.matches(request):
+        return v.not_modified()
+    rows, next_cursor = await runs_page(db, cursor, clamp_limit(limit))
+    return page_response(rows, next_cursor, cols, v)
+
+
+@router.get("/runs/{run_id}", response_model=PayrollRunDetail)
+async def get_run(
+    request: Request,
+    run_id: int,
+    department_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    v = await validators(request, db, ("employees", "payroll"))
+    if v.matches(request):
+        return v.not_modified()
+    run = await db.get(PayrollRun, run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="payroll run not found")
+
+    totals = await run_totals(db, run_id, department_id)
+    return v.apply(APIResponse({
+        "run": project(run, tuple(PayrollRunOut.model_fields)),
+        "totals": project(totals, tuple(RunTotalsOut.model_fields)),
+    }))
+
+
+@router.get("/runs/{run_id}/items", response_model=Page[PayrollItemOut])
+async def list_run_items(
+    request: Request,
+    run_id: int,
+    department_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+    fields: str = "",
+    stream: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """department_id=0 => employees without a department."""
+    cols = parse_fields(fields, PayrollItemOut)
+    if stream:
+        return stream_response(lambda s, c: run_items_page(s, run_id, department_id, c, STREAM_PAGE_SIZE), cols)
+
+    v = await validators(request, db, ("employees", "departments", "payroll"))
+    if v.matches(request):
+        return v.not_modified()
+    rows, next_cursor = await run_items_page(db, run_id, department_id, cursor, clamp_limit(limit))
+    return page_response(rows, next_cursor, cols, v)
@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+
+from app.api.v1 import attendance, audit, departments, employees, leaves, payroll, system
+
+# JSON for machine clients; same query layer (app/queries) as the HTML pages
+router = APIRouter(prefix="/api/v1")
+router.include_router(employees.router, prefix="/employees", tags=["api: employees"])
+router.include_router(departments.router, prefix="/departments", tags=["api: departments"])
+router.include_router(attendance.router, prefix="/attendance", tags=["api: attendance"])
+router.include_router(leaves.router, prefix="/leaves", tags=["api: leaves"])
+router.include_router(payroll.router, prefix="/payroll", tags=["api: payroll"])
+router.include_router(audit.router, prefix="/audit", tags=["api: audit"])
+router.include_router(system.router, prefix="/system", tags=["api: system"])
@@ -0,0 +1,105 @@
+"""Response models for /api/v1 (OpenAPI contract); field names match the app/queries row attributes."""
+
+from datetime import date, datetime
+from typing import Any, Generic, Optional, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: list[T]
+    next_cursor: Optional[str] = None
+
+
+class EmployeeOut(BaseModel):
+    id: int
+    full_name: str
+    email: str
+    job_title: str
+    hire_date: Optional[date] = None
+    department_id: Optional[int] = None
+    department_name: Optional[str] = None
+
+
+class DepartmentOut(BaseModel):
+    id: int
+    name: str
+    headcount: int
+
+
+class AttendanceOut(BaseModel):
+    id: int
+    employee_id: int
+    check_in: Optional[datetime] = None
+    check_out: Optional[datetime] = None
+
+
+class LeaveOut(BaseModel):
+    id: int
+    employee_id: int
+    leave_type: str
+    status: str
+    from_date: date
+    to_date: date
+    reason: Optional[str] = None
+    approved_by: Optional[int] = None
+    created_at: datetime
+    decided_at: Optional[datetime] = None
+
+
+class PayrollRunOut(BaseModel):
+    id: int
+    period_start: date
+    period_end: date
+    status: str
+    notes: Optional[str] = None
+    created_by: Optional[int] = None
+    created_at: datetime
+
+
+class RunTotalsOut(BaseModel):
+    employees: int
+    base_total: float
+    allowances_total: float
+    deductions_total: float
+    net_total: float
+
+
+class PayrollRunDetail(BaseModel):
+    run: PayrollRunOut
+    totals: RunTotalsOut
+
+
+class PayrollItemOut(BaseModel):
+    id: int
+    employee_id: int
+    full_name: str
+    department_name: Optional[str] = None
+    base_salary: float
+    allowances_total: float
+    deductions_total: float
+    net_pay: float
+
+
+class PayHistoryOut(BaseModel):
+    id: int
+    run_id: int
+    period_start: date
+    period_end: date
+    base_salary: float
+    allowances_total: float
+    deductions_total: float
+    net_pay: float
+    generated_at: datetime
+
+
+class AuditOut(BaseModel):
+    id: int
+    actor_user_id: Optional[int] = None
+    action: str
+    entity: Optional[str] = None
+    entity_id: Optional[int] = None
+    meta: Optional[dict[str, Any]] = None
+    created_at: datetime
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.api.v1.common import APIResponse, api_user
+from app.core import page_cache
+from app.core.current_user import CurrentUser
+
+router = APIRouter()
+
+
+@router.get("/page-cache")
+async def page_cache_stats(user: CurrentUser = Depends(api_user)):
+    """Hit/miss counters and memory use of the rendered-page cache (this worker only)."""
+    if not user.is_admin:
+        raise HTTPException(status_code=403, detail="admin only")
+    return APIResponse(page_cache.stats())
@@ -0,0 +1,376 @@
+"""Self-hosted CSS/JS build (purged Tailwind subset, content-hashed, precompressed) and the /static app."""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Any, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from app.core.compression import negotiate
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = "app/templates"
+STATIC_DIR = "app/static"
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+MANIFEST = os.path.join(DIST_DIR, "manifest.json")
+SOURCES = [os.path.join(STATIC_DIR, "css", "theme.css")]
+JS_SOURCES = [os.path.join(STATIC_DIR, "js", "app.js")]
+BUNDLES = ("app.css", "app.js")  # manifest keys
+INPUTS = "inputs"                 # manifest key: input_hash() وقت الـ build
+PREVIOUS = "previous"             # manifest key: ملفات الـ builds اللي قبله (الأحدث الأول)
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+_HASHED = re.compile(r"\.[0-9a-f]{12}\.")
+
+
+# ---------- Tailwind subset ----------
+
+PREFLIGHT = """
+*,::before,::after{box-sizing:border-box;border-width:0;border-style:solid;border-color:#e5e7eb}
+html{line-height:1.5;-webkit-text-size-adjust:100%;tab-size:4;font-family:ui-sans-serif,system-ui,sans-serif}
+body{margin:0;line-height:inherit}
+hr{height:0;color:inherit;border-top-width:1px}
+h1,h2,h3,h4,h5,h6{font-size:inherit;font-weight:inherit}
+a{color:inherit;text-decoration:inherit}
+b,strong{font-weight:bolder}
+code,kbd,samp,pre{font-family:ui-monospace,SFMono-Regular,Menlo,Monaco,Consolas,monospace;font-size:1em}
+small{font-size:80%}
+table{text-indent:0;border-color:inherit;border-collapse:collapse}
+button,input,optgroup,select,textarea{font-family:inherit;font-size:100%;font-weight:inherit;line-height:inherit;color:inherit;margin:0;padding:0}
+button,select{text-transform:none}
+button,[type=button],[type=reset],[type=submit]{-webkit-appearance:button;background-color:transparent;background-image:none}
+summary{display:list-item}
+blockquote,dl,dd,h1,h2,h3,h4,h5,h6,hr,figure,p,pre{margin:0}
+fieldset{margin:0;padding:0}
+legend{padding:0}
+ol,ul,menu{list-style:none;margin:0;padding:0}
+textarea{resize:vertical}
+input::placeholder,textarea::placeholder{opacity:1;color:#9ca3af}
+button,[role=button]{cursor:pointer}
+:disabled{cursor:default}
+img,svg,video,canvas,audio,iframe,embed,object{display:block;vertical-align:middle}
+img,video{max-width:100%;height:auto}
+[hidden]{display:none}
+"""
+
+BREAKPOINTS = {"sm": "640px", "md": "768px", "lg": "1024px", "xl": "1280px"}
+
+_STATIC = {
+    "block": "display:block", "inline-block": "display:inline-block", "inline": "display:inline",
+    "flex": "display:flex", "inline-flex": "display:inline-flex", "grid": "display:grid",
+    "table": "display:table", "hidden": "display:none",
+    "flex-col": "flex-direction:column", "flex-row": "flex-direction:row",
+    "flex-wrap": "flex-wrap:wrap", "flex-1": "flex:1 1 0%", "flex-none": "flex:none",
+    "shrink-0": "flex-shrink:0", "grow": "flex-grow:1",
+    "items-center": "align-items:center", "items-start": "align-items:flex-start", "items-end": "align-items:flex-end",
+    "justify-between": "justify-content:space-between", "justify-center": "justify-content:center",
+    "justify-end": "justify-content:flex-end", "justify-start": "justify-content:flex-start",
+    "static": "position:static", "relative": "position:relative", "absolute": "position:absolute",
+    "fixed": "position:fixed", "sticky": "position:sticky",
+    "overflow-x-auto": "overflow-x:auto", "overflow-auto": "overflow:auto", "overflow-hidden": "overflow:hidden",
+    "cursor-pointer": "cursor:pointer", "underline": "text-decoration-line:underline",
+    "list-disc": "list-style-type:disc", "break-words": "overflow-wrap:break-word",
+    "font-normal": "font-weight:400", "font-medium": "font-weight:500",
+    "font-semibold": "font-weight:600", "font-bold": "font-weight:700",
+    "text-left": "text-align:left", "text-center": "text-align:center", "text-right": "text-align:right",
+    "w-full": "width:100%", "h-full": "height:100%", "min-h-screen": "min-height:100vh",
+    "mx-auto": "margin-left:auto;margin-right:auto",
+}
+
+_TEXT = {
+    "xs": ".75rem;line-height:1rem", "sm": ".875rem;line-height:1.25rem", "base": "1rem;line-height:1.5rem",
+    "lg": "1.125rem;line-height:1.75rem", "xl": "1.25rem;line-height:1.75rem",
+    "2xl": "1.5rem;line-height:2rem", "3xl": "1.875rem;line-height:2.25rem",
+}
+
+_MAX_W = {
+    "sm": "24rem", "md": "28rem", "lg": "32rem", "xl": "36rem", "2xl": "42rem", "3xl": "48rem",
+    "4xl": "56rem", "5xl": "64rem", "6xl": "72rem", "7xl": "80rem", "full": "100%",
+}
+
+_SPACING_PROPS = {
+    "p": ("padding",), "px": ("padding-left", "padding-right"), "py": ("padding-top", "padding-bottom"),
+    "pt": ("padding-top",), "pr": ("padding-right",), "pb": ("padding-bottom",), "pl": ("padding-left",),
+    "m": ("margin",), "mx": ("margin-left", "margin-right"), "my": ("margin-top", "margin-bottom"),
+    "mt": ("margin-top",), "mr": ("margin-right",), "mb": ("margin-bottom",), "ml": ("margin-left",),
+    "gap": ("gap",), "gap-x": ("column-gap",), "gap-y": ("row-gap",),
+    "w": ("width",), "h": ("height",),
+    "top": ("top",), "right": ("right",), "bottom": ("bottom",), "left": ("left",), "inset": ("inset",),
+}
+
+_SPACING = re.compile(r"^(-?)(p|px|py|pt|pr|pb|pl|m|mx|my|mt|mr|mb|ml|gap-x|gap-y|gap|w|h|top|right|bottom|left|inset)-(\d+(?:\.5)?|px)$")
+
+
+def _space(value: str) -> str:
+    if value == "px":
+        return "1px"
+    return "0px" if value == "0" else f"{float(value) * 0.25:g}rem"
+
+
+def _escape(cls: str) -> str:
+    return re.sub(r"([^a-zA-Z0-9_-])", r"\\\1", cls)
+
+
+def _utility(token: str) -> Optional[tuple[str, str]]:
+    """(selector suffix, declarations) for one utility, without variant prefix; None = unknown."""
+    if token in _STATIC:
+        return "", _STATIC[token]
+    m = _SPACING.match(token)
+    if m:
+        neg, key, value = m.groups()
+        v = ("-" if neg else "") + _space(value)
+        return "", ";".join(f"{p}:{v}" for p in _SPACING_PROPS[key])
+    m = re.match(r"^space-([xy])-(\d+(?:\.5)?)$", token)
+    if m:
+        side = "margin-top" if m.group(1) == "y" else "margin-left"
+        return " > :not([hidden]) ~ :not([hidden])", f"{side}:{_space(m.group(2))}"
+    m = re.match(r"^text-(\w+)$", token)
+    if m and m.group(1) in _TEXT:
+        return "", f"font-size:{_TEXT[m.group(1)]}"
+    m = re.match(r"^opacity-(\d+)$", token)
+    if m:
+        return "", f"opacity:{int(m.group(1)) / 100:g}"
+    m = re.match(r"^z-(\d+)$", token)
+    if m:
+        return "", f"z-index:{m.group(1)}"
+    m = re.match(r"^grid-cols-(\d+)$", token)
+    if m:
+        return "", f"grid-template-columns:repeat({m.group(1)},minmax(0,1fr))"
+    m = re.match(r"^col-span-(\d+)$", token)
+    if m:
+        return "", f"grid-column:span {m.group(1)}/span {m.group(1)}"
+    m = re.match(r"^max-w-(?:\[([0-9.]+(?:px|rem|%))\]|(\w+))$", token)
+    if m:
+        value = m.group(1) or _MAX_W.get(m.group(2))
+        return ("", f"max-width:{value}") if value else None
+    return None
+
+
+def _template_files(template_dir: str) -> list[str]:
+    return sorted(
+        os.path.join(root, name)
+        for root, _, files in os.walk(template_dir)
+        for name in files
+        if name.endswith(".html")
+    )
+
+
+def template_classes(template_dir: Optional[str] = None) -> set[str]:
+    found: set[str] = set()
+    for path in _template_files(template_dir or TEMPLATE_DIR):
+        with open(path, encoding="utf-8") as f:
+            src = f.read()
+        for m in re.finditer(r'class="([^"]*)"', src):
+            # {% if %}x{% endif %} => x بيفضل؛ {{ expr }} بيتشال
+            value = re.sub(r"\{\{.*?\}\}|\{%.*?%\}", " ", m.group(1))
+            found.update(value.split())
+    return found
+
+
+def utilities_css(classes: set[str], known: set[str] = frozenset()) -> str:
+    base: list[str] = []
+    media: dict[str, list[str]] = {bp: [] for bp in BREAKPOINTS}
+    unknown: list[str] = []
+    for cls in sorted(classes):
+        variant, _, token = cls.rpartition(":")
+        rule = _utility(token)
+        if rule is None or (variant and variant not in BREAKPOINTS):
+            if cls not in known:
+                unknown.append(cls)
+            continue
+        suffix, decls = rule
+        css = f".{_escape(cls)}{suffix}{{{decls}}}"
+        (media[variant] if variant else base).append(css)
+
+    if unknown:
+        logger.warning("assets: no CSS for classes %s", ", ".join(unknown))
+
+    # نفس ترتيب Tailwind: الـ base الأول وبعدين الـ breakpoints من الصغير للكبير
+    out = base[:]
+    for bp, rules in media.items():
+        if rules:
+            out.append(f"@media (min-width:{BREAKPOINTS[bp]}){{{''.join(rules)}}}")
+    return "\n".join(out)
+
+
+def minify(css: str) -> str:
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,])\s*", r"\1", css)
+    css = re.sub(r"([{;])\s*([-a-z]+)\s*:\s*", r"\1\2:", css)
+    return css.replace(";}", "}").strip()
+
+
+# ---------- build ----------
+
+def _write(path: str, data: bytes):
+    # tmp + replace: أكتر من worker ممكن يبني في نفس الوقت
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _compress(path: str, data: bytes):
+    _write(path + ".gz", gzip.compress(data, 9, mtime=0))
+    try:
+        import brotli  # optional dependency
+    except ImportError:
+        return
+    _write(path + ".br", brotli.compress(data, quality=11))
+
+
+def _emit(logical: str, data: bytes) -> str:
+    """Write dist/<stem>.<sha>.<ext> (+ .gz/.br) once; returns the file name."""
+    stem, ext = logical.rsplit(".", 1)
+    name = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}.{ext}"
+    path = os.path.join(DIST_DIR, name)
+    if not os.path.exists(path):
+        _write(path, data)
+        _compress(path, data)
+    return name
+
+
+def input_hash() -> str:
+    """sha256 of everything build() reads: templates, CSS/JS sources and this builder."""
+    h = hashlib.sha256()
+    templates = _template_files(TEMPLATE_DIR)
+    labelled = [(os.path.relpath(p, TEMPLATE_DIR), p) for p in templates]
+    labelled += [(f"source:{i}", p) for i, p in enumerate(SOURCES + JS_SOURCES)]
+    # الـ utilities/preflight جوه الملف ده — تعديلهم لازم يعمل build تاني
+    labelled.append(("builder", __file__))
+    for label, path in labelled:
+        with open(path, "rb") as f:
+            data = f.read()
+        h.update(f"{label}\0{len(data)}\0".encode("utf-8"))
+        h.update(data)
+    return h.hexdigest()[:16]
+
+
+def _previous_builds(current: list[str]) -> list[str]:
+    """Files of the last ASSET_KEEP_BUILDS builds per bundle (from the old manifest), newest first."""
+    try:
+        with open(MANIFEST, encoding="utf-8") as f:
+            old = json.load(f)
+    except (OSError, ValueError):
+        return []
+    # workers بدأت قبل الـ build (أو rolling restart) لسه بترندر الـ URLs القديمة
+    history = [os.path.basename(old[b]) for b in BUNDLES if b in old] + list(old.get(PREVIOUS, []))
+    kept: list[str] = []
+    for bundle in BUNDLES:
+        stem, ext = bundle.rsplit(".", 1)
+        same = [n for n in dict.fromkeys(history)
+                if n.startswith(f"{stem}.") and n.endswith(f".{ext}") and n not in current]
+        kept += same[:settings.ASSET_KEEP_BUILDS]
+    return kept
+
+
+# CSS = theme.css + preflight + الـ utilities المستخدمة في الـ templates بس، بنفس ترتيب الـ CDN
+# (الـ <style> بتاعه كان بعد theme.css)؛ app.<sha>.css/js + .gz/.br، والـ templates بتاخد
+# الاسم من dist/manifest.json عن طريق asset_url()
+def build() -> dict[str, Any]:
+    # قبل ما نقرا: لو حاجة اتغيرت في النص الـ hash مش هيطابق والـ startup الجاي يبني تاني
+    inputs = input_hash()
+    theme = ""
+    for src in SOURCES:
+        with open(src, encoding="utf-8") as f:
+            theme += f.read() + "\n"
+    known = set(re.findall(r"\.([a-zA-Z][\w-]*)", theme))
+    css = minify("\n".join([theme, PREFLIGHT, utilities_css(template_classes(), known)])).encode("utf-8")
+
+    # JS من غير minify: صغير والـ gzip/br بيعمل الباقي
+    js = b""
+    for src in JS_SOURCES:
+        with open(src, "rb") as f:
+            js += f.read() + b"\n"
+
+    os.makedirs(DIST_DIR, exist_ok=True)
+    files = [_emit("app.css", css), _emit("app.js", js)]
+    kept = _previous_builds(files)
+
+    manifest = dict(zip(BUNDLES, (f"dist/{f}" for f in files)))
+    manifest[INPUTS] = inputs
+    manifest[PREVIOUS] = kept
+    _write(MANIFEST, json.dumps(manifest, indent=2).encode("utf-8"))
+
+    # أقدم من ASSET_KEEP_BUILDS: مفيش page لسه شايلة الـ URL ده
+    for old in os.listdir(DIST_DIR):
+        if old.startswith("app.") and _HASHED.search(old) and not any(old.startswith(f) for f in files + kept):
+            os.remove(os.path.join(DIST_DIR, old))
+
+    _manifest.clear()
+    _manifest.update(manifest)
+    return manifest
+
+
+_manifest: dict[str, Any] = {}
+
+
+def ensure_built(force: bool = False) -> dict[str, Any]:
+    if not force and os.path.exists(MANIFEST):
+        with open(MANIFEST, encoding="utf-8") as f:
+            manifest = json.load(f)
+        # manifest من build أقدم (bundle ناقص) أو templates/sources اتغيرت من بعده => build تاني
+        if all(b in manifest for b in BUNDLES) and manifest.get(INPUTS) == input_hash():
+            _manifest.clear()
+            _manifest.update(manifest)
+            return _manifest
+    return build()
+
+
+def asset_url(name: str) -> str:
+    if not _manifest:
+        ensure_built()
+    return f"/static/{_manifest.get(name, name)}"
+
+
+# ---------- serving ----------
+
+# precompressed variants بترتيب التفضيل لو الـ q متساوي
+_VARIANTS = (("br", ".br"), ("gzip", ".gz"))
+
+
+class AssetFiles(StaticFiles):
+    """StaticFiles + precompressed variants + cache headers."""
+
+    def file_response(self, full_path, stat_result, scope: Scope, status_code: int = 200) -> Response:
+        available = tuple(enc for enc, ext in _VARIANTS if os.path.isfile(str(full_path) + ext))
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), available) if available else None
+
+        if encoding:
+            variant = str(full_path) + dict(_VARIANTS)[encoding]
+            response = super().file_response(variant, os.stat(variant), scope, status_code)
+            response.headers["content-encoding"] = encoding
+            # content-type بتاع الأصل مش .gz/.br
+            if status_code == 200 and response.status_code == 200:
+                response.headers["content-type"] = self._media_type(str(full_path))
+        else:
+            response = super().file_response(full_path, stat_result, scope, status_code)
+
+        response.headers["vary"] = "Accept-Encoding"
+        response.headers["cache-control"] = IMMUTABLE if _HASHED.search(os.path.basename(str(full_path))) else REVALIDATE
+        return response
+
+    @staticmethod
+    def _media_type(path: str) -> str:
+        import mimetypes
+
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        return media_type + ("; charset=utf-8" if media_type.startswith("text/") else "")
+
+
+# deploy step: python -m app.core.assets (الـ startup بيبني بس لو الـ manifest ناقص أو الـ inputs اتغيرت)
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(build())
@@ -1,10 +1,126 @@
+import asyncio
+import logging
 from datetime import datetime
 from typing import Any, Optional
 
+from sqlalchemy import event, insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
+from app.core import kpi
+from app.core.config import settings
+from app.core.refcache import mark_changed
 from app.models.audit_log import AuditLog
 
+logger = logging.getLogger(__name__)
+
+
+class AuditSink:
+    """Buffers audit rows in memory and bulk-inserts them off the request path.
+
+    Flushes when AUDIT_BATCH_SIZE rows are queued or every AUDIT_FLUSH_INTERVAL
+    seconds, whichever comes first. stop() drains whatever is still queued.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run(), name="audit-sink")
+
+    async def stop(self):
+        if not self._task:
+            return
+        # None = sentinel: الـ worker يفضّي اللي في الـ queue ويخرج
+        self._queue.put_nowait(None)
+        await self._task
+        self._task = None
+
+    def put_many(self, rows: list[dict[str, Any]]):
+        for row in rows:
+            self._queue.put_nowait(row)
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            batch: list[dict[str, Any]] = []
+            first = await self._queue.get()
+            if first is None:
+                stopping = True
+            else:
+                batch.append(first)
+                deadline = asyncio.get_running_loop().time() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    timeout = deadline - asyncio.get_running_loop().time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+
+            if stopping:
+                while not self._queue.empty():
+                    item = self._queue.get_nowait()
+                    if item is not None:
+                        batch.append(item)
+
+            if batch:
+                await self._flush(batch)
+
+    async def _flush(self, batch: list[dict[str, Any]]):
+        from app.db.session import AsyncSessionLocal
+
+        for attempt in (1, 2):
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(insert(AuditLog), batch)
+                    await kpi.bump_audit(db, batch)
+                    await mark_changed(db, "audit")
+                    await db.commit()
+                return
+            except Exception:
+                if attempt == 2:
+                    logger.exception("audit flush failed, dropped %d rows", len(batch))
+                    for row in batch:
+                        logger.error("audit row lost: %r", row)
+
+
+audit_sink = AuditSink(
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL,
+)
+
+
+# buffered rows بتستنى الـ commit بتاع الـ business write — لو حصل rollback بتتشال
+@event.listens_for(Session, "after_commit")
+def _enqueue_after_commit(session: Session):
+    rows = session.info.pop("audit_rows", None)
+    if rows:
+        if audit_sink.running:
+            audit_sink.put_many(rows)
+        else:
+            logger.error("audit sink stopped, dropped %d rows", len(rows))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session):
+    session.info.pop("audit_rows", None)
+
 
 async def log_event(
     db: AsyncSession,
@@ -13,15 +129,25 @@ async def log_event(
     entity: Optional[str] = None,
     entity_id: Optional[int] = None,
     meta: Optional[dict[str, Any]] = None,
+    durable: Optional[bool] = None,
 ):
-    db.add(
-        AuditLog(
-            actor_user_id=actor_user_id,
-            action=action,
-            entity=entity,
-            entity_id=entity_id,
-            meta=meta,
-            created_at=datetime.utcnow(),
-        )
+    row = dict(
+        actor_user_id=actor_user_id,
+        action=action,
+        entity=entity,
+        entity_id=entity_id,
+        meta=meta,
+        created_at=datetime.utcnow(),
     )
-    # commit مش هنا — نخليه مع نفس transaction بتاعت الendpoint
+
+    if durable is None:
+        durable = settings.AUDIT_DURABLE
+
+    if durable or not audit_sink.running:
+        db.add(AuditLog(**row))
+        await kpi.bump_audit(db, [row])
+        await mark_changed(db, "audit")
+        # commit مش هنا — نخليه مع نفس transaction بتاعت الendpoint
+        return
+
+    db.info.setdefault("audit_rows", []).append(row)
@@ -0,0 +1,380 @@
+"""Monthly audit_logs partitions, retention and archives (AUDIT_ARCHIVE_DIR/audit-YYYY_MM.ndjson.gz + .sha256)."""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import sys
+from collections import deque
+from datetime import date, datetime
+from typing import Any, Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.core.refcache import bump_shared
+from app.models.audit_log import AuditLog
+from app.queries.audit import AuditFilter
+
+ARCHIVE_COLUMNS = ("id", "actor_user_id", "action", "entity", "entity_id", "meta", "created_at")
+
+
+# ---------- months ----------
+
+def month_start(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def next_month(d: date) -> date:
+    return date(d.year + d.month // 12, d.month % 12 + 1, 1)
+
+
+def add_months(d: date, n: int) -> date:
+    idx = d.year * 12 + (d.month - 1) + n
+    return date(idx // 12, idx % 12 + 1, 1)
+
+
+def month_label(d: date) -> str:
+    return f"{d.year:04d}_{d.month:02d}"
+
+
+def _as_dt(d: date) -> datetime:
+    return datetime(d.year, d.month, d.day)
+
+
+# ---------- Postgres partitions ----------
+
+async def pg_is_partitioned(conn: AsyncConnection) -> bool:
+    res = await conn.execute(text(
+        "select 1 from pg_partitioned_table pt join pg_class c on c.oid = pt.partrelid "
+        "where c.relname = 'audit_logs'"
+    ))
+    return res.first() is not None
+
+
+async def pg_partition_exists(conn: AsyncConnection, name: str) -> bool:
+    res = await conn.execute(text("select to_regclass(:n)"), {"n": name})
+    return res.scalar() is not None
+
+
+async def pg_create_month_partition(conn: AsyncConnection, month: date):
+    name = f"audit_logs_{month_label(month)}"
+    if await pg_partition_exists(conn, name):
+        return
+    await conn.execute(text(
+        f"CREATE TABLE {name} PARTITION OF audit_logs "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+    ))
+
+
+async def pg_ensure_partitions(conn: AsyncConnection, ahead: int = 2):
+    if not await pg_is_partitioned(conn):
+        return
+    this_month = month_start(datetime.utcnow().date())
+    for i in range(ahead + 1):
+        await pg_create_month_partition(conn, add_months(this_month, i))
+
+
+async def pg_missing_triggers(conn: AsyncConnection, definitions: list[str]) -> list[str]:
+    now = set((await conn.execute(text(
+        "select pg_get_triggerdef(oid) from pg_trigger "
+        "where tgrelid = 'audit_logs'::regclass and not tgisinternal"
+    ))).scalars().all())
+    return [d for d in definitions if d not in now]
+
+
+async def pg_convert_to_partitioned(conn: AsyncConnection):
+    """One-time: rebuild audit_logs as RANGE (created_at) partitioned table."""
+    if await pg_is_partitioned(conn):
+        return
+
+    seq = (await conn.execute(text("select pg_get_serial_sequence('audit_logs', 'id')"))).scalar()
+    bounds = (await conn.execute(text("select min(created_at), max(created_at) from audit_logs"))).first()
+    # triggers (search_docs من m0004) بتروح مع DROP TABLE audit_logs_legacy — نعيدها على الـ parent
+    triggers = (await conn.execute(text(
+        "select pg_get_triggerdef(oid) from pg_trigger "
+        "where tgrelid = 'audit_logs'::regclass and not tgisinternal order by tgname"
+    ))).scalars().all()
+
+    await conn.execute(text("ALTER TABLE audit_logs RENAME TO audit_logs_legacy"))
+    await conn.execute(text(
+        "CREATE TABLE audit_logs (LIKE audit_logs_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        "PARTITION BY RANGE (created_at)"
+    ))
+    # partition key لازم يبقى جزء من الـ PK
+    await conn.execute(text("ALTER TABLE audit_logs ADD PRIMARY KEY (id, created_at)"))
+    await conn.execute(text(
+        "ALTER TABLE audit_logs ADD FOREIGN KEY (actor_user_id) REFERENCES users(id) ON DELETE SET NULL"
+    ))
+    await conn.execute(text("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT"))
+
+    this_month = month_start(datetime.utcnow().date())
+    first = month_start(bounds[0].date()) if bounds and bounds[0] else this_month
+    m = first
+    while m <= add_months(this_month, 2):
+        await pg_create_month_partition(conn, m)
+        m = next_month(m)
+
+    await conn.execute(text("INSERT INTO audit_logs SELECT * FROM audit_logs_legacy"))
+    if seq:
+        await conn.execute(text(f"ALTER SEQUENCE {seq} OWNED BY NONE"))
+    await conn.execute(text("DROP TABLE audit_logs_legacy"))
+    if seq:
+        await conn.execute(text(f"ALTER SEQUENCE {seq} OWNED BY audit_logs.id"))
+
+    # indexes على الـ parent بتتعمل تلقائي على كل partition
+    for ix in AuditLog.__table__.indexes:
+        await conn.run_sync(lambda sync_conn, ix=ix: ix.create(sync_conn, checkfirst=True))
+
+    # بعد الـ copy: الـ search docs للصفوف القديمة موجودة، والجديدة تتعمل من الـ trigger
+    # (row triggers على partitioned table بتتورث لكل partition — Postgres 11+)
+    for ddl in triggers:
+        await conn.execute(text(ddl))
+    missing = await pg_missing_triggers(conn, triggers)
+    if missing:
+        raise RuntimeError(f"audit_logs triggers not recreated: {missing}")
+
+
+async def ensure_audit_partitions():
+    from app.db.session import engine
+
+    if engine.dialect.name != "postgresql":
+        return
+    async with engine.begin() as conn:
+        await pg_ensure_partitions(conn)
+
+
+# ---------- archive files ----------
+
+def archive_path(month: date, archive_dir: Optional[str] = None) -> str:
+    return os.path.join(archive_dir or settings.AUDIT_ARCHIVE_DIR, f"audit-{month_label(month)}.ndjson.gz")
+
+
+def _sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _row_to_json(row: Any) -> str:
+    rec = dict(zip(ARCHIVE_COLUMNS, row))
+    created = rec["created_at"]
+    rec["created_at"] = created.isoformat() if isinstance(created, datetime) else created
+    if isinstance(rec["meta"], str):
+        rec["meta"] = json.loads(rec["meta"])
+    return json.dumps(rec, ensure_ascii=False, separators=(",", ":"))
+
+
+async def export_month(
+    conn: AsyncConnection, month: date, archive_dir: Optional[str] = None
+) -> tuple[Optional[str], int]:
+    """Stream one month to gzip NDJSON; returns (path, rows). path is None for an empty month."""
+    path = archive_path(month, archive_dir)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+
+    q = (
+        select(*[getattr(AuditLog, c) for c in ARCHIVE_COLUMNS])
+        .where(AuditLog.created_at >= _as_dt(month), AuditLog.created_at < _as_dt(next_month(month)))
+        .order_by(AuditLog.created_at, AuditLog.id)
+    )
+
+    rows = 0
+    with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as out:
+        result = await conn.stream(q.execution_options(yield_per=2000))
+        async for row in result:
+            out.write(_row_to_json(row))
+            out.write("\n")
+            rows += 1
+
+    if rows == 0:
+        os.remove(tmp)
+        return None, 0
+
+    os.replace(tmp, path)
+    digest = _sha256_file(path)
+    with open(path + ".sha256", "w", encoding="ascii") as f:
+        f.write(f"{digest}  {os.path.basename(path)}  rows={rows}\n")
+    return path, rows
+
+
+def verify_archive(path: str) -> Optional[int]:
+    """Checksum + full decompress; returns row count, or None if the file is bad."""
+    try:
+        with open(path + ".sha256", encoding="ascii") as f:
+            expected = f.read().split()[0]
+        if _sha256_file(path) != expected:
+            return None
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return sum(1 for _ in f)
+    except (OSError, EOFError, IndexError):
+        return None
+
+
+# ---------- retention ----------
+
+async def drop_month(conn: AsyncConnection, month: date):
+    name = f"audit_logs_{month_label(month)}"
+    if conn.dialect.name == "postgresql" and await pg_is_partitioned(conn):
+        if await pg_partition_exists(conn, name):
+            # DROP TABLE مش بيشغّل delete triggers — نشيل الـ search docs بإيدنا
+            await conn.execute(text(f"DELETE FROM search_docs WHERE id IN (SELECT id * 4 + 3 FROM {name})"))
+            await conn.execute(text(f"ALTER TABLE audit_logs DETACH PARTITION {name}"))
+            await conn.execute(text(f"DROP TABLE {name}"))
+    # اللي وقع في default partition / SQLite hot table
+    await conn.execute(
+        AuditLog.__table__.delete().where(
+            AuditLog.created_at >= _as_dt(month),
+            AuditLog.created_at < _as_dt(next_month(month)),
+        )
+    )
+
+
+async def run_retention(keep_months: Optional[int] = None, archive_dir: Optional[str] = None) -> list[tuple[str, int]]:
+    from app.db.session import engine
+
+    keep = settings.AUDIT_HOT_MONTHS if keep_months is None else keep_months
+    cutoff = add_months(month_start(datetime.utcnow().date()), -keep)
+
+    async with engine.connect() as conn:
+        oldest = (await conn.execute(select(func.min(AuditLog.created_at)))).scalar()
+    if oldest is None:
+        return []
+
+    done: list[tuple[str, int]] = []
+    month = month_start(oldest.date())
+    while month < cutoff:
+        async with engine.begin() as conn:
+            path, rows = await export_month(conn, month, archive_dir)
+            if path and verify_archive(path) != rows:
+                raise RuntimeError(f"archive verification failed for {path}")
+            await drop_month(conn, month)
+            await bump_shared(conn, "audit")
+        if path:
+            done.append((path, rows))
+        month = next_month(month)
+
+    async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            await pg_ensure_partitions(conn)
+    return done
+
+
+# ---------- archive search ----------
+
+def _matches(rec: dict[str, Any], f: AuditFilter) -> bool:
+    if f.action and rec.get("action") != f.action:
+        return False
+    if f.entity and rec.get("entity") != f.entity:
+        return False
+    if f.entity_id is not None and rec.get("entity_id") != f.entity_id:
+        return False
+    if f.actor_user_id is not None and rec.get("actor_user_id") != f.actor_user_id:
+        return False
+    if f.employee_id is not None and (rec.get("meta") or {}).get("employee_id") != f.employee_id:
+        return False
+    return True
+
+
+def archived_months(archive_dir: Optional[str] = None) -> list[date]:
+    folder = archive_dir or settings.AUDIT_ARCHIVE_DIR
+    if not os.path.isdir(folder):
+        return []
+    months = []
+    for name in os.listdir(folder):
+        if name.startswith("audit-") and name.endswith(".ndjson.gz"):
+            y, m = name[len("audit-"):-len(".ndjson.gz")].split("_")
+            months.append(date(int(y), int(m), 1))
+    return sorted(months)
+
+
+def _naive(value: Optional[datetime]) -> Optional[datetime]:
+    return value.replace(tzinfo=None) if value else None
+
+
+def _scan_month(
+    path: str,
+    f: AuditFilter,
+    before: Optional[tuple[datetime, int]],
+    limit: int,
+) -> list[dict[str, Any]]:
+    """The newest `limit` matches of one archive that sort below `before`, newest first.
+
+    The file is ordered by (created_at, id), so it is read as a stream, stops
+    at `before` / f.until, and only `limit` records are ever held in memory.
+    """
+    since, until = _naive(f.since), _naive(f.until)
+    keep: deque[dict[str, Any]] = deque(maxlen=limit)
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            rec = json.loads(line)
+            created = datetime.fromisoformat(rec["created_at"]).replace(tzinfo=None)
+            if before and (created, rec["id"]) >= before:
+                break
+            if until and created > until:
+                break
+            if since and created < since:
+                continue
+            rec["created_at"] = created
+            if _matches(rec, f):
+                keep.append(rec)
+    keep.reverse()
+    return list(keep)
+
+
+def search_archive(
+    f: AuditFilter,
+    limit: int,
+    before: Optional[tuple[datetime, int]] = None,
+    archive_dir: Optional[str] = None,
+) -> list[dict[str, Any]]:
+    """One newest-first page (up to `limit` records) of archived rows matching `f`.
+
+    `before` = (created_at, id) of the last row of the previous page; months
+    after it are never opened, and the scan stops as soon as the page is full.
+    Blocking file I/O — call it from a thread (run_in_threadpool) in requests.
+    """
+    before = (_naive(before[0]), before[1]) if before else None
+    since, until = _naive(f.since), _naive(f.until)
+    found: list[dict[str, Any]] = []
+    for month in reversed(archived_months(archive_dir)):
+        if since and _as_dt(next_month(month)) <= since:
+            break
+        if until and _as_dt(month) > until:
+            continue
+        if before and _as_dt(month) > before[0]:
+            continue
+        found.extend(_scan_month(archive_path(month, archive_dir), f, before, limit - len(found)))
+        if len(found) >= limit:
+            break
+    return found
+
+
+# python -m app.core.audit_retention partition   (Postgres، مرة واحدة)
+# python -m app.core.audit_retention run         (export + drop للشهور المقفولة)
+async def _main(cmd: str):
+    from app.db.session import engine
+    import app.models  # noqa: F401
+
+    if cmd == "partition":
+        if engine.dialect.name != "postgresql":
+            print("native partitioning is Postgres-only; SQLite uses export + delete", file=sys.stderr)
+            return
+        async with engine.begin() as conn:
+            await pg_convert_to_partitioned(conn)
+        print("audit_logs is partitioned by month")
+    elif cmd == "run":
+        for path, rows in await run_retention():
+            print(f"archived {rows} rows -> {path}")
+    else:
+        print(__doc__, file=sys.stderr)
+        sys.exit(2)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main(sys.argv[1] if len(sys.argv) > 1 else ""))
@@ -0,0 +1,172 @@
+"""Response compression middleware (br if brotli is installed, else gzip), streaming-safe."""
+
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+COMPRESSIBLE = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/x-ndjson",
+    "image/svg+xml",
+)
+
+try:
+    import brotli  # optional dependency
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+class _Encoder:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._c = brotli.Compressor(quality=settings.COMPRESS_BROTLI_QUALITY)
+        else:
+            self._c = zlib.compressobj(settings.COMPRESS_GZIP_LEVEL, zlib.DEFLATED, 31)  # 31 = gzip header
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._c.process(data) + self._c.flush()
+        return self._c.compress(data) + self._c.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._c.process(data) + self._c.finish()
+        return self._c.compress(data) + self._c.flush()
+
+
+def accepted_encodings(accept_encoding: str) -> dict[str, float]:
+    """Accept-Encoding -> {coding: q}; `*` stands for every coding not listed."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, *params = (p.strip() for p in part.split(";"))
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+def negotiate(accept_encoding: str, available: tuple[str, ...]) -> Optional[str]:
+    """Highest-q coding from `available` (listed in server preference order); None = identity."""
+    accepted = accepted_encodings(accept_encoding)
+    best, best_q = None, 0.0
+    for coding in available:
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        # نفس الـ q => اللي قبله في available
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    if brotli is not None and settings.COMPRESS_BROTLI_QUALITY >= 0:
+        return negotiate(accept_encoding, ("br", "gzip"))
+    return negotiate(accept_encoding, ("gzip",))
+
+
+# زي GZipMiddleware + br، ومابيلمسش: content types مش text، أصغر من COMPRESS_MIN_SIZE، 304،
+# أو اللي معاه Content-Encoding أصلاً (static precompressed، exports بـ ?gzip=1)؛
+# الـ streaming بيتضغط chunk بـ chunk مع sync flush عشان الصفوف توصل أول بأول
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESS_MIN_SIZE if minimum_size is None else minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _Responder(self.app, encoding, self.minimum_size)(scope, receive, send)
+
+
+class _Responder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send: Send
+        self.start: Optional[Message] = None
+        self.encoder: Optional[_Encoder] = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self._send)
+
+    def _compressible(self, message: Message) -> bool:
+        headers = Headers(raw=message["headers"])
+        if message["status"] < 200 or message["status"] in (204, 304):
+            return False
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").lower()
+        return content_type.startswith(COMPRESSIBLE)
+
+    def _start_encoded(self) -> MutableHeaders:
+        self.encoder = _Encoder(self.encoding)
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        # strong ETag => weak: نفس المحتوى بـ encoding مختلف
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = "W/" + etag
+        return headers
+
+    async def _send(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            self.passthrough = not self._compressible(message)
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is None:
+            if not more_body:
+                # response كامل في message واحدة
+                if len(body) < self.minimum_size:
+                    await self.send(self.start)
+                    await self.send(message)
+                    return
+                headers = self._start_encoded()
+                body = self.encoder.finish(body)
+                headers["Content-Length"] = str(len(body))
+                await self.send(self.start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+
+            headers = self._start_encoded()
+            del headers["Content-Length"]
+            await self.send(self.start)
+            await self.send({"type": "http.response.body", "body": self.encoder.chunk(body), "more_body": True})
+            return
+
+        if more_body:
+            await self.send({"type": "http.response.body", "body": self.encoder.chunk(body), "more_body": True})
+        else:
+            await self.send({"type": "http.response.body", "body": self.encoder.finish(body)})
@@ -0,0 +1,86 @@
+"""Conditional GET (weak ETag from data versions, URL, user and build -> 304)."""
+
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import Response
+
+from app.core.config import settings
+from app.core.refcache import data_version
+from app.core.templating import TEMPLATE_DIR
+
+# private: صفحات فيها بيانات user؛ no-cache = المتصفح يسأل كل مرة (بـ If-None-Match)
+CACHE_CONTROL = "private, no-cache"
+
+_build: str | None = None
+
+
+def build_id() -> str:
+    """Hash of template files + CSS manifest (cached; recomputed while TEMPLATES_AUTO_RELOAD)."""
+    global _build
+    if _build is not None and not settings.TEMPLATES_AUTO_RELOAD:
+        return _build
+
+    from app.core.assets import MANIFEST
+
+    h = hashlib.sha1()
+    for root, _, files in sorted(os.walk(TEMPLATE_DIR)):
+        for name in sorted(files):
+            st = os.stat(os.path.join(root, name))
+            h.update(f"{root}/{name}:{st.st_size}:{st.st_mtime_ns};".encode())
+    if os.path.exists(MANIFEST):
+        with open(MANIFEST, "rb") as f:
+            h.update(f.read())
+    _build = h.hexdigest()[:12]
+    return _build
+
+
+@dataclass(frozen=True)
+class Validators:
+    etag: str
+
+    def matches(self, request: Request) -> bool:
+        # ETag بس: الـ versions counters مش وقت، وLast-Modified بدقة ثانية (ومن process واحدة)
+        # كان ممكن يرجع 304 لصفحة اتغيرت في نفس الثانية أو على worker تاني
+        inm = request.headers.get("if-none-match")
+        if inm is None:
+            return False
+        tags = {t.strip().removeprefix("W/") for t in inm.split(",")}
+        return "*" in tags or self.etag.removeprefix("W/") in tags
+
+    def headers(self) -> dict[str, str]:
+        return {
+            "ETag": self.etag,
+            "Cache-Control": CACHE_CONTROL,
+            "Vary": "Cookie",
+        }
+
+    def not_modified(self) -> Response:
+        return Response(status_code=304, headers=self.headers())
+
+    def apply(self, response: Response) -> Response:
+        if response.status_code == 200:
+            response.headers.update(self.headers())
+        return response
+
+
+# في الـ handler بعد الـ login/permission checks:
+#     v = await validators(request, db, ("departments",))
+#     if v.matches(request): return v.not_modified()
+#     return v.apply(templates.TemplateResponse(...))
+# مفيش DB غير الـ refcache poll، فالـ 304 بيوفر الـ queries والـ render
+async def validators(request: Request, db: AsyncSession, depends: tuple[str, ...], *extra: Any) -> Validators:
+    key = repr((
+        request.url.path,
+        request.url.query,
+        request.session.get("user_id"),
+        await data_version(db, depends),
+        extra,
+        build_id(),
+    ))
+    # weak: نفس المحتوى ممكن يتبعت gzip/br/identity
+    return Validators(etag=f'W/"{hashlib.sha1(key.encode()).hexdigest()[:20]}"')
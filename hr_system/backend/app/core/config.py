@@ -14,6 +14,91 @@ class Settings:
     ADMIN_USERNAME: str = os.getenv("ADMIN_USERNAME", "admin")
     ADMIN_PASSWORD: str = os.getenv("ADMIN_PASSWORD", "admin123")
 
+    # seconds a resolved session user stays in the in-process cache
+    # (other workers drop it when ref_versions "users" moves — REFCACHE_SHARED=1)
+    CURRENT_USER_CACHE_TTL: float = float(os.getenv("CURRENT_USER_CACHE_TTL", "30"))
+
+    # bcrypt runs on a bounded thread pool, never on the event loop
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+    # failed-login throttling
+    LOGIN_MAX_FAILURES: int = int(os.getenv("LOGIN_MAX_FAILURES", "5"))
+    LOGIN_IP_FAILURE_FACTOR: int = int(os.getenv("LOGIN_IP_FAILURE_FACTOR", "4"))
+    LOGIN_LOCKOUT_SECONDS: float = float(os.getenv("LOGIN_LOCKOUT_SECONDS", "300"))
+    # cap on tracked usernames + IPs; the oldest are dropped first
+    LOGIN_THROTTLE_MAX_KEYS: int = int(os.getenv("LOGIN_THROTTLE_MAX_KEYS", "100000"))
+
+    # audit: buffered bulk inserts, or AUDIT_DURABLE=1 to write in the business transaction
+    AUDIT_DURABLE: bool = os.getenv("AUDIT_DURABLE", "0") == "1"
+    AUDIT_BATCH_SIZE: int = int(os.getenv("AUDIT_BATCH_SIZE", "200"))
+    AUDIT_FLUSH_INTERVAL: float = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))
+
+    # audit retention: months kept in the hot table, older ones go to gzip NDJSON archives
+    AUDIT_HOT_MONTHS: int = int(os.getenv("AUDIT_HOT_MONTHS", "3"))
+    AUDIT_ARCHIVE_DIR: str = os.getenv("AUDIT_ARCHIVE_DIR", "audit_archive")
+
+    # connection pool + per-connection statement cache (both backends)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))
+
+    # SQLite connect-time pragmas (empty value = leave SQLite default)
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_CACHE_SIZE: str = os.getenv("SQLITE_CACHE_SIZE", "-65536")  # negative = KiB (64 MB)
+    SQLITE_MMAP_SIZE: str = os.getenv("SQLITE_MMAP_SIZE", "268435456")
+    SQLITE_TEMP_STORE: str = os.getenv("SQLITE_TEMP_STORE", "MEMORY")
+    SQLITE_BUSY_TIMEOUT: str = os.getenv("SQLITE_BUSY_TIMEOUT", "5000")  # ms
+    # ON DELETE CASCADE / SET NULL في الـ schema محتاجين ده (SQLite default = OFF)
+    SQLITE_FOREIGN_KEYS: str = os.getenv("SQLITE_FOREIGN_KEYS", "ON")
+
+    # reference lists (departments, employee id/name): REFCACHE_SHARED=1 polls ref_versions for other workers
+    REFCACHE_SHARED: bool = os.getenv("REFCACHE_SHARED", "1") == "1"
+    REFCACHE_POLL_SECONDS: float = float(os.getenv("REFCACHE_POLL_SECONDS", "1.0"))
+
+    # rows per upsert round-trip in the bulk employee import
+    EMPLOYEE_IMPORT_BATCH_SIZE: int = int(os.getenv("EMPLOYEE_IMPORT_BATCH_SIZE", "1000"))
+
+    # workforce reports: month range defaults, result cache, how long a request waits for a run
+    REPORT_DEFAULT_MONTHS: int = int(os.getenv("REPORT_DEFAULT_MONTHS", "6"))
+    REPORT_MAX_MONTHS: int = int(os.getenv("REPORT_MAX_MONTHS", "36"))
+    REPORT_CACHE_ENTRIES: int = int(os.getenv("REPORT_CACHE_ENTRIES", "128"))
+    REPORT_WAIT_SECONDS: float = float(os.getenv("REPORT_WAIT_SECONDS", "5"))
+    REPORT_STANDARD_DAY_HOURS: float = float(os.getenv("REPORT_STANDARD_DAY_HOURS", "8"))
+
+    # dashboard counters are maintained by the writers; this job recomputes them (0 = off)
+    KPI_RECONCILE_SECONDS: float = float(os.getenv("KPI_RECONCILE_SECONDS", "900"))
+
+    # templates: shared bytecode cache dir (empty = off); auto reload only while editing templates
+    JINJA_BYTECODE_DIR: str = os.getenv("JINJA_BYTECODE_DIR", ".jinja_cache")
+    TEMPLATES_AUTO_RELOAD: bool = os.getenv("TEMPLATES_AUTO_RELOAD", "0") == "1"
+
+    # static build: older app.<hash>.css/js kept per bundle for pages rendered before a rebuild
+    ASSET_KEEP_BUILDS: int = int(os.getenv("ASSET_KEEP_BUILDS", "3"))
+
+    # response compression: bodies under COMPRESS_MIN_SIZE bytes go as-is; br needs `pip install brotli` (-1 = off)
+    COMPRESS_MIN_SIZE: int = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+    COMPRESS_GZIP_LEVEL: int = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+    COMPRESS_BROTLI_QUALITY: int = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))
+
+    # rendered read-mostly pages (app/core/page_cache.py): total body bytes kept in memory (0 = off)
+    PAGE_CACHE_BYTES: int = int(os.getenv("PAGE_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+    @property
+    def SQLITE_PRAGMAS(self) -> dict[str, str]:
+        pragmas = {
+            "journal_mode": self.SQLITE_JOURNAL_MODE,
+            "synchronous": self.SQLITE_SYNCHRONOUS,
+            "cache_size": self.SQLITE_CACHE_SIZE,
+            "mmap_size": self.SQLITE_MMAP_SIZE,
+            "temp_store": self.SQLITE_TEMP_STORE,
+            "busy_timeout": self.SQLITE_BUSY_TIMEOUT,
+            "foreign_keys": self.SQLITE_FOREIGN_KEYS,
+        }
+        return {k: v.strip() for k, v in pragmas.items() if v and v.strip()}
+
     @property
     def DATABASE_URL(self) -> str:
         # SQLite mode (no Postgres / no Docker)
@@ -28,5 +113,18 @@ class Settings:
             f"@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
 
+    @property
+    def DATABASE_READ_URL(self) -> str | None:
+        # GET pages: replica لو متحدد، وإلا على SQLite connection pool تاني read-only فوق WAL
+        explicit = os.getenv("DATABASE_READ_URL", "").strip()
+        if explicit:
+            return explicit
+
+        if os.getenv("USE_SQLITE", "1") == "1" and os.getenv("SQLITE_READONLY_POOL", "1") == "1":
+            sqlite_path = os.getenv("SQLITE_PATH", "hr_local.db")
+            return f"sqlite+aiosqlite:///file:./{sqlite_path}?mode=ro&uri=true"
+
+        return None
+
 
 settings = Settings()
@@ -0,0 +1,104 @@
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core import refcache
+from app.core.config import settings
+from app.db.session import ReadSessionLocal
+from app.models.user import User
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    id: int
+    username: str
+    is_admin: bool
+    perm_version: tuple[int, int, int]  # (global, per-user, ref_versions "users") وقت الـ load
+
+
+# user_id -> (expires_at, CurrentUser)
+_cache: dict[int, tuple[float, CurrentUser]] = {}
+
+# بيزيد مع تعديل roles/permissions نفسها (بيأثر على كل الـ users)
+_perm_version = 0
+# user_id -> بيزيد مع تعديل user واحد (بياناته أو الـ roles بتاعته)
+_user_versions: dict[int, int] = {}
+
+
+def invalidate_user(user_id: Optional[int] = None):
+    """After an admin edit: one user (user edit / role assignment), or None for
+    a role/permission-wide change that affects every cached user."""
+    global _perm_version
+    if user_id is None:
+        _perm_version += 1
+        _cache.clear()
+        return
+    user_id = int(user_id)
+    # الـ version كمان عشان load كان شغال قبل التعديل مايتخزنش
+    _user_versions[user_id] = _user_versions.get(user_id, 0) + 1
+    _cache.pop(user_id, None)
+
+
+async def mark_user_changed(db: AsyncSession, user_id: Optional[int] = None):
+    """invalidate_user() once db commits (an earlier load would cache the old row
+    under the new version). Other workers see the "users" ref_versions row at
+    their next poll and reload everyone."""
+    db.info.setdefault("users_changed", set()).add(None if user_id is None else int(user_id))
+    await refcache.bump_shared(db, "users")
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session):
+    changed = session.info.pop("users_changed", ())
+    if None in changed:
+        invalidate_user()
+    else:
+        for user_id in changed:
+            invalidate_user(user_id)
+    if changed:
+        refcache.poll_soon()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session):
+    session.info.pop("users_changed", None)
+
+
+async def _version(user_id: int) -> tuple[int, int, int]:
+    return (_perm_version, _user_versions.get(user_id, 0), await refcache.shared_version("users"))
+
+
+async def load_current_user(user_id: Optional[int]) -> CurrentUser | None:
+    if not user_id:
+        return None
+
+    now = time.monotonic()
+    hit = _cache.get(user_id)
+    version = await _version(user_id)
+    if hit and hit[0] > now and hit[1].perm_version == version:
+        return hit[1]
+
+    async with ReadSessionLocal() as db:
+        row = (
+            await db.execute(
+                select(User.id, User.username, User.is_admin).where(User.id == user_id)
+            )
+        ).first()
+
+    if not row:
+        _cache.pop(user_id, None)
+        return None
+
+    me = CurrentUser(id=row[0], username=row[1], is_admin=bool(row[2]), perm_version=version)
+    _cache[user_id] = (now + settings.CURRENT_USER_CACHE_TTL, me)
+    return me
+
+
+async def get_current_user(request: Request) -> CurrentUser | None:
+    # FastAPI dependency: None لو مفيش session أو اليوزر اتمسح
+    return await load_current_user(request.session.get("user_id"))
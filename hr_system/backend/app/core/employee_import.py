@@ -0,0 +1,276 @@
+"""Streaming employee import (CSV / XLSX) with batched upserts on email."""
+
+import asyncio
+import csv
+import io
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import IO, Any, Iterable, Iterator, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.department import Department
+from app.models.employee import Employee
+
+class ImportFileError(ValueError):
+    """The file itself can't be read (encoding, format, missing header)."""
+
+
+@dataclass
+class ImportRow:
+    line: int
+    email: str
+    status: str = "pending"   # created / updated / error (dry run: would_create / would_update)
+    error: Optional[str] = None
+
+
+# ---------- streaming readers ----------
+
+def _normalize(raw: dict[str, Any]) -> dict[str, str]:
+    return {
+        str(k or "").strip().lower(): ("" if v is None else str(v)).strip()
+        for k, v in raw.items()
+    }
+
+
+def iter_csv(stream: IO[bytes]) -> Iterator[tuple[int, dict[str, str]]]:
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text_stream)
+    try:
+        if not reader.fieldnames or "email" not in [f.strip().lower() for f in reader.fieldnames]:
+            raise ImportFileError("missing_header")
+        for raw in reader:
+            yield reader.line_num, _normalize(raw)
+    except UnicodeDecodeError:
+        raise ImportFileError("bad_encoding")
+    finally:
+        text_stream.detach()
+
+
+def iter_xlsx(stream: IO[bytes]) -> Iterator[tuple[int, dict[str, str]]]:
+    try:
+        from openpyxl import load_workbook  # optional dependency
+    except ImportError:
+        raise ImportFileError("xlsx_requires_openpyxl")
+
+    try:
+        wb = load_workbook(stream, read_only=True, data_only=True)
+    except Exception:
+        raise ImportFileError("bad_xlsx")
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = [str(c or "").strip().lower() for c in next(rows, ())]
+        if "email" not in header:
+            raise ImportFileError("missing_header")
+        for line, values in enumerate(rows, start=2):
+            if not any(v not in (None, "") for v in values):
+                continue
+            # openpyxl بيرجع datetime لخانات التاريخ
+            cells = {k: (v.date().isoformat() if isinstance(v, datetime) else v) for k, v in zip(header, values)}
+            yield line, _normalize(cells)
+    finally:
+        wb.close()
+
+
+def iter_rows(stream: IO[bytes], filename: str) -> Iterator[tuple[int, dict[str, str]]]:
+    if (filename or "").lower().endswith(".xlsx"):
+        return iter_xlsx(stream)
+    return iter_csv(stream)
+
+
+def _batches(rows: Iterator[Any], size: int) -> Iterator[list[Any]]:
+    batch: list[Any] = []
+    for r in rows:
+        batch.append(r)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ---------- validation ----------
+
+# header: full_name, email, job_title, hire_date, department, base_salary
+# - email هو المفتاح: موجود => update، مش موجود => insert
+# - department بالاسم؛ hire_date YYYY-MM-DD؛ الخانات الفاضية في update بتسيب القيمة القديمة
+def _validate(
+    line: int, raw: dict[str, str], dep_ids: dict[str, int], seen: set[str]
+) -> tuple[ImportRow, Optional[dict[str, Any]]]:
+    email = raw.get("email", "").lower()
+    row = ImportRow(line=line, email=email)
+
+    def fail(error: str):
+        row.status, row.error = "error", error
+        return row, None
+
+    full_name = raw.get("full_name", "")
+    if not email or "@" not in email:
+        return fail("invalid_email")
+    if len(email) > 200:
+        return fail("email_too_long")
+    if email in seen:
+        return fail("duplicate_in_file")
+    seen.add(email)
+    if not full_name:
+        return fail("missing_full_name")
+    if len(full_name) > 200 or len(raw.get("job_title", "")) > 200:
+        return fail("value_too_long")
+
+    hire_date = None
+    if raw.get("hire_date"):
+        try:
+            hire_date = date.fromisoformat(raw["hire_date"][:10])
+        except ValueError:
+            return fail("invalid_hire_date")
+
+    department_id = None
+    if raw.get("department"):
+        department_id = dep_ids.get(raw["department"].lower())
+        if department_id is None:
+            return fail("unknown_department")
+
+    base_salary = None
+    if raw.get("base_salary"):
+        try:
+            base_salary = Decimal(raw["base_salary"].replace(",", ""))
+        except InvalidOperation:
+            return fail("invalid_base_salary")
+        if base_salary < 0:
+            return fail("invalid_base_salary")
+
+    return row, {
+        "full_name": full_name,
+        "email": email,
+        "job_title": raw.get("job_title", ""),
+        "hire_date": hire_date,
+        "department_id": department_id,
+        "base_salary": base_salary,
+    }
+
+
+# ---------- upsert ----------
+
+def _upsert_stmt(dialect: str):
+    stmt = (pg_insert if dialect == "postgresql" else sqlite_insert)(Employee)
+    ex = stmt.excluded
+    # خانة فاضية في الملف => نسيب القيمة اللي في الـ DB
+    return stmt.on_conflict_do_update(
+        index_elements=[Employee.email],
+        set_={
+            "full_name": ex.full_name,
+            "job_title": func.coalesce(func.nullif(ex.job_title, ""), Employee.job_title),
+            "hire_date": func.coalesce(ex.hire_date, Employee.hire_date),
+            "department_id": func.coalesce(ex.department_id, Employee.department_id),
+            "base_salary": func.coalesce(ex.base_salary, Employee.base_salary),
+        },
+    )
+
+
+async def import_employees(
+    db: AsyncSession,
+    rows: Iterable[tuple[int, dict[str, str]]],
+    dry_run: bool = False,
+    batch_size: Optional[int] = None,
+) -> list[ImportRow]:
+    """Validate + upsert in batches; returns one ImportRow per data line. Caller commits."""
+    batch_size = batch_size or settings.EMPLOYEE_IMPORT_BATCH_SIZE
+
+    # departments: one lookup map (case-insensitive names)
+    dep_rows = (await db.execute(select(Department.id, Department.name))).all()
+    dep_ids = {str(name).strip().lower(): int(did) for did, name in dep_rows}
+
+    upsert = _upsert_stmt(db.bind.dialect.name)
+    report: list[ImportRow] = []
+    seen: set[str] = set()
+
+    for batch in _batches(iter(rows), batch_size):
+        checked = [_validate(line, raw, dep_ids, seen) for line, raw in batch]
+        report.extend(r for r, _ in checked)
+
+        good = [(r, values) for r, values in checked if values is not None]
+        if not good:
+            continue
+
+        emails = [values["email"] for _, values in good]
+        existing = set(
+            (await db.execute(select(Employee.email).where(Employee.email.in_(emails)))).scalars().all()
+        )
+        for r, values in good:
+            updating = values["email"] in existing
+            if dry_run:
+                r.status = "would_update" if updating else "would_create"
+            else:
+                r.status = "updated" if updating else "created"
+
+        if not dry_run:
+            params = []
+            for _, values in good:
+                p = dict(values)
+                if p["base_salary"] is None and p["email"] not in existing:
+                    p["base_salary"] = Decimal(0)  # NOT NULL على الـ insert
+                params.append(p)
+            await db.execute(upsert, params)
+
+    await db.flush()
+    return report
+
+
+def summarize(report: Iterable[ImportRow]) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    for r in report:
+        counts[r.status] = counts.get(r.status, 0) + 1
+    return counts
+
+
+def report_csv(report: Iterable[ImportRow]) -> str:
+    out = io.StringIO()
+    w = csv.writer(out)
+    w.writerow(["line", "email", "status", "error"])
+    for r in report:
+        w.writerow([r.line, r.email, r.status, r.error or ""])
+    return out.getvalue()
+
+
+# python -m app.core.employee_import employees.csv [report.csv] [--dry-run]
+async def _main(src: str, dst: Optional[str], dry_run: bool):
+    from app.db.session import AsyncSessionLocal
+    from app.core.refcache import mark_changed
+    from app.core import kpi
+    import app.models  # noqa: F401
+
+    async with AsyncSessionLocal() as db:
+        with open(src, "rb") as f:
+            try:
+                report = await import_employees(db, iter_rows(f, src), dry_run=dry_run)
+            except ImportFileError as e:
+                print(f"cannot read {src}: {e}", file=sys.stderr)
+                sys.exit(1)
+        if dry_run:
+            await db.rollback()
+        else:
+            await mark_changed(db, "employees")
+            await kpi.bump(db, "employees", summarize(report).get("created", 0))
+            await db.commit()
+
+    text_report = report_csv(report)
+    if dst:
+        with open(dst, "w", encoding="utf-8", newline="") as f:
+            f.write(text_report)
+    else:
+        sys.stdout.write(text_report)
+    print(summarize(report), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if a != "--dry-run"]
+    if not args:
+        print("usage: python -m app.core.employee_import employees.csv|xlsx [report.csv] [--dry-run]", file=sys.stderr)
+        sys.exit(2)
+    asyncio.run(_main(args[0], args[1] if len(args) > 1 else None, "--dry-run" in sys.argv))
@@ -0,0 +1,112 @@
+"""Streaming CSV / NDJSON exports (employees, departments), optionally gzipped per chunk."""
+
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Optional
+
+from sqlalchemy import Select, func, select
+
+from app.models.department import Department
+from app.models.employee import Employee
+from app.queries.employees import EmployeeFilter, apply_filter
+
+CHUNK_ROWS = 1000
+FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+EMPLOYEE_COLUMNS = {
+    "id": Employee.id,
+    "full_name": Employee.full_name,
+    "email": Employee.email,
+    "job_title": Employee.job_title,
+    "hire_date": Employee.hire_date,
+    "base_salary": Employee.base_salary,
+    "department_id": Employee.department_id,
+    "department": Department.name,
+}
+
+DEPARTMENT_COLUMNS = {
+    "id": Department.id,
+    "name": Department.name,
+    "headcount": func.count(Employee.id),
+}
+
+
+def parse_columns(value: Optional[str], available: dict[str, Any]) -> list[str]:
+    # "id,full_name,department" — أعمدة مش معروفة بتتجاهل، فاضي = الكل
+    picked = [c.strip() for c in (value or "").split(",") if c.strip() in available]
+    return list(dict.fromkeys(picked)) or list(available)
+
+
+def employee_export_query(f: EmployeeFilter, columns: list[str]) -> Select:
+    q = select(*[EMPLOYEE_COLUMNS[c].label(c) for c in columns]).select_from(Employee)
+    if "department" in columns:
+        q = q.outerjoin(Department, Department.id == Employee.department_id)
+    return apply_filter(q, f).order_by(Employee.id)
+
+
+def department_export_query(columns: list[str]) -> Select:
+    q = select(*[DEPARTMENT_COLUMNS[c].label(c) for c in columns]).select_from(Department)
+    if "headcount" in columns:
+        q = q.outerjoin(Employee, Employee.department_id == Department.id).group_by(Department.id, Department.name)
+    return q.order_by(Department.id)
+
+
+def plain_value(v: Any) -> Any:
+    if isinstance(v, (date, datetime)):
+        return v.isoformat()
+    if isinstance(v, Decimal):
+        return float(v)
+    return v
+
+
+def _encode(rows: list[Any], columns: list[str], fmt: str) -> bytes:
+    if fmt == "ndjson":
+        return "".join(
+            json.dumps({c: plain_value(v) for c, v in zip(columns, r)}, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for r in rows
+        ).encode("utf-8")
+    out = io.StringIO()
+    w = csv.writer(out)
+    w.writerows([[plain_value(v) if v is not None else "" for v in r] for r in rows])
+    return out.getvalue().encode("utf-8")
+
+
+async def stream_export(q: Select, columns: list[str], fmt: str, gzip: bool = False) -> AsyncIterator[bytes]:
+    from app.db.session import read_engine
+
+    # wbits=31 => gzip container، بيتكتب على دفعات
+    z = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+
+    def emit(data: bytes) -> bytes:
+        return z.compress(data) if z else data
+
+    if fmt == "csv":
+        header = io.StringIO()
+        csv.writer(header).writerow(columns)
+        # BOM عشان Excel يفتح العربي صح
+        yield emit(b"\xef\xbb\xbf" + header.getvalue().encode("utf-8"))
+
+    # connection خاصة بالـ generator: الـ request session بتتقفل قبل ما الـ body يتبعت
+    # stream() = server-side cursor على asyncpg، fetchmany على SQLite
+    async with read_engine.connect() as conn:
+        result = await conn.stream(q.execution_options(yield_per=CHUNK_ROWS))
+        async for chunk in result.partitions(CHUNK_ROWS):
+            data = emit(_encode(chunk, columns, fmt))
+            if data:
+                yield data
+
+    if z:
+        yield z.flush()
+
+
+def export_headers(name: str, fmt: str, gzip: bool) -> tuple[str, dict[str, str]]:
+    filename = f"{name}.{fmt}" + (".gz" if gzip else "")
+    media_type = "application/gzip" if gzip else FORMATS[fmt]
+    return media_type, {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Cache-Control": "no-store",
+    }
@@ -0,0 +1,27 @@
+"""Partial (fragment) responses for form posts sent by app.js with X-Fragment: 1."""
+
+from fastapi import Request
+from starlette.responses import Response
+
+from app.core.templating import templates
+
+# forms بـ data-fragment="#target": الـ handler يرجع نفس الـ _*.html partial اللي في الصفحة
+# والـ JS يحطه مكان #target؛ من غير JS أو في الـ error paths => redirect + full page عادي
+HEADER = "X-Fragment"
+
+
+def wants_fragment(request: Request) -> bool:
+    return request.headers.get(HEADER) == "1"
+
+
+def fragment(request: Request, name: str, context: dict) -> Response:
+    return templates.TemplateResponse(
+        name,
+        {"request": request, **context},
+        headers={HEADER: "1", "Cache-Control": "no-store"},
+    )
+
+
+def removed() -> Response:
+    # جزء اتمسح (صف في جدول): body فاضي => الـ target بيتشال
+    return Response(b"", media_type="text/html", headers={HEADER: "1", "Cache-Control": "no-store"})
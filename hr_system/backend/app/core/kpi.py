@@ -0,0 +1,159 @@
+"""Dashboard KPI counters (kpi_counters), bumped by the writers and reconciled in the background."""
+
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Optional
+
+from sqlalchemy import DateTime, Numeric, bindparam, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# employees: create/delete/import؛ on_site: check-in +1 / check-out -1؛
+# pending_leaves: create +1، approve/reject لطلب pending -1؛ last_payroll_net: run_payroll؛
+# audit:YYYY-MM-DD: صفوف الـ audit لكل يوم UTC
+COUNTERS = ("employees", "on_site", "pending_leaves", "last_payroll_net")
+
+# INSERT … ON CONFLICT: نفس الـ syntax على Postgres و SQLite (>= 3.24)
+# typed binds: Decimal على asyncpg، float على sqlite3
+_TYPES = (bindparam("v", type_=Numeric(16, 2)), bindparam("t", type_=DateTime()))
+_BUMP = text(
+    "INSERT INTO kpi_counters(name, value, updated_at) VALUES (:n, :v, :t) "
+    "ON CONFLICT (name) DO UPDATE SET value = kpi_counters.value + excluded.value, updated_at = excluded.updated_at"
+).bindparams(*_TYPES)
+_SET = text(
+    "INSERT INTO kpi_counters(name, value, updated_at) VALUES (:n, :v, :t) "
+    "ON CONFLICT (name) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at"
+).bindparams(*_TYPES)
+
+
+def audit_counter(day: Optional[date] = None) -> str:
+    return f"audit:{(day or datetime.utcnow().date()).isoformat()}"
+
+
+# ---------- writers (caller's transaction) ----------
+
+async def bump(db: AsyncSession | AsyncConnection, name: str, delta: float = 1):
+    if delta:
+        await db.execute(_BUMP, {"n": name, "v": Decimal(str(delta)), "t": datetime.utcnow()})
+
+
+async def set_value(db: AsyncSession | AsyncConnection, name: str, value: float):
+    await db.execute(_SET, {"n": name, "v": Decimal(str(value)), "t": datetime.utcnow()})
+
+
+async def bump_audit(db: AsyncSession | AsyncConnection, rows: list[dict[str, Any]]):
+    per_day: dict[str, int] = {}
+    for row in rows:
+        name = audit_counter(row["created_at"].date())
+        per_day[name] = per_day.get(name, 0) + 1
+    for name, n in per_day.items():
+        await bump(db, name, n)
+
+
+# ---------- reader ----------
+
+async def read_counters(db: AsyncSession) -> dict[str, float]:
+    names = [*COUNTERS, audit_counter()]
+    res = await db.execute(
+        text("SELECT name, value FROM kpi_counters WHERE name IN ("
+             + ", ".join(f":n{i}" for i in range(len(names))) + ")"),
+        {f"n{i}": n for i, n in enumerate(names)},
+    )
+    values = {name: 0.0 for name in COUNTERS}
+    values.update({str(name): float(value) for name, value in res.all()})
+    values["audit_today"] = values.pop(audit_counter(), 0.0)
+    return values
+
+
+# ---------- reconciliation ----------
+
+# كل KPI_RECONCILE_SECONDS في الـ background (أو: python -m app.core.kpi) — بيصلح أي drift
+async def reconcile(conn: AsyncConnection | AsyncSession):
+    """Overwrite every counter with its real value (caller commits)."""
+    today = datetime.utcnow().date()
+    tomorrow = today + timedelta(days=1)
+
+    async def scalar(sql: str, **params) -> float:
+        return float((await conn.execute(text(sql), params)).scalar() or 0)
+
+    real = {
+        "employees": await scalar("SELECT COUNT(*) FROM employees"),
+        # join على employees: SQLite من غير foreign_keys pragma مش بيعمل cascade
+        "on_site": await scalar(
+            "SELECT COUNT(*) FROM attendance a JOIN employees e ON e.id = a.employee_id"
+            " WHERE a.check_out IS NULL AND a.check_in IS NOT NULL"
+        ),
+        "pending_leaves": await scalar(
+            "SELECT COUNT(*) FROM leave_requests l JOIN employees e ON e.id = l.employee_id"
+            " WHERE l.status = 'pending'"
+        ),
+        "last_payroll_net": await scalar(
+            "SELECT COALESCE(SUM(net_pay), 0) FROM payroll_items WHERE run_id = "
+            "(SELECT id FROM payroll_runs WHERE status = 'posted' ORDER BY created_at DESC, id DESC LIMIT 1)"
+        ),
+        audit_counter(today): await scalar(
+            "SELECT COUNT(*) FROM audit_logs WHERE created_at >= :a AND created_at < :b",
+            a=datetime.combine(today, datetime.min.time()),
+            b=datetime.combine(tomorrow, datetime.min.time()),
+        ),
+    }
+    for name, value in real.items():
+        await set_value(conn, name, value)
+
+    # أيام قديمة مالهاش لازمة (بنسيب امبارح عشان حوالين نص الليل)
+    await conn.execute(
+        text("DELETE FROM kpi_counters WHERE name LIKE 'audit:%' AND name < :keep"),
+        {"keep": audit_counter(today - timedelta(days=1))},
+    )
+    return real
+
+
+async def reconcile_now() -> dict[str, float]:
+    from app.db.session import engine
+
+    async with engine.begin() as conn:
+        return await reconcile(conn)
+
+
+class KpiReconciler:
+    """Background loop: reconcile() every KPI_RECONCILE_SECONDS (0 = off)."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    async def start(self):
+        if self.interval <= 0 or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run(), name="kpi-reconcile")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await reconcile_now()
+            except Exception:
+                logger.exception("kpi reconcile failed")
+            await asyncio.sleep(self.interval)
+
+
+kpi_reconciler = KpiReconciler(settings.KPI_RECONCILE_SECONDS)
+
+
+if __name__ == "__main__":
+    import app.models  # noqa: F401
+
+    print(asyncio.run(reconcile_now()))
@@ -0,0 +1,150 @@
+"""Rendered-page cache for read-mostly pages, keyed by route, permission set and data versions."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import Response
+
+from app.core.conditional import build_id
+from app.core.config import settings
+from app.core.current_user import CurrentUser
+from app.core.rbac import permission_codes
+from app.core.refcache import versions
+
+HEADER = "X-Page-Cache"
+
+Render = Callable[[], Awaitable[Response]]
+
+
+@dataclass(frozen=True)
+class _Entry:
+    stamp: tuple           # (table versions, build id) وقت الـ render
+    body: bytes
+    media_type: Optional[str]
+
+
+# (path, params, permissions) -> entry؛ الـ permissions مش الـ user id، فكل اللي ليهم نفس
+# الـ permissions بيشتركوا في entry واحدة. entry واحدة لكل key، بتتبدل لما الـ versions تتحرك،
+# والأقدم استخداماً بيتشال بعد PAGE_CACHE_BYTES
+_entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+_inflight: dict[tuple, asyncio.Future] = {}
+_bytes = 0
+
+# user_id -> (expires_at, perm_version, codes) — نفس TTL بتاع current_user
+_permissions: dict[int, tuple[float, tuple, tuple[str, ...]]] = {}
+_MAX_PERMISSIONS = 10_000
+
+_stats = {"hits": 0, "misses": 0, "coalesced": 0, "stale": 0, "evictions": 0, "uncacheable": 0}
+
+
+async def permission_key(db: AsyncSession, user: CurrentUser) -> tuple[str, ...]:
+    if user.is_admin:
+        return ("*",)
+    now = time.monotonic()
+    hit = _permissions.get(user.id)
+    # perm_version بيتغير بعد commit تعديل الـ roles؛ الـ TTL لو التعديل جه من برا التطبيق
+    if hit and hit[0] > now and hit[1] == user.perm_version:
+        return hit[2]
+    codes = tuple(sorted(await permission_codes(db, user.id)))
+    _permissions.pop(user.id, None)
+    if len(_permissions) >= _MAX_PERMISSIONS:
+        _permissions.pop(next(iter(_permissions)))
+    _permissions[user.id] = (now + settings.CURRENT_USER_CACHE_TTL, user.perm_version, codes)
+    return codes
+
+
+def _response(entry: _Entry, state: str) -> Response:
+    return Response(entry.body, media_type=entry.media_type, headers={HEADER: state})
+
+
+def _evict(base: tuple):
+    global _bytes
+    old = _entries.pop(base, None)
+    if old is not None:
+        _bytes -= len(old.body)
+
+
+def _store(base: tuple, stamp: tuple, response: Response) -> Optional[_Entry]:
+    global _bytes
+    body = getattr(response, "body", None)
+    # redirects / errors / streaming مش بتتخزن؛ ولا body أكبر من ربع الـ budget
+    if response.status_code != 200 or body is None or response.background is not None \
+            or len(body) > settings.PAGE_CACHE_BYTES // 4:
+        _stats["uncacheable"] += 1
+        return None
+
+    entry = _Entry(stamp=stamp, body=bytes(body), media_type=response.media_type)
+    _evict(base)
+    _entries[base] = entry
+    _bytes += len(entry.body)
+    while _bytes > settings.PAGE_CACHE_BYTES and _entries:
+        _evict(next(iter(_entries)))
+        _stats["evictions"] += 1
+    return entry
+
+
+# في الـ handler بعد الـ 304 check:
+#     return v.apply(await cached_page(request, db, current_user, ("departments",), render))
+async def cached_page(
+    request: Request,
+    db: AsyncSession,
+    user: CurrentUser,
+    depends: tuple[str, ...],
+    render: Render,
+) -> Response:
+    if settings.PAGE_CACHE_BYTES <= 0:
+        return await render()
+
+    base = (request.url.path, tuple(sorted(request.query_params.multi_items())), await permission_key(db, user))
+    # الـ versions قبل الـ render — لو حصل commit في النص المرة الجاية تتعمل render تاني
+    stamp = (await versions(db, depends), build_id())
+
+    hit = _entries.get(base)
+    if hit is not None:
+        if hit.stamp == stamp:
+            _entries.move_to_end(base)
+            _stats["hits"] += 1
+            return _response(hit, "hit")
+        _stats["stale"] += 1
+
+    key = (base, stamp)
+    pending = _inflight.get(key)
+    if pending is not None:
+        # shield: لو الـ request ده اتقفل الـ future مايتلغيش للباقيين
+        entry = await asyncio.shield(pending)
+        if entry is not None:
+            _stats["coalesced"] += 1
+            return _response(entry, "hit")
+        # الـ render الأول فشل أو الـ response مش قابل للتخزين
+        _stats["misses"] += 1
+        return await render()
+
+    _stats["misses"] += 1
+    fut = asyncio.get_running_loop().create_future()
+    _inflight[key] = fut
+    entry = None
+    try:
+        response = await render()
+        entry = _store(base, stamp, response)
+        response.headers[HEADER] = "miss"
+        return response
+    finally:
+        _inflight.pop(key, None)
+        fut.set_result(entry)
+
+
+def stats() -> dict:
+    lookups = _stats["hits"] + _stats["coalesced"] + _stats["misses"]
+    return {
+        **_stats,
+        "hit_ratio": round((_stats["hits"] + _stats["coalesced"]) / lookups, 4) if lookups else None,
+        "entries": len(_entries),
+        "bytes": _bytes,
+        "budget_bytes": settings.PAGE_CACHE_BYTES,
+    }
+
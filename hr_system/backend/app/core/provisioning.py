@@ -0,0 +1,220 @@
+"""Bulk user provisioning from CSV (endpoint + CLI)."""
+
+import asyncio
+import csv
+import io
+import secrets
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.security import hash_password
+from app.models.user import User
+
+BATCH_SIZE = 500
+LOOKUP_CHUNK = 5000  # bound on IN (...) params per existing-username query
+
+_TRUE = {"1", "true", "yes", "y", "admin"}
+
+
+@dataclass
+class ProvisionRow:
+    line: int
+    username: str
+    password: str
+    generated: bool
+    is_admin: bool
+    roles: list[str] = field(default_factory=list)
+    status: str = "created"
+    error: Optional[str] = None
+
+
+# header: username, password, is_admin, roles
+# - password فاضي => بيتعمل password عشوائي ويرجع في التقرير
+# - roles مفصولة بـ ";" (أسماء roles زي ما هي في جدول roles)
+def parse_csv(text_data: str) -> list[ProvisionRow]:
+    rows: list[ProvisionRow] = []
+    reader = csv.DictReader(io.StringIO(text_data))
+    for i, raw in enumerate(reader, start=2):  # line 1 = header
+        raw = {(k or "").strip().lower(): (v or "").strip() for k, v in raw.items()}
+        password = raw.get("password", "")
+        generated = not password
+        if generated:
+            password = secrets.token_urlsafe(12)
+        rows.append(
+            ProvisionRow(
+                line=i,
+                username=raw.get("username", ""),
+                password=password,
+                generated=generated,
+                is_admin=raw.get("is_admin", "").lower() in _TRUE,
+                roles=[r.strip() for r in raw.get("roles", "").split(";") if r.strip()],
+            )
+        )
+    return rows
+
+
+def _fail(row: ProvisionRow, error: str):
+    row.status = "error"
+    row.error = error
+
+
+# process pool: bulk hashing يستخدم كل الـ cores من غير ما يزاحم login pool.
+# pool واحد طول عمر الـ process، spawn مش fork: الـ fork من uvicorn (threads +
+# aiosqlite thread) ممكن يورث locks مقفولة ويعمل deadlock
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def start_provisioning_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=max(1, settings.PASSWORD_HASH_WORKERS),
+            mp_context=get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_provisioning_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _hash_chunk(passwords: list[str]) -> list[str]:
+    return [hash_password(p) for p in passwords]
+
+
+async def _hash_all(passwords: list[str]) -> list[str]:
+    if not passwords:
+        return []
+    pool = start_provisioning_pool()  # no-op بعد الـ startup؛ الـ CLI بيبدأه هنا
+    loop = asyncio.get_running_loop()
+    workers = max(1, settings.PASSWORD_HASH_WORKERS)
+    size = max(1, len(passwords) // (workers * 4))
+    chunks = [passwords[i:i + size] for i in range(0, len(passwords), size)]
+    done = await asyncio.gather(*(loop.run_in_executor(pool, _hash_chunk, c) for c in chunks))
+    return [h for part in done for h in part]
+
+
+async def provision_users(db: AsyncSession, rows: list[ProvisionRow]) -> list[ProvisionRow]:
+    # ---- validate (in-file) ----
+    seen: set[str] = set()
+    for r in rows:
+        if not r.username:
+            _fail(r, "missing_username")
+        elif len(r.username) > 50:
+            _fail(r, "username_too_long")
+        elif r.username in seen:
+            _fail(r, "duplicate_in_file")
+        elif len(r.password.encode("utf-8")) > 72:
+            _fail(r, "password_too_long")
+        seen.add(r.username)
+
+    pending = [r for r in rows if r.status != "error"]
+
+    # ---- existing usernames: one query (per LOOKUP_CHUNK names) ----
+    names = [r.username for r in pending]
+    existing: set[str] = set()
+    for i in range(0, len(names), LOOKUP_CHUNK):
+        res = await db.execute(select(User.username).where(User.username.in_(names[i:i + LOOKUP_CHUNK])))
+        existing.update(res.scalars().all())
+
+    # ---- roles: one lookup map ----
+    role_ids: dict[str, int] = {}
+    if any(r.roles for r in pending):
+        role_rows = (await db.execute(text("select id, name from roles"))).all()
+        role_ids = {str(name): int(rid) for rid, name in role_rows}
+
+    for r in pending:
+        if r.username in existing:
+            _fail(r, "username_exists")
+            continue
+        unknown = [name for name in r.roles if name not in role_ids]
+        if unknown:
+            _fail(r, "unknown_role:" + ",".join(unknown))
+
+    pending = [r for r in pending if r.status != "error"]
+    if not pending:
+        return rows
+
+    hashes = await _hash_all([r.password for r in pending])
+
+    # ---- batched inserts ----
+    for i in range(0, len(pending), BATCH_SIZE):
+        batch = pending[i:i + BATCH_SIZE]
+        res = await db.execute(
+            insert(User).returning(User.id, User.username),
+            [
+                {"username": r.username, "password_hash": h, "is_admin": r.is_admin}
+                for r, h in zip(batch, hashes[i:i + BATCH_SIZE])
+            ],
+        )
+        ids = {username: uid for uid, username in res.all()}
+
+        links = [
+            {"u": ids[r.username], "r": role_ids[name]}
+            for r in batch
+            for name in r.roles
+        ]
+        if links:
+            await db.execute(text("insert into user_roles(user_id, role_id) values (:u, :r)"), links)
+
+    # commit على الـ caller (unit of work)
+    await db.flush()
+    return rows
+
+
+def report_csv(rows: Iterable[ProvisionRow]) -> str:
+    out = io.StringIO()
+    w = csv.writer(out)
+    w.writerow(["line", "username", "status", "generated_password", "error"])
+    for r in rows:
+        w.writerow([
+            r.line,
+            r.username,
+            r.status,
+            r.password if (r.generated and r.status == "created") else "",
+            r.error or "",
+        ])
+    return out.getvalue()
+
+
+# python -m app.core.provisioning users.csv [report.csv]
+async def _main(src: str, dst: Optional[str]):
+    from app.db.session import AsyncSessionLocal
+    import app.models  # noqa: F401
+
+    with open(src, encoding="utf-8-sig") as f:
+        rows = parse_csv(f.read())
+
+    try:
+        async with AsyncSessionLocal() as db:
+            await provision_users(db, rows)
+            await db.commit()
+    finally:
+        shutdown_provisioning_pool()
+
+    report = report_csv(rows)
+    if dst:
+        with open(dst, "w", encoding="utf-8", newline="") as f:
+            f.write(report)
+    else:
+        sys.stdout.write(report)
+
+    created = sum(1 for r in rows if r.status == "created")
+    print(f"created {created} / {len(rows)}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python -m app.core.provisioning users.csv [report.csv]", file=sys.stderr)
+        sys.exit(2)
+    asyncio.run(_main(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None))
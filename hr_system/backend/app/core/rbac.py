@@ -16,3 +16,17 @@ async def user_has_permission(db: AsyncSession, user_id: int, perm_code: str) ->
     )
     res = await db.execute(sql, {"user_id": user_id, "perm_code": perm_code})
     return res.first() is not None
+
+
+async def permission_codes(db: AsyncSession, user_id: int) -> frozenset[str]:
+    sql = text(
+        """
+        SELECT DISTINCT p.code
+        FROM user_roles ur
+        JOIN role_permissions rp ON rp.role_id = ur.role_id
+        JOIN permissions p ON p.id = rp.permission_id
+        WHERE ur.user_id = :user_id
+        """
+    )
+    res = await db.execute(sql, {"user_id": user_id})
+    return frozenset(str(r[0]) for r in res.all())
@@ -0,0 +1,162 @@
+"""In-process cache for reference lists and other read-mostly data, keyed by table versions."""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import ReadSessionLocal
+from app.models.department import Department
+from app.models.employee import Employee
+
+# "payroll" = salaries, allowances, deductions and payroll runs
+TABLES = ("employees", "departments", "payroll", "attendance", "leaves", "audit")
+
+
+@dataclass(frozen=True)
+class EmployeeRef:
+    id: int
+    full_name: str
+
+
+@dataclass(frozen=True)
+class DepartmentRef:
+    id: int
+    name: str
+
+
+# local: بيزيد بعد commit الـ writers (mark_changed)
+# db: ref_versions (REFCACHE_SHARED) — بيزيد في نفس الـ transaction وبيتقري كل REFCACHE_POLL_SECONDS
+#     عشان الـ workers التانية والـ CLI imports يعملوا invalidate برضه؛ نفس الـ versions بتعمل الـ ETag
+_local_versions: dict[str, int] = {t: 0 for t in TABLES}
+_db_versions: dict[str, int] = {t: 0 for t in TABLES}
+_last_poll = 0.0
+
+# جزء من data_version من غير REFCACHE_SHARED: restart مايرجعش version قديمة
+_started = time.time()
+
+# name -> (versions key, value)
+_cache: dict[str, tuple[tuple[int, ...], Any]] = {}
+
+
+# ---------- writers ----------
+
+async def mark_changed(db: AsyncSession, table: str):
+    """Call from any write to `table`; takes effect when db commits."""
+    db.info.setdefault("ref_changed", set()).add(table)
+    await bump_shared(db, table)
+
+
+async def bump_shared(conn: AsyncSession | AsyncConnection, table: str):
+    """ref_versions only — for writers outside the ORM session (CLI jobs on a bare connection)."""
+    if settings.REFCACHE_SHARED:
+        await conn.execute(
+            text("UPDATE ref_versions SET version = version + 1 WHERE name = :t"), {"t": table}
+        )
+
+
+def poll_soon():
+    # الـ worker اللي كتب يشوف ref_versions الجديدة في أول read (مش بعد REFCACHE_POLL_SECONDS)
+    global _last_poll
+    _last_poll = 0.0
+
+
+def _bump_local(table: str):
+    _local_versions[table] = _local_versions.get(table, 0) + 1
+    poll_soon()
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_after_commit(session: Session):
+    for table in session.info.pop("ref_changed", ()):
+        _bump_local(table)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session):
+    session.info.pop("ref_changed", None)
+
+
+def invalidate(table: str | None = None):
+    for t in ([table] if table else TABLES):
+        _bump_local(t)
+
+
+# ---------- readers ----------
+
+async def _poll_db_versions(db: AsyncSession):
+    global _last_poll
+    now = time.monotonic()
+    if now - _last_poll < settings.REFCACHE_POLL_SECONDS:
+        return
+    _last_poll = now
+    rows = (await db.execute(text("SELECT name, version FROM ref_versions"))).all()
+    for name, version in rows:
+        _db_versions[str(name)] = int(version)
+
+
+async def versions(db: AsyncSession, depends: tuple[str, ...]) -> tuple[int, ...]:
+    if settings.REFCACHE_SHARED:
+        await _poll_db_versions(db)
+    return tuple(v for t in depends for v in (_local_versions.get(t, 0), _db_versions.get(t, 0)))
+
+
+async def shared_version(table: str) -> int:
+    """ref_versions[table] for callers without a request session (current_user)."""
+    if not settings.REFCACHE_SHARED:
+        return 0
+    if time.monotonic() - _last_poll >= settings.REFCACHE_POLL_SECONDS:
+        async with ReadSessionLocal() as db:
+            await _poll_db_versions(db)
+    return _db_versions.get(table, 0)
+
+
+async def data_version(db: AsyncSession, depends: tuple[str, ...]) -> tuple:
+    """Version of `depends` that every worker agrees on (for ETags, not for the local cache).
+
+    REFCACHE_SHARED: the ref_versions rows. Otherwise this process' counters
+    plus its start time, so a restart never reuses an old version.
+    """
+    if settings.REFCACHE_SHARED:
+        await _poll_db_versions(db)
+        return tuple(_db_versions.get(t, 0) for t in depends)
+    return (_started, *(_local_versions.get(t, 0) for t in depends))
+
+
+async def cached(
+    db: AsyncSession,
+    name: str,
+    depends: tuple[str, ...],
+    load: Callable[[AsyncSession], Awaitable[Any]],
+) -> Any:
+    # الـ key بيتاخد قبل الـ load — لو حصل commit في النص الـ version هيتغير والمرة الجاية تتقري تاني
+    key = await versions(db, depends)
+    hit = _cache.get(name)
+    if hit and hit[0] == key:
+        return hit[1]
+
+    value = await load(db)
+    _cache[name] = (key, value)
+    return value
+
+
+async def _load_employees(db: AsyncSession) -> tuple[EmployeeRef, ...]:
+    res = await db.execute(select(Employee.id, Employee.full_name).order_by(Employee.full_name, Employee.id))
+    return tuple(EmployeeRef(id=r[0], full_name=r[1]) for r in res.all())
+
+
+async def _load_departments(db: AsyncSession) -> tuple[DepartmentRef, ...]:
+    res = await db.execute(select(Department.id, Department.name).order_by(Department.name))
+    return tuple(DepartmentRef(id=r[0], name=r[1]) for r in res.all())
+
+
+async def employee_refs(db: AsyncSession) -> tuple[EmployeeRef, ...]:
+    return await cached(db, "employee_refs", ("employees",), _load_employees)
+
+
+async def department_refs(db: AsyncSession) -> tuple[DepartmentRef, ...]:
+    return await cached(db, "department_refs", ("departments",), _load_departments)
@@ -0,0 +1,177 @@
+"""Pluggable aggregate reports, run in the background and cached by (report, params, data version)."""
+
+import asyncio
+import csv
+import io
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Optional
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.export import plain_value
+from app.core.refcache import versions
+
+
+@dataclass(frozen=True)
+class ReportParams:
+    since: date   # أول يوم في الشهر
+    until: date   # أول يوم في الشهر اللي بعد آخر شهر (exclusive)
+
+    @property
+    def last_month(self) -> date:
+        return _add_months(self.until, -1)
+
+
+@dataclass(frozen=True)
+class ReportDef:
+    name: str
+    title: str
+    columns: tuple[str, ...]
+    depends: tuple[str, ...]          # refcache tables
+    build: Callable[[ReportParams, str], Select]
+    permission: Optional[str] = None  # None = أي user مسجل دخول
+    description: str = ""
+
+
+@dataclass
+class ReportResult:
+    report: str
+    params: ReportParams
+    columns: tuple[str, ...]
+    rows: list[tuple]
+    generated_at: float
+    elapsed_ms: float
+
+
+REPORTS: dict[str, ReportDef] = {}
+
+
+def register(defn: ReportDef) -> ReportDef:
+    REPORTS[defn.name] = defn
+    return defn
+
+
+# ---------- params ----------
+
+def _month_start(value: str) -> Optional[date]:
+    try:
+        y, m = value.strip()[:7].split("-")
+        return date(int(y), int(m), 1)
+    except (ValueError, AttributeError):
+        return None
+
+
+def _add_months(d: date, n: int) -> date:
+    k = d.year * 12 + d.month - 1 + n
+    return date(k // 12, k % 12 + 1, 1)
+
+
+def parse_params(since: str = "", until: str = "", today: Optional[date] = None) -> ReportParams:
+    """since/until = YYYY-MM (inclusive); default = آخر REPORT_DEFAULT_MONTHS شهور."""
+    today = today or date.today()
+    last = _month_start(until) or date(today.year, today.month, 1)
+    first = _month_start(since) or _add_months(last, 1 - settings.REPORT_DEFAULT_MONTHS)
+    if first > last:
+        first, last = last, first
+    # حد أقصى عشان range كبير مايقلبش report تقيل بالغلط
+    first = max(first, _add_months(last, 1 - settings.REPORT_MAX_MONTHS))
+    return ReportParams(since=first, until=_add_months(last, 1))
+
+
+def month_label(d: date) -> str:
+    return d.strftime("%Y-%m")
+
+
+# ---------- cache + single flight ----------
+
+_results: "OrderedDict[tuple, ReportResult]" = OrderedDict()
+_inflight: dict[tuple, asyncio.Task] = {}
+
+
+async def _execute(defn: ReportDef, params: ReportParams) -> ReportResult:
+    from app.db.session import read_engine
+
+    started = time.perf_counter()
+    q = defn.build(params, read_engine.dialect.name)
+    async with read_engine.connect() as conn:
+        rows = [
+            tuple(round(v, 2) if isinstance(v, float) else v for v in r)
+            for r in (await conn.execute(q)).all()
+        ]
+    return ReportResult(
+        report=defn.name,
+        params=params,
+        columns=defn.columns,
+        rows=rows,
+        generated_at=time.time(),
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+    )
+
+
+def _store(key: tuple, task: asyncio.Task):
+    _inflight.pop(key, None)
+    if task.cancelled() or task.exception() is not None:
+        return
+    _results[key] = task.result()
+    _results.move_to_end(key)
+    while len(_results) > settings.REPORT_CACHE_ENTRIES:
+        _results.popitem(last=False)
+
+
+async def run_report(
+    db: AsyncSession, defn: ReportDef, params: ReportParams, wait: Optional[float] = None
+) -> Optional[ReportResult]:
+    """Cached result, or start/join the background run. None = still running after `wait` seconds."""
+    # single flight: نفس الـ key => نفس الـ task؛ الـ page بتعمل refresh لحد ما النتيجة تتخزن
+    key = (defn.name, params, await versions(db, defn.depends))
+    hit = _results.get(key)
+    if hit:
+        _results.move_to_end(key)
+        return hit
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_execute(defn, params))
+        _inflight[key] = task
+        task.add_done_callback(lambda t: _store(key, t))
+
+    # shield: لو الـ request اتقفل أو الـ wait خلص الـ run بيكمل ويتخزن
+    try:
+        return await asyncio.wait_for(
+            asyncio.shield(task), settings.REPORT_WAIT_SECONDS if wait is None else wait
+        )
+    except asyncio.TimeoutError:
+        return None
+
+
+# ---------- output ----------
+
+def as_dicts(result: ReportResult) -> list[dict[str, Any]]:
+    return [{c: plain_value(v) for c, v in zip(result.columns, r)} for r in result.rows]
+
+
+def to_json(result: ReportResult) -> str:
+    return json.dumps(
+        {
+            "report": result.report,
+            "since": month_label(result.params.since),
+            "until": month_label(result.params.last_month),
+            "columns": list(result.columns),
+            "rows": as_dicts(result),
+        },
+        ensure_ascii=False,
+    )
+
+
+def to_csv(result: ReportResult) -> str:
+    out = io.StringIO()
+    w = csv.writer(out)
+    w.writerow(result.columns)
+    w.writerows([[plain_value(v) if v is not None else "" for v in r] for r in result.rows])
+    return "\ufeff" + out.getvalue()  # BOM عشان Excel
@@ -1,9 +1,105 @@
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
 from passlib.context import CryptContext
 
+from app.core.config import settings
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+T = TypeVar("T")
+
+# bcrypt بيسيب الـ GIL، فـ thread pool كفاية عشان نطلعه برا الـ event loop
+_hash_pool = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="pwhash",
+)
+_hash_slots: asyncio.Semaphore | None = None
+
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
+
+
+async def run_hashing(fn: Callable[..., T], *args) -> T:
+    # limit in-flight hashes so a login burst queues here instead of piling onto the pool
+    global _hash_slots
+    if _hash_slots is None:
+        _hash_slots = asyncio.Semaphore(settings.PASSWORD_HASH_WORKERS * 2)
+
+    async with _hash_slots:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_pool, fn, *args)
+
+
+async def hash_password_async(password: str) -> str:
+    return await run_hashing(hash_password, password)
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await run_hashing(verify_password, plain, hashed)
+
+
+def shutdown_hash_pool():
+    _hash_pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ---- failed-login throttling (per username and per client IP) ----
+# key -> (first_failure_at, failures); ordered by last failure (LRU), so idle
+# keys are dropped first and a key that keeps failing (the attacker's IP) stays
+_failures: "OrderedDict[str, tuple[float, int]]" = OrderedDict()
+
+
+def _prune(now: float):
+    # الـ keys جاية من الـ attacker (usernames عشوائية) — لازم الـ dict يفضل محدود
+    while _failures:
+        key, (started, _) = next(iter(_failures.items()))
+        if now - started <= settings.LOGIN_LOCKOUT_SECONDS and len(_failures) <= settings.LOGIN_THROTTLE_MAX_KEYS:
+            break
+        _failures.popitem(last=False)
+
+
+def _throttle_keys(username: str, ip: str | None) -> list[str]:
+    keys = [f"u:{(username or '').strip().lower()}"]
+    if ip:
+        keys.append(f"ip:{ip}")
+    return keys
+
+
+def login_blocked(username: str, ip: str | None) -> bool:
+    now = time.monotonic()
+    for key in _throttle_keys(username, ip):
+        entry = _failures.get(key)
+        if not entry:
+            continue
+        started, count = entry
+        if now - started > settings.LOGIN_LOCKOUT_SECONDS:
+            _failures.pop(key, None)
+            continue
+        limit = settings.LOGIN_MAX_FAILURES
+        if key.startswith("ip:"):
+            limit *= settings.LOGIN_IP_FAILURE_FACTOR
+        if count >= limit:
+            return True
+    return False
+
+
+def record_login_failure(username: str, ip: str | None):
+    now = time.monotonic()
+    for key in _throttle_keys(username, ip):
+        started, count = _failures.get(key, (now, 0))
+        if now - started > settings.LOGIN_LOCKOUT_SECONDS:
+            started, count = now, 0
+        _failures[key] = (started, count + 1)
+        _failures.move_to_end(key)
+    _prune(now)
+
+
+def reset_login_failures(username: str, ip: str | None):
+    # IP counter بيفضل زي ما هو — نجاح يوزر واحد مايمسحش محاولات على يوزرز تانيين
+    _failures.pop(_throttle_keys(username, ip)[0], None)
@@ -0,0 +1,47 @@
+"""One shared Jinja environment for every page, with a bytecode cache and startup precompile."""
+
+import os
+import time
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from app.core.assets import asset_url
+from app.core.config import settings
+
+TEMPLATE_DIR = "app/templates"
+
+
+def _bytecode_cache() -> FileSystemBytecodeCache | None:
+    if not settings.JINJA_BYTECODE_DIR:
+        return None
+    os.makedirs(settings.JINJA_BYTECODE_DIR, exist_ok=True)
+    return FileSystemBytecodeCache(settings.JINJA_BYTECODE_DIR)
+
+
+env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=True,  # نفس default بتاع Jinja2Templates
+    auto_reload=settings.TEMPLATES_AUTO_RELOAD,  # من غير mtime check لكل render إلا وقت تعديل الـ templates
+    bytecode_cache=_bytecode_cache(),
+    cache_size=-1,  # كل الـ templates تفضل في الذاكرة
+)
+
+env.globals["asset_url"] = asset_url  # {{ asset_url("app.css") }} -> /static/dist/app.<hash>.css
+
+templates = Jinja2Templates(env=env)
+
+
+def precompile() -> tuple[int, float]:
+    """Load (compile or read from bytecode cache) every template; returns (count, ms)."""
+    started = time.perf_counter()
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return len(names), (time.perf_counter() - started) * 1000
+
+
+# build step: python -m app.core.templating (بيملا الـ bytecode cache المشترك بين الـ workers)
+if __name__ == "__main__":
+    count, ms = precompile()
+    print(f"compiled {count} templates in {ms:.0f} ms -> {settings.JINJA_BYTECODE_DIR or '(no bytecode cache)'}")
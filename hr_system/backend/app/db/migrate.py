@@ -0,0 +1,225 @@
+"""Versioned schema migrations (app/db/migrations/mNNNN_<name>.py), applied at boot by ensure_schema()."""
+
+import asyncio
+import importlib
+import os
+import pkgutil
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from types import ModuleType
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+VERSION_TABLE = "schema_version"
+PG_LOCK_KEY = 0x48520001  # ثابت للـ advisory lock بتاع الـ migrations
+SQLITE_LOCK_WAIT = 600.0  # seconds
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    module: ModuleType
+
+    @property
+    def transactional(self) -> bool:
+        return getattr(self.module, "TRANSACTIONAL", True)
+
+
+# كل script: VERSION, DESCRIPTION, TRANSACTIONAL (False = autocommit عشان CONCURRENTLY), async upgrade(conn)
+# الـ DDL مكتوب في الـ script نفسه — مفيش import من app.models / app.core (الـ models بتتغير بعده)
+def load_migrations() -> list[Migration]:
+    folder = os.path.join(os.path.dirname(__file__), "migrations")
+    found: list[Migration] = []
+    for info in pkgutil.iter_modules([folder]):
+        if not info.name.startswith("m"):
+            continue
+        module = importlib.import_module(f"app.db.migrations.{info.name}")
+        found.append(Migration(module.VERSION, info.name, module))
+    found.sort(key=lambda m: m.version)
+
+    versions = [m.version for m in found]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError(f"duplicate migration versions: {versions}")
+    return found
+
+
+# ---------- helpers used by migration scripts ----------
+
+async def create_index_online(conn: AsyncConnection, table: str, ddl: str):
+    """`CREATE [UNIQUE] INDEX IF NOT EXISTS … ON table …` — CONCURRENTLY on Postgres,
+    one short transaction per index on SQLite."""
+    if conn.dialect.name == "postgresql":
+        # CONCURRENTLY مينفعش جوه transaction — الـ migration لازم تبقى TRANSACTIONAL = False
+        # ومينفعش على partitioned parent (audit_logs بعد `partition`)
+        if not await _pg_is_partitioned(conn, table):
+            ddl = ddl.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)
+            ddl = ddl.replace("CREATE UNIQUE INDEX", "CREATE UNIQUE INDEX CONCURRENTLY", 1)
+        await conn.execute(text(ddl))
+    else:
+        # SQLite مفيهوش online build؛ كل index في transaction لوحده عشان الـ writers يدخلوا بينهم
+        await _sqlite_step(conn, ddl)
+
+
+async def drop_index_online(conn: AsyncConnection, name: str):
+    if conn.dialect.name == "postgresql":
+        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    else:
+        await _sqlite_step(conn, f"DROP INDEX IF EXISTS {name}")
+
+
+async def _pg_is_partitioned(conn: AsyncConnection, table: str) -> bool:
+    res = await conn.execute(text("select relkind from pg_class where relname = :t"), {"t": table})
+    return res.scalar() == "p"
+
+
+async def _sqlite_step(conn: AsyncConnection, ddl: str):
+    await _begin_immediate(conn)
+    try:
+        await conn.execute(text(ddl))
+        await conn.execute(text("COMMIT"))
+    except Exception:
+        await conn.execute(text("ROLLBACK"))
+        raise
+
+
+# ---------- version table ----------
+
+async def _ensure_version_table(conn: AsyncConnection):
+    await conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ("
+        " version INTEGER PRIMARY KEY,"
+        " name VARCHAR(200) NOT NULL,"
+        " applied_at TIMESTAMP NOT NULL)"
+    ))
+
+
+async def current_version(conn: AsyncConnection) -> int:
+    try:
+        res = await conn.execute(text(f"SELECT max(version) FROM {VERSION_TABLE}"))
+    except Exception:
+        return 0
+    return res.scalar() or 0
+
+
+async def _record(conn: AsyncConnection, m: Migration):
+    await conn.execute(
+        text(f"INSERT INTO {VERSION_TABLE}(version, name, applied_at) VALUES (:v, :n, :t)"),
+        {"v": m.version, "n": m.name, "t": datetime.utcnow()},
+    )
+
+
+# ---------- runners ----------
+
+async def _upgrade_postgres(engine: AsyncEngine, pending: list[Migration]):
+    async with engine.connect() as lock_conn:
+        lock_conn = await lock_conn.execution_options(isolation_level="AUTOCOMMIT")
+        await lock_conn.execute(text("SELECT pg_advisory_lock(:k)"), {"k": PG_LOCK_KEY})
+        try:
+            await _ensure_version_table(lock_conn)
+            done = await current_version(lock_conn)
+            for m in pending:
+                if m.version <= done:
+                    continue
+                if m.transactional:
+                    async with engine.begin() as conn:
+                        await m.module.upgrade(conn)
+                        await _record(conn, m)
+                else:
+                    await m.module.upgrade(lock_conn)
+                    await _record(lock_conn, m)
+        finally:
+            await lock_conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": PG_LOCK_KEY})
+
+
+async def _begin_immediate(conn: AsyncConnection):
+    # worker تاني شايل الـ lock => نستنى لحد ما يخلص
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + SQLITE_LOCK_WAIT
+    while True:
+        try:
+            await conn.execute(text("BEGIN IMMEDIATE"))
+            return
+        except OperationalError as e:
+            if "locked" not in str(e) or loop.time() > deadline:
+                raise
+            await asyncio.sleep(0.5)
+
+
+async def _upgrade_sqlite(engine: AsyncEngine, pending: list[Migration]):
+    async with engine.connect() as conn:
+        # driver-level transactions off: BEGIN/COMMIT بإيدنا
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await _begin_immediate(conn)
+        try:
+            await _ensure_version_table(conn)
+            done = await current_version(conn)
+            await conn.execute(text("COMMIT"))
+        except Exception:
+            await conn.execute(text("ROLLBACK"))
+            raise
+
+        for m in pending:
+            if m.version <= done:
+                continue
+            if m.transactional:
+                await _begin_immediate(conn)
+                try:
+                    if await current_version(conn) >= m.version:
+                        await conn.execute(text("COMMIT"))
+                        continue
+                    await m.module.upgrade(conn)
+                    await _record(conn, m)
+                    await conn.execute(text("COMMIT"))
+                except Exception:
+                    await conn.execute(text("ROLLBACK"))
+                    raise
+            else:
+                # index builds: كل index بياخد transaction لوحده جوه upgrade()
+                await m.module.upgrade(conn)
+                await _begin_immediate(conn)
+                if await current_version(conn) < m.version:
+                    await _record(conn, m)
+                await conn.execute(text("COMMIT"))
+
+
+async def ensure_schema(engine: AsyncEngine) -> int:
+    migrations = load_migrations()
+    latest = migrations[-1].version if migrations else 0
+
+    # fast path: schema current => query واحدة؛ غير كده lock بين الـ processes
+    # (pg_advisory_lock / BEGIN IMMEDIATE) وcheck تاني قبل الـ upgrade
+    async with engine.connect() as conn:
+        if await current_version(conn) >= latest:
+            return latest
+
+    if engine.dialect.name == "postgresql":
+        await _upgrade_postgres(engine, migrations)
+    else:
+        await _upgrade_sqlite(engine, migrations)
+    return latest
+
+
+# python -m app.db.migrate [status]
+async def _main(cmd: str):
+    from app.db.session import engine
+
+    if cmd == "status":
+        migrations = load_migrations()
+        async with engine.connect() as conn:
+            done = await current_version(conn)
+        for m in migrations:
+            print(f"{'x' if m.version <= done else ' '} {m.version:04d} {m.name}")
+    elif cmd in ("", "upgrade"):
+        print(f"schema at version {await ensure_schema(engine)}")
+    else:
+        print(__doc__, file=sys.stderr)
+        sys.exit(2)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main(sys.argv[1] if len(sys.argv) > 1 else ""))
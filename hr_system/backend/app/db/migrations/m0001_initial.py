@@ -0,0 +1,154 @@
+"""Baseline tables as create_all built them; frozen DDL, no app.models import."""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+VERSION = 1
+DESCRIPTION = "initial schema"
+
+# نفس الـ DDL للاتنين؛ الفرق في الأنواع بس
+TYPES = {
+    "sqlite": {"pk": "INTEGER", "ts": "DATETIME", "ts_naive": "DATETIME", "json": "JSON"},
+    "postgresql": {
+        "pk": "SERIAL",
+        "ts": "TIMESTAMP WITH TIME ZONE",
+        "ts_naive": "TIMESTAMP WITHOUT TIME ZONE",
+        "json": "JSONB",
+    },
+}
+
+DDL = [
+    """CREATE TABLE IF NOT EXISTS departments (
+        id {pk} NOT NULL,
+        name VARCHAR(120) NOT NULL,
+        PRIMARY KEY (id)
+    )""",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_departments_name ON departments (name)",
+
+    """CREATE TABLE IF NOT EXISTS users (
+        id {pk} NOT NULL,
+        username VARCHAR(50) NOT NULL,
+        password_hash VARCHAR(255) NOT NULL,
+        is_admin BOOLEAN NOT NULL,
+        PRIMARY KEY (id)
+    )""",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_username ON users (username)",
+
+    """CREATE TABLE IF NOT EXISTS audit_logs (
+        id {pk} NOT NULL,
+        actor_user_id INTEGER,
+        action VARCHAR(80) NOT NULL,
+        entity VARCHAR(80),
+        entity_id INTEGER,
+        meta {json},
+        created_at {ts} NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY (actor_user_id) REFERENCES users (id) ON DELETE SET NULL
+    )""",
+    # بتتشال في m0002
+    "CREATE INDEX IF NOT EXISTS ix_audit_logs_action ON audit_logs (action)",
+    "CREATE INDEX IF NOT EXISTS ix_audit_logs_actor_user_id ON audit_logs (actor_user_id)",
+
+    """CREATE TABLE IF NOT EXISTS employees (
+        id {pk} NOT NULL,
+        full_name VARCHAR(200) NOT NULL,
+        email VARCHAR(200) NOT NULL,
+        job_title VARCHAR(200) NOT NULL,
+        hire_date DATE,
+        base_salary NUMERIC(12, 2) NOT NULL,
+        department_id INTEGER,
+        PRIMARY KEY (id),
+        FOREIGN KEY (department_id) REFERENCES departments (id)
+    )""",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_employees_email ON employees (email)",
+    # بيتشال في m0003
+    "CREATE INDEX IF NOT EXISTS ix_employees_full_name ON employees (full_name)",
+
+    """CREATE TABLE IF NOT EXISTS payroll_runs (
+        id {pk} NOT NULL,
+        period_start DATE NOT NULL,
+        period_end DATE NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        notes TEXT,
+        created_by INTEGER,
+        created_at {ts} NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY (created_by) REFERENCES users (id) ON DELETE SET NULL
+    )""",
+
+    """CREATE TABLE IF NOT EXISTS allowances (
+        id {pk} NOT NULL,
+        employee_id INTEGER NOT NULL,
+        name VARCHAR(80) NOT NULL,
+        amount NUMERIC(12, 2) NOT NULL,
+        active BOOLEAN NOT NULL,
+        created_at {ts} NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY (employee_id) REFERENCES employees (id) ON DELETE CASCADE
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_allowances_employee_id ON allowances (employee_id)",
+
+    """CREATE TABLE IF NOT EXISTS attendance (
+        id {pk} NOT NULL,
+        employee_id INTEGER NOT NULL,
+        check_in {ts_naive},
+        check_out {ts_naive},
+        PRIMARY KEY (id),
+        FOREIGN KEY (employee_id) REFERENCES employees (id) ON DELETE CASCADE
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_attendance_check_in ON attendance (check_in)",
+    "CREATE INDEX IF NOT EXISTS ix_attendance_check_out ON attendance (check_out)",
+    "CREATE INDEX IF NOT EXISTS ix_attendance_employee_id ON attendance (employee_id)",
+    "CREATE INDEX IF NOT EXISTS ix_attendance_id ON attendance (id)",
+
+    """CREATE TABLE IF NOT EXISTS deductions (
+        id {pk} NOT NULL,
+        employee_id INTEGER NOT NULL,
+        name VARCHAR(80) NOT NULL,
+        amount NUMERIC(12, 2) NOT NULL,
+        active BOOLEAN NOT NULL,
+        created_at {ts} NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY (employee_id) REFERENCES employees (id) ON DELETE CASCADE
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_deductions_employee_id ON deductions (employee_id)",
+
+    """CREATE TABLE IF NOT EXISTS leave_requests (
+        id {pk} NOT NULL,
+        employee_id INTEGER NOT NULL,
+        from_date DATE NOT NULL,
+        to_date DATE NOT NULL,
+        leave_type VARCHAR(50) NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        reason TEXT,
+        approved_by INTEGER,
+        created_at {ts} NOT NULL,
+        decided_at {ts},
+        PRIMARY KEY (id),
+        FOREIGN KEY (employee_id) REFERENCES employees (id) ON DELETE CASCADE,
+        FOREIGN KEY (approved_by) REFERENCES users (id) ON DELETE SET NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_leave_requests_employee_id ON leave_requests (employee_id)",
+
+    """CREATE TABLE IF NOT EXISTS payroll_items (
+        id {pk} NOT NULL,
+        run_id INTEGER NOT NULL,
+        employee_id INTEGER NOT NULL,
+        base_salary NUMERIC(12, 2) NOT NULL,
+        allowances_total NUMERIC(12, 2) NOT NULL,
+        deductions_total NUMERIC(12, 2) NOT NULL,
+        net_pay NUMERIC(12, 2) NOT NULL,
+        generated_at {ts} NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY (run_id) REFERENCES payroll_runs (id) ON DELETE CASCADE,
+        FOREIGN KEY (employee_id) REFERENCES employees (id) ON DELETE CASCADE
+    )""",
+    # بيتشال في m0009
+    "CREATE INDEX IF NOT EXISTS ix_payroll_items_employee_id ON payroll_items (employee_id)",
+]
+
+
+async def upgrade(conn: AsyncConnection):
+    types = TYPES["postgresql" if conn.dialect.name == "postgresql" else "sqlite"]
+    for sql in DDL:
+        await conn.execute(text(sql.format(**types)))
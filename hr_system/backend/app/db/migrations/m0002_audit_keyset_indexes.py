@@ -0,0 +1,34 @@
+"""Keyset/filter indexes on audit_logs for DBs created before they were in the model."""
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.db.migrate import create_index_online, drop_index_online
+
+VERSION = 2
+DESCRIPTION = "audit_logs (…, created_at, id) + meta expression indexes"
+TRANSACTIONAL = False
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_audit_logs_action_created_at ON audit_logs (action, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_audit_logs_actor_created_at ON audit_logs (actor_user_id, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_audit_logs_created_at_id ON audit_logs (created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_audit_logs_entity_created_at ON audit_logs (entity, entity_id, created_at, id)",
+]
+
+# لازم يطابق audit_meta_key (app/models/audit_log.py) حرفياً وإلا الـ planner مش هيستخدمه
+META_INDEX = {
+    "sqlite": "CREATE INDEX IF NOT EXISTS ix_audit_logs_meta_employee_id"
+              " ON audit_logs (JSON_EXTRACT(meta, '$.\"employee_id\"'))",
+    "postgresql": "CREATE INDEX IF NOT EXISTS ix_audit_logs_meta_employee_id"
+                  " ON audit_logs (CAST((meta ->> 'employee_id') AS INTEGER))",
+}
+
+
+async def upgrade(conn: AsyncConnection):
+    dialect = "postgresql" if conn.dialect.name == "postgresql" else "sqlite"
+    for ddl in INDEXES + [META_INDEX[dialect]]:
+        await create_index_online(conn, "audit_logs", ddl)
+
+    # single-column indexes اللي اتشالت من الـ model — بقت مغطية بالـ composite
+    await drop_index_online(conn, "ix_audit_logs_action")
+    await drop_index_online(conn, "ix_audit_logs_actor_user_id")
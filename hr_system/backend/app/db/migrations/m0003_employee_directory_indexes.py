@@ -0,0 +1,23 @@
+"""Composite indexes behind the keyset-paginated employee directory."""
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.db.migrate import create_index_online, drop_index_online
+
+VERSION = 3
+DESCRIPTION = "employees (full_name, id) / (job_title, …) / (department_id, …) indexes"
+TRANSACTIONAL = False
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_employees_department_full_name_id ON employees (department_id, full_name, id)",
+    "CREATE INDEX IF NOT EXISTS ix_employees_full_name_id ON employees (full_name, id)",
+    "CREATE INDEX IF NOT EXISTS ix_employees_job_title_full_name_id ON employees (job_title, full_name, id)",
+]
+
+
+async def upgrade(conn: AsyncConnection):
+    for ddl in INDEXES:
+        await create_index_online(conn, "employees", ddl)
+
+    # اتغطى بـ ix_employees_full_name_id
+    await drop_index_online(conn, "ix_employees_full_name")
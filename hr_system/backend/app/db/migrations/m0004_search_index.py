@@ -0,0 +1,185 @@
+"""search_docs full-text index (FTS5 / tsvector + GIN), id = ref_id * 4 + kind, synced by triggers."""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+VERSION = 4
+DESCRIPTION = "full-text search_docs + sync triggers"
+
+# kind codes — لازم تفضل زي KINDS في app/queries/search.py
+EMPLOYEE, LEAVE, AUDIT = 1, 2, 3
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_docs USING fts5("
+    " title, body, kind UNINDEXED, ref_id UNINDEXED, parent_id UNINDEXED,"
+    " tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+
+    # employees
+    f"""CREATE TRIGGER IF NOT EXISTS trg_search_employees_ins AFTER INSERT ON employees BEGIN
+        INSERT INTO search_docs(rowid, title, body, kind, ref_id, parent_id)
+        VALUES (new.id * 4 + {EMPLOYEE}, new.full_name,
+                coalesce(new.email, '') || ' ' || coalesce(new.job_title, ''),
+                {EMPLOYEE}, new.id, new.department_id);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_search_employees_upd
+        AFTER UPDATE OF full_name, email, job_title, department_id ON employees BEGIN
+        DELETE FROM search_docs WHERE rowid = old.id * 4 + {EMPLOYEE};
+        INSERT INTO search_docs(rowid, title, body, kind, ref_id, parent_id)
+        VALUES (new.id * 4 + {EMPLOYEE}, new.full_name,
+                coalesce(new.email, '') || ' ' || coalesce(new.job_title, ''),
+                {EMPLOYEE}, new.id, new.department_id);
+        UPDATE search_docs SET title = new.full_name
+        WHERE rowid IN (SELECT id * 4 + {LEAVE} FROM leave_requests WHERE employee_id = new.id);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_search_employees_del AFTER DELETE ON employees BEGIN
+        DELETE FROM search_docs WHERE rowid = old.id * 4 + {EMPLOYEE};
+        DELETE FROM search_docs
+        WHERE rowid IN (SELECT id * 4 + {LEAVE} FROM leave_requests WHERE employee_id = old.id);
+    END""",
+
+    # leave_requests (title = اسم الموظف عشان "Ali trip" تلاقي الإجازة)
+    f"""CREATE TRIGGER IF NOT EXISTS trg_search_leaves_ins AFTER INSERT ON leave_requests BEGIN
+        INSERT INTO search_docs(rowid, title, body, kind, ref_id, parent_id)
+        VALUES (new.id * 4 + {LEAVE},
+                coalesce((SELECT full_name FROM employees WHERE id = new.employee_id), ''),
+                coalesce(new.reason, ''), {LEAVE}, new.id, new.employee_id);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_search_leaves_upd
+        AFTER UPDATE OF reason, employee_id ON leave_requests BEGIN
+        DELETE FROM search_docs WHERE rowid = old.id * 4 + {LEAVE};
+        INSERT INTO search_docs(rowid, title, body, kind, ref_id, parent_id)
+        VALUES (new.id * 4 + {LEAVE},
+                coalesce((SELECT full_name FROM employees WHERE id = new.employee_id), ''),
+                coalesce(new.reason, ''), {LEAVE}, new.id, new.employee_id);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_search_leaves_del AFTER DELETE ON leave_requests BEGIN
+        DELETE FROM search_docs WHERE rowid = old.id * 4 + {LEAVE};
+    END""",
+
+    # audit_logs (append-only؛ delete بييجي من الـ retention)
+    f"""CREATE TRIGGER IF NOT EXISTS trg_search_audit_ins AFTER INSERT ON audit_logs BEGIN
+        INSERT INTO search_docs(rowid, title, body, kind, ref_id, parent_id)
+        VALUES (new.id * 4 + {AUDIT}, new.action,
+                coalesce(new.entity, '') || ' ' || coalesce(new.meta, ''),
+                {AUDIT}, new.id, new.entity_id);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_search_audit_del AFTER DELETE ON audit_logs BEGIN
+        DELETE FROM search_docs WHERE rowid = old.id * 4 + {AUDIT};
+    END""",
+]
+
+SQLITE_BACKFILL = [
+    "DELETE FROM search_docs",
+    f"""INSERT INTO search_docs(rowid, title, body, kind, ref_id, parent_id)
+        SELECT id * 4 + {EMPLOYEE}, full_name, coalesce(email, '') || ' ' || coalesce(job_title, ''),
+               {EMPLOYEE}, id, department_id
+        FROM employees""",
+    f"""INSERT INTO search_docs(rowid, title, body, kind, ref_id, parent_id)
+        SELECT l.id * 4 + {LEAVE}, coalesce(e.full_name, ''), coalesce(l.reason, ''),
+               {LEAVE}, l.id, l.employee_id
+        FROM leave_requests l LEFT JOIN employees e ON e.id = l.employee_id""",
+    f"""INSERT INTO search_docs(rowid, title, body, kind, ref_id, parent_id)
+        SELECT id * 4 + {AUDIT}, action, coalesce(entity, '') || ' ' || coalesce(meta, ''),
+               {AUDIT}, id, entity_id
+        FROM audit_logs""",
+    "INSERT INTO search_docs(search_docs) VALUES ('optimize')",
+]
+
+PG_DDL = [
+    """CREATE TABLE IF NOT EXISTS search_docs (
+        id BIGINT PRIMARY KEY,
+        kind SMALLINT NOT NULL,
+        ref_id INTEGER NOT NULL,
+        parent_id INTEGER,
+        title TEXT NOT NULL DEFAULT '',
+        body TEXT NOT NULL DEFAULT '',
+        tsv TSVECTOR GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', title), 'A') || setweight(to_tsvector('simple', body), 'B')
+        ) STORED
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_search_docs_tsv ON search_docs USING gin (tsv)",
+
+    f"""CREATE OR REPLACE FUNCTION search_docs_employees() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            DELETE FROM search_docs WHERE id = OLD.id * 4 + {EMPLOYEE};
+            DELETE FROM search_docs
+            WHERE id IN (SELECT id * 4 + {LEAVE} FROM leave_requests WHERE employee_id = OLD.id);
+            RETURN OLD;
+        END IF;
+        INSERT INTO search_docs(id, kind, ref_id, parent_id, title, body)
+        VALUES (NEW.id * 4 + {EMPLOYEE}, {EMPLOYEE}, NEW.id, NEW.department_id, NEW.full_name,
+                coalesce(NEW.email, '') || ' ' || coalesce(NEW.job_title, ''))
+        ON CONFLICT (id) DO UPDATE
+            SET parent_id = EXCLUDED.parent_id, title = EXCLUDED.title, body = EXCLUDED.body;
+        IF TG_OP = 'UPDATE' AND NEW.full_name IS DISTINCT FROM OLD.full_name THEN
+            UPDATE search_docs SET title = NEW.full_name
+            WHERE id IN (SELECT id * 4 + {LEAVE} FROM leave_requests WHERE employee_id = NEW.id);
+        END IF;
+        RETURN NEW;
+    END $$ LANGUAGE plpgsql""",
+
+    f"""CREATE OR REPLACE FUNCTION search_docs_leaves() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            DELETE FROM search_docs WHERE id = OLD.id * 4 + {LEAVE};
+            RETURN OLD;
+        END IF;
+        INSERT INTO search_docs(id, kind, ref_id, parent_id, title, body)
+        VALUES (NEW.id * 4 + {LEAVE}, {LEAVE}, NEW.id, NEW.employee_id,
+                coalesce((SELECT full_name FROM employees WHERE id = NEW.employee_id), ''),
+                coalesce(NEW.reason, ''))
+        ON CONFLICT (id) DO UPDATE
+            SET parent_id = EXCLUDED.parent_id, title = EXCLUDED.title, body = EXCLUDED.body;
+        RETURN NEW;
+    END $$ LANGUAGE plpgsql""",
+
+    f"""CREATE OR REPLACE FUNCTION search_docs_audit() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            DELETE FROM search_docs WHERE id = OLD.id * 4 + {AUDIT};
+            RETURN OLD;
+        END IF;
+        INSERT INTO search_docs(id, kind, ref_id, parent_id, title, body)
+        VALUES (NEW.id * 4 + {AUDIT}, {AUDIT}, NEW.id, NEW.entity_id, NEW.action,
+                coalesce(NEW.entity, '') || ' ' || coalesce(NEW.meta::text, ''))
+        ON CONFLICT (id) DO NOTHING;
+        RETURN NEW;
+    END $$ LANGUAGE plpgsql""",
+
+    "DROP TRIGGER IF EXISTS trg_search_employees ON employees",
+    "CREATE TRIGGER trg_search_employees AFTER INSERT OR DELETE"
+    " OR UPDATE OF full_name, email, job_title, department_id ON employees"
+    " FOR EACH ROW EXECUTE FUNCTION search_docs_employees()",
+    "DROP TRIGGER IF EXISTS trg_search_leaves ON leave_requests",
+    "CREATE TRIGGER trg_search_leaves AFTER INSERT OR DELETE OR UPDATE OF reason, employee_id"
+    " ON leave_requests FOR EACH ROW EXECUTE FUNCTION search_docs_leaves()",
+    "DROP TRIGGER IF EXISTS trg_search_audit ON audit_logs",
+    "CREATE TRIGGER trg_search_audit AFTER INSERT OR DELETE ON audit_logs"
+    " FOR EACH ROW EXECUTE FUNCTION search_docs_audit()",
+]
+
+PG_BACKFILL = [
+    f"""INSERT INTO search_docs(id, kind, ref_id, parent_id, title, body)
+        SELECT id * 4 + {EMPLOYEE}, {EMPLOYEE}, id, department_id, full_name,
+               coalesce(email, '') || ' ' || coalesce(job_title, '')
+        FROM employees ON CONFLICT (id) DO NOTHING""",
+    f"""INSERT INTO search_docs(id, kind, ref_id, parent_id, title, body)
+        SELECT l.id * 4 + {LEAVE}, {LEAVE}, l.id, l.employee_id, coalesce(e.full_name, ''),
+               coalesce(l.reason, '')
+        FROM leave_requests l LEFT JOIN employees e ON e.id = l.employee_id
+        ON CONFLICT (id) DO NOTHING""",
+    f"""INSERT INTO search_docs(id, kind, ref_id, parent_id, title, body)
+        SELECT id * 4 + {AUDIT}, {AUDIT}, id, entity_id, action,
+               coalesce(entity, '') || ' ' || coalesce(meta::text, '')
+        FROM audit_logs ON CONFLICT (id) DO NOTHING""",
+]
+
+
+async def upgrade(conn: AsyncConnection):
+    if conn.dialect.name == "postgresql":
+        statements = PG_DDL + PG_BACKFILL
+    else:
+        statements = SQLITE_DDL + SQLITE_BACKFILL
+    for sql in statements:
+        await conn.execute(text(sql))
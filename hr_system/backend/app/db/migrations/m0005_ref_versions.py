@@ -0,0 +1,21 @@
+"""ref_versions: per-table version row polled by app/core/refcache.py across workers."""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+VERSION = 5
+DESCRIPTION = "ref_versions for cross-worker reference cache invalidation"
+
+
+async def upgrade(conn: AsyncConnection):
+    await conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS ref_versions ("
+        " name VARCHAR(50) PRIMARY KEY,"
+        " version BIGINT NOT NULL DEFAULT 0)"
+    ))
+    for name in ("employees", "departments"):
+        await conn.execute(
+            text("INSERT INTO ref_versions(name, version) SELECT :n, 0 WHERE NOT EXISTS "
+                 "(SELECT 1 FROM ref_versions WHERE name = :n)"),
+            {"n": name},
+        )
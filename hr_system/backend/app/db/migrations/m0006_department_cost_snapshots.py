@@ -0,0 +1,54 @@
+"""department_cost_snapshots (per payroll run, per department) + backfill of existing runs."""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+VERSION = 6
+DESCRIPTION = "department cost snapshots per payroll run"
+
+TABLE = """CREATE TABLE IF NOT EXISTS department_cost_snapshots (
+    id {pk} NOT NULL,
+    run_id INTEGER NOT NULL,
+    department_id INTEGER,
+    department_name VARCHAR(120) NOT NULL,
+    headcount INTEGER NOT NULL,
+    base_total NUMERIC(14, 2) NOT NULL,
+    allowances_total NUMERIC(14, 2) NOT NULL,
+    deductions_total NUMERIC(14, 2) NOT NULL,
+    net_total NUMERIC(14, 2) NOT NULL,
+    created_at {ts} NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY (run_id) REFERENCES payroll_runs (id) ON DELETE CASCADE
+)"""
+
+
+async def upgrade(conn: AsyncConnection):
+    if conn.dialect.name == "postgresql":
+        types = {"pk": "SERIAL", "ts": "TIMESTAMP WITH TIME ZONE"}
+    else:
+        types = {"pk": "INTEGER", "ts": "DATETIME"}
+    await conn.execute(text(TABLE.format(**types)))
+    await conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_department_cost_snapshots_run_id ON department_cost_snapshots (run_id)"
+    ))
+
+    # runs القديمة: القسم الحالي للموظف هو أحسن تقدير متاح
+    await conn.execute(text("""
+        INSERT INTO department_cost_snapshots
+            (run_id, department_id, department_name, headcount,
+             base_total, allowances_total, deductions_total, net_total, created_at)
+        SELECT pi.run_id, e.department_id, COALESCE(d.name, ''), COUNT(pi.id),
+               SUM(pi.base_salary), SUM(pi.allowances_total), SUM(pi.deductions_total), SUM(pi.net_pay),
+               MAX(pi.generated_at)
+        FROM payroll_items pi
+        JOIN employees e ON e.id = pi.employee_id
+        LEFT JOIN departments d ON d.id = e.department_id
+        WHERE NOT EXISTS (SELECT 1 FROM department_cost_snapshots s WHERE s.run_id = pi.run_id)
+        GROUP BY pi.run_id, e.department_id, d.name
+    """))
+
+    await conn.execute(text(
+        "INSERT INTO ref_versions(name, version) SELECT 'payroll', 0 WHERE NOT EXISTS "
+        "(SELECT 1 FROM ref_versions WHERE name = 'payroll')"
+    ))
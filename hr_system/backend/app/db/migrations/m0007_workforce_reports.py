@@ -0,0 +1,24 @@
+"""Workforce reports: leave_requests.from_date index + ref_versions rows for attendance / leaves."""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.db.migrate import create_index_online
+
+VERSION = 7
+DESCRIPTION = "leave_requests (from_date) index, attendance/leaves data versions"
+TRANSACTIONAL = False
+
+
+async def upgrade(conn: AsyncConnection):
+    await create_index_online(
+        conn, "leave_requests",
+        "CREATE INDEX IF NOT EXISTS ix_leave_requests_from_date ON leave_requests (from_date)",
+    )
+
+    for name in ("attendance", "leaves"):
+        await conn.execute(
+            text("INSERT INTO ref_versions(name, version) SELECT :n, 0 WHERE NOT EXISTS "
+                 "(SELECT 1 FROM ref_versions WHERE name = :n)"),
+            {"n": name},
+        )
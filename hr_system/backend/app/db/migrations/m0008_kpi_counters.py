@@ -0,0 +1,43 @@
+"""kpi_counters, seeded from the data with a frozen copy of kpi.reconcile() as of this version."""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import DateTime, bindparam, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+VERSION = 8
+DESCRIPTION = "kpi_counters for the dashboard"
+
+SEED = {
+    "employees": "SELECT COUNT(*) FROM employees",
+    "on_site": "SELECT COUNT(*) FROM attendance a JOIN employees e ON e.id = a.employee_id"
+               " WHERE a.check_out IS NULL AND a.check_in IS NOT NULL",
+    "pending_leaves": "SELECT COUNT(*) FROM leave_requests l JOIN employees e ON e.id = l.employee_id"
+                      " WHERE l.status = 'pending'",
+    "last_payroll_net": "SELECT COALESCE(SUM(net_pay), 0) FROM payroll_items WHERE run_id ="
+                        " (SELECT id FROM payroll_runs WHERE status = 'posted'"
+                        " ORDER BY created_at DESC, id DESC LIMIT 1)",
+    # الاسم "audit:<اليوم>" بيتحسب تحت
+    "audit": "SELECT COUNT(*) FROM audit_logs WHERE created_at >= :a AND created_at < :b",
+}
+
+
+async def upgrade(conn: AsyncConnection):
+    await conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS kpi_counters ("
+        " name VARCHAR(60) PRIMARY KEY,"
+        " value NUMERIC(16, 2) NOT NULL DEFAULT 0,"
+        " updated_at TIMESTAMP NOT NULL)"
+    ))
+
+    now = datetime.utcnow()
+    today = datetime.combine(now.date(), datetime.min.time())
+    for name, query in SEED.items():
+        params = {"n": name, "t": now}
+        if name == "audit":
+            params.update(n=f"audit:{today.date().isoformat()}", a=today, b=today + timedelta(days=1))
+        stmt = text(
+            f"INSERT INTO kpi_counters(name, value, updated_at) VALUES (:n, ({query}), :t) "
+            "ON CONFLICT (name) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at"
+        ).bindparams(*(bindparam(k, type_=DateTime()) for k in ("t", "a", "b") if k in params))
+        await conn.execute(stmt, params)
@@ -0,0 +1,22 @@
+"""payroll_items (run_id, employee_id) / (employee_id, generated_at) for run detail + pay history."""
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.db.migrate import create_index_online, drop_index_online
+
+VERSION = 9
+DESCRIPTION = "payroll_items (run_id, employee_id) / (employee_id, generated_at) indexes"
+TRANSACTIONAL = False
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_payroll_items_employee_id_generated_at ON payroll_items (employee_id, generated_at)",
+    "CREATE INDEX IF NOT EXISTS ix_payroll_items_run_id_employee_id ON payroll_items (run_id, employee_id)",
+]
+
+
+async def upgrade(conn: AsyncConnection):
+    for ddl in INDEXES:
+        await create_index_online(conn, "payroll_items", ddl)
+
+    # اتغطى بـ ix_payroll_items_employee_id_generated_at
+    await drop_index_online(conn, "ix_payroll_items_employee_id")
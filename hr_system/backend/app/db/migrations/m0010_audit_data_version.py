@@ -0,0 +1,15 @@
+"""ref_versions row for audit_logs (conditional GET on the audit page)."""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+VERSION = 10
+DESCRIPTION = "audit data version"
+
+
+async def upgrade(conn: AsyncConnection):
+    await conn.execute(
+        text("INSERT INTO ref_versions(name, version) SELECT :n, 0 WHERE NOT EXISTS "
+             "(SELECT 1 FROM ref_versions WHERE name = :n)"),
+        {"n": "audit"},
+    )
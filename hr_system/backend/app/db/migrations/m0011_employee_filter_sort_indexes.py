@@ -0,0 +1,23 @@
+"""employees (filter, sort…) indexes so every directory filter × sort pair pages without a sort step."""
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.db.migrate import create_index_online
+
+VERSION = 11
+DESCRIPTION = "employees (department_id | job_title, email / job_title / id) directory indexes"
+TRANSACTIONAL = False
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_employees_department_email_id ON employees (department_id, email, id)",
+    "CREATE INDEX IF NOT EXISTS ix_employees_department_id_id ON employees (department_id, id)",
+    "CREATE INDEX IF NOT EXISTS ix_employees_department_job_title_full_name_id"
+    " ON employees (department_id, job_title, full_name, id)",
+    "CREATE INDEX IF NOT EXISTS ix_employees_job_title_email_id ON employees (job_title, email, id)",
+    "CREATE INDEX IF NOT EXISTS ix_employees_job_title_id ON employees (job_title, id)",
+]
+
+
+async def upgrade(conn: AsyncConnection):
+    for ddl in INDEXES:
+        await create_index_online(conn, "employees", ddl)
@@ -0,0 +1,15 @@
+"""ref_versions row for users/roles (current-user cache across workers)."""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+VERSION = 12
+DESCRIPTION = "users data version"
+
+
+async def upgrade(conn: AsyncConnection):
+    await conn.execute(
+        text("INSERT INTO ref_versions(name, version) SELECT :n, 0 WHERE NOT EXISTS "
+             "(SELECT 1 FROM ref_versions WHERE name = :n)"),
+        {"n": "users"},
+    )
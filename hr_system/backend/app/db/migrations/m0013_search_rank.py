@@ -0,0 +1,15 @@
+"""FTS5 rank = weighted bm25 (title 10, body 1), so search orders the whole match set by `rank`."""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+VERSION = 13
+DESCRIPTION = "search_docs bm25 rank"
+
+
+async def upgrade(conn: AsyncConnection):
+    # Postgres: ts_rank_cd بالـ weights بتاعته في الـ query نفسها
+    if conn.dialect.name != "sqlite":
+        return
+    # الـ config بيتخزن جوه الـ FTS table نفسها (search_docs_config)
+    await conn.execute(text("INSERT INTO search_docs(search_docs, rank) VALUES ('rank', 'bm25(10.0, 1.0)')"))
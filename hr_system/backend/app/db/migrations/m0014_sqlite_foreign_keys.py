@@ -0,0 +1,33 @@
+"""SQLite: clear rows left behind while foreign_keys was off, before the app turns it on."""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+VERSION = 14
+DESCRIPTION = "orphan cleanup for PRAGMA foreign_keys=ON"
+
+# نفس الـ ON DELETE اللي في الـ schema (m0001 / m0006): CASCADE => delete، SET NULL / مفيش => NULL
+CLEANUP = [
+    "DELETE FROM attendance WHERE employee_id NOT IN (SELECT id FROM employees)",
+    "DELETE FROM leave_requests WHERE employee_id NOT IN (SELECT id FROM employees)",
+    "DELETE FROM allowances WHERE employee_id NOT IN (SELECT id FROM employees)",
+    "DELETE FROM deductions WHERE employee_id NOT IN (SELECT id FROM employees)",
+    "DELETE FROM payroll_items WHERE employee_id NOT IN (SELECT id FROM employees)"
+    " OR run_id NOT IN (SELECT id FROM payroll_runs)",
+    "DELETE FROM department_cost_snapshots WHERE run_id NOT IN (SELECT id FROM payroll_runs)",
+    "UPDATE employees SET department_id = NULL WHERE department_id NOT IN (SELECT id FROM departments)",
+    "UPDATE leave_requests SET approved_by = NULL WHERE approved_by NOT IN (SELECT id FROM users)",
+    "UPDATE payroll_runs SET created_by = NULL WHERE created_by NOT IN (SELECT id FROM users)",
+    "UPDATE audit_logs SET actor_user_id = NULL WHERE actor_user_id NOT IN (SELECT id FROM users)",
+]
+
+
+async def upgrade(conn: AsyncConnection):
+    # Postgres بيفرض الـ foreign keys من الأول
+    if conn.dialect.name != "sqlite":
+        return
+    for ddl in CLEANUP:
+        await conn.execute(text(ddl))
+    left = (await conn.execute(text("PRAGMA foreign_key_check"))).all()
+    if left:
+        raise RuntimeError(f"rows still violate foreign keys: {sorted({r[0] for r in left})}")
@@ -1,9 +1,84 @@
+import re
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from app.core.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False, future=True)
+_PRAGMA_VALUE = re.compile(r"^-?[A-Za-z0-9_]+$")
+
+
+def _engine_kwargs(url: str) -> dict:
+    kwargs: dict = dict(
+        echo=False,
+        future=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=False,
+    )
+    if url.startswith("sqlite"):
+        # aiosqlite default = NullPool (connection جديدة + pragmas مع كل session)
+        kwargs["poolclass"] = AsyncAdaptedQueuePool
+        # sqlite3 بيكاش الـ prepared statements per connection
+        kwargs["connect_args"] = {"cached_statements": settings.DB_STATEMENT_CACHE_SIZE}
+    else:
+        kwargs["pool_recycle"] = settings.DB_POOL_RECYCLE
+        kwargs["connect_args"] = {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+    return kwargs
+
+
+def apply_sqlite_pragmas(sync_engine, pragmas: dict[str, str]):
+    # بيتنفذ مرة لكل connection جديدة في الـ pool
+    @event.listens_for(sync_engine, "connect")
+    def _set_pragmas(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        try:
+            for name, value in pragmas.items():
+                if not _PRAGMA_VALUE.match(value):
+                    raise ValueError(f"bad value for PRAGMA {name}: {value!r}")
+                cur.execute(f"PRAGMA {name}={value}")
+        finally:
+            cur.close()
+
+
+engine = create_async_engine(settings.DATABASE_URL, **_engine_kwargs(settings.DATABASE_URL))
+if engine.dialect.name == "sqlite":
+    apply_sqlite_pragmas(engine.sync_engine, settings.SQLITE_PRAGMAS)
+
+# read engine: replica / read-only SQLite pool — لو مش متحدد بيبقى نفس الـ writer
+_read_url = settings.DATABASE_READ_URL
+if _read_url:
+    read_engine = create_async_engine(_read_url, **_engine_kwargs(_read_url))
+    if read_engine.dialect.name == "sqlite":
+        # journal_mode بيتظبط من الـ writer؛ الـ ro connection مايقدرش يغيره
+        read_pragmas = {k: v for k, v in settings.SQLITE_PRAGMAS.items() if k != "journal_mode"}
+        read_pragmas["query_only"] = "1"
+        apply_sqlite_pragmas(read_engine.sync_engine, read_pragmas)
+else:
+    read_engine = engine
+
 AsyncSessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+ReadSessionLocal = async_sessionmaker(bind=read_engine, class_=AsyncSession, expire_on_commit=False)
 
 async def get_db():
+    # writer session بدون commit تلقائي (scripts / background jobs)
+    async with AsyncSessionLocal() as session:
+        yield session
+
+async def get_uow():
+    # unit of work لكل request: transaction واحدة، flush() للـ ids، commit مرة واحدة في الآخر
     async with AsyncSessionLocal() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+        else:
+            if session.in_transaction():
+                await session.commit()
+
+async def get_read_db():
+    # reader — GET pages (replica lag ممكن يبان على Postgres replica)
+    async with ReadSessionLocal() as session:
         yield session
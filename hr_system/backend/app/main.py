@@ -1,16 +1,22 @@
-from fastapi import FastAPI, Request
-from fastapi.staticfiles import StaticFiles
+from fastapi import Depends, FastAPI, Request
 from fastapi.responses import RedirectResponse
-from fastapi.templating import Jinja2Templates
 from starlette.middleware.sessions import SessionMiddleware
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.db.session import engine, AsyncSessionLocal
-from app.db.base import Base
+from app.db.session import engine, AsyncSessionLocal, get_read_db
+from app.core.templating import precompile, templates
+from app.core.assets import AssetFiles, ensure_built
+from app.core.compression import CompressionMiddleware
+from app.db.migrate import ensure_schema
 from app.api.router import router
 from app.models.user import User
-from app.core.security import hash_password
+from app.core.security import hash_password_async, shutdown_hash_pool
+from app.core.provisioning import shutdown_provisioning_pool, start_provisioning_pool
+from app.core.audit import audit_sink
+from app.core.audit_retention import ensure_audit_partitions
+from app.core.kpi import kpi_reconciler, read_counters
 
 import app.models  # noqa: F401
 
@@ -18,12 +24,12 @@ import app.models  # noqa: F401
 # ✅ NEW: attendance router
 from app.routers.attendance import router as attendance_router
 
-templates = Jinja2Templates(directory="app/templates")
-
 app = FastAPI(title="HR System MVP")
 app.add_middleware(SessionMiddleware, secret_key=settings.APP_SECRET_KEY)
+# آخر middleware = الأبعد: بيضغط الـ response النهائي
+app.add_middleware(CompressionMiddleware)
 
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+app.mount("/static", AssetFiles(directory="app/static"), name="static")
 app.include_router(router)
 
 from fastapi.responses import RedirectResponse
@@ -38,9 +44,17 @@ app.include_router(attendance_router)
 
 @app.on_event("startup")
 async def startup():
-    # MVP: create tables automatically. Later: Alembic migrations.
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # versioned migrations (app/db/migrations) — query واحدة لو الـ schema current
+    await ensure_schema(engine)
+
+    # كل الـ templates تتعمل compile (أو تتقري من الـ bytecode cache) قبل أول request
+    precompile()
+
+    # CSS bundle (app/static/dist) لو مش متبني؛ مع TEMPLATES_AUTO_RELOAD بيتبني كل مرة
+    ensure_built(force=settings.TEMPLATES_AUTO_RELOAD)
+
+    # Postgres: partitions للشهر الحالي واللي بعده (no-op على SQLite)
+    await ensure_audit_partitions()
 
     # Seed admin if not exists
     async with AsyncSessionLocal() as db:
@@ -50,16 +64,32 @@ async def startup():
             db.add(
                 User(
                     username=settings.ADMIN_USERNAME,
-                    password_hash=hash_password(settings.ADMIN_PASSWORD),
+                    password_hash=await hash_password_async(settings.ADMIN_PASSWORD),
                     is_admin=True,
                 )
             )
             await db.commit()
 
+    await audit_sink.start()
+    await kpi_reconciler.start()
+
+    # process pool للـ bulk provisioning (spawn) — واحد طول عمر الـ worker
+    start_provisioning_pool()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await kpi_reconciler.stop()
+    # drain buffered audit rows before the process exits
+    await audit_sink.stop()
+    shutdown_hash_pool()
+    shutdown_provisioning_pool()
+
 @app.get("/")
-async def home(request: Request):
+async def home(request: Request, db: AsyncSession = Depends(get_read_db)):
     if not request.session.get("user_id"):
         return RedirectResponse("/login", status_code=302)
-    return templates.TemplateResponse("dashboard.html", {"request": request})
+    # KPIs من kpi_counters — query واحدة صغيرة (app/core/kpi.py)
+    kpis = await read_counters(db)
+    return templates.TemplateResponse("dashboard.html", {"request": request, "kpis": kpis})
 
 
@@ -9,3 +9,4 @@ from app.models.deduction import Deduction
 from app.models.payroll_run import PayrollRun
 from app.models.payroll_item import PayrollItem
 from app.models.audit_log import AuditLog
+from app.models.department_cost_snapshot import DepartmentCostSnapshot
@@ -1,12 +1,20 @@
 from datetime import datetime
 from typing import Optional, Any
 
-from sqlalchemy import String, Integer, ForeignKey, DateTime
+import re
+
+from sqlalchemy import JSON, String, Integer, ForeignKey, DateTime, Index
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.sql.visitors import InternalTraversal
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
 
+# JSONB على Postgres، JSON (TEXT + json1) على SQLite
+PortableJSON = JSON().with_variant(JSONB(), "postgresql")
+
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
@@ -16,15 +24,66 @@ class AuditLog(Base):
     actor_user_id: Mapped[Optional[int]] = mapped_column(
         ForeignKey("users.id", ondelete="SET NULL"),
         nullable=True,
-        index=True,
     )
 
-    action: Mapped[str] = mapped_column(String(80), nullable=False, index=True)
+    action: Mapped[str] = mapped_column(String(80), nullable=False)
     entity: Mapped[Optional[str]] = mapped_column(String(80), nullable=True)
     entity_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
 
-    meta: Mapped[Optional[dict[str, Any]]] = mapped_column(JSONB, nullable=True)
+    meta: Mapped[Optional[dict[str, Any]]] = mapped_column(PortableJSON, nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
 
     actor = relationship("User", foreign_keys=[actor_user_id])
+
+    # كل الفلاتر بتترتب على (created_at, id) — keyset pagination
+    __table_args__ = (
+        Index("ix_audit_logs_created_at_id", "created_at", "id"),
+        Index("ix_audit_logs_action_created_at", "action", "created_at", "id"),
+        Index("ix_audit_logs_actor_created_at", "actor_user_id", "created_at", "id"),
+        Index("ix_audit_logs_entity_created_at", "entity", "entity_id", "created_at", "id"),
+    )
+
+
+# meta keys we filter by — same expression is used in app/queries/audit.py
+AUDIT_META_INDEXED_KEYS = ("employee_id",)
+
+_META_KEY = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class meta_int(FunctionElement):
+    """meta[key] as an integer, with the JSON path rendered as a literal.
+
+    The planner only uses the expression index when the query spells the
+    expression exactly like the DDL; a bound path parameter never matches.
+    """
+
+    type = Integer()
+    inherit_cache = True
+    _traverse_internals = FunctionElement._traverse_internals + [("key", InternalTraversal.dp_string)]
+
+    def __init__(self, column, key: str):
+        if not _META_KEY.match(key):
+            raise ValueError(f"bad meta key: {key!r}")
+        self.key = key
+        super().__init__(column)
+
+
+@compiles(meta_int)
+def _meta_int_sqlite(element, compiler, **kw):
+    (column,) = element.clauses
+    return f"JSON_EXTRACT({compiler.process(column, **kw)}, '$.\"{element.key}\"')"
+
+
+@compiles(meta_int, "postgresql")
+def _meta_int_pg(element, compiler, **kw):
+    (column,) = element.clauses
+    return f"CAST(({compiler.process(column, **kw)} ->> '{element.key}') AS INTEGER)"
+
+
+def audit_meta_key(key: str):
+    return meta_int(AuditLog.__table__.c.meta, key)
+
+
+for _key in AUDIT_META_INDEXED_KEYS:
+    Index(f"ix_audit_logs_meta_{_key}", audit_meta_key(_key))
@@ -0,0 +1,32 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, Numeric, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class DepartmentCostSnapshot(Base):
+    """Per-department totals of one payroll run, frozen when the run is posted."""
+
+    __tablename__ = "department_cost_snapshots"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    run_id: Mapped[int] = mapped_column(ForeignKey("payroll_runs.id", ondelete="CASCADE"), nullable=False)
+
+    # مفيش FK: التقرير القديم يفضل موجود حتى لو القسم اتمسح؛ NULL = من غير قسم
+    department_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    department_name: Mapped[str] = mapped_column(String(120), nullable=False, default="")
+
+    headcount: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    base_total: Mapped[float] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+    allowances_total: Mapped[float] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+    deductions_total: Mapped[float] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+    net_total: Mapped[float] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_department_cost_snapshots_run_id", "run_id"),
+    )
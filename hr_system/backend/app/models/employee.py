@@ -1,4 +1,4 @@
-from sqlalchemy import String, Date, ForeignKey, Numeric
+from sqlalchemy import String, Date, ForeignKey, Numeric, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
 
@@ -6,7 +6,7 @@ class Employee(Base):
     __tablename__ = "employees"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    full_name: Mapped[str] = mapped_column(String(200), index=True)
+    full_name: Mapped[str] = mapped_column(String(200))
     email: Mapped[str] = mapped_column(String(200), unique=True, index=True)
     job_title: Mapped[str] = mapped_column(String(200), default="")
     hire_date: Mapped[Date | None] = mapped_column(Date, nullable=True)
@@ -16,3 +16,16 @@ class Employee(Base):
 
     department_id: Mapped[int | None] = mapped_column(ForeignKey("departments.id"), nullable=True)
     department = relationship("Department")
+
+    # directory keyset sorts/filters — لازم تفضل متطابقة مع SORTS في app/queries/employees.py
+    # (فلتر بالـ equality + أعمدة الـ sort بالترتيب؛ email sort من غير فلتر على ix_employees_email)
+    __table_args__ = (
+        Index("ix_employees_full_name_id", "full_name", "id"),
+        Index("ix_employees_job_title_full_name_id", "job_title", "full_name", "id"),
+        Index("ix_employees_job_title_email_id", "job_title", "email", "id"),
+        Index("ix_employees_job_title_id", "job_title", "id"),
+        Index("ix_employees_department_full_name_id", "department_id", "full_name", "id"),
+        Index("ix_employees_department_email_id", "department_id", "email", "id"),
+        Index("ix_employees_department_job_title_full_name_id", "department_id", "job_title", "full_name", "id"),
+        Index("ix_employees_department_id_id", "department_id", "id"),
+    )
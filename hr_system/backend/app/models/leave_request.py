@@ -19,7 +19,7 @@ class LeaveRequest(Base):
         index=True,
         nullable=False,
     )
-    from_date: Mapped[date] = mapped_column(Date, nullable=False)
+    from_date: Mapped[date] = mapped_column(Date, index=True, nullable=False)
     to_date: Mapped[date] = mapped_column(Date, nullable=False)
 
     leave_type: Mapped[str] = mapped_column(String(50), default="annual", nullable=False)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, Numeric, DateTime
+from sqlalchemy import ForeignKey, Index, Numeric, DateTime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -12,7 +12,7 @@ class PayrollItem(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
 
     run_id: Mapped[int] = mapped_column(ForeignKey("payroll_runs.id", ondelete="CASCADE"), nullable=False)
-    employee_id: Mapped[int] = mapped_column(ForeignKey("employees.id", ondelete="CASCADE"), index=True, nullable=False)
+    employee_id: Mapped[int] = mapped_column(ForeignKey("employees.id", ondelete="CASCADE"), nullable=False)
 
     base_salary: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False, default=0)
     allowances_total: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False, default=0)
@@ -23,3 +23,9 @@ class PayrollItem(Base):
 
     run = relationship("PayrollRun")
     employee = relationship("Employee")
+
+    __table_args__ = (
+        # run detail (keyset على employee_id) + per-employee history؛ الأخير بيغطي ix_payroll_items_employee_id القديم
+        Index("ix_payroll_items_run_id_employee_id", "run_id", "employee_id"),
+        Index("ix_payroll_items_employee_id_generated_at", "employee_id", "generated_at"),
+    )
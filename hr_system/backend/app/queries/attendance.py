@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import desc, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.attendance import Attendance
+from app.queries.pagination import decode_cursor, encode_cursor
+
+PAGE_SIZE = 50
+
+
+async def attendance_page(
+    db: AsyncSession,
+    employee_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+) -> tuple[list[Attendance], Optional[str]]:
+    """Newest check-in first, keyset on (check_in, id). Returns (rows, next_cursor)."""
+    q = select(Attendance).where(Attendance.check_in.is_not(None))
+    if employee_id is not None:
+        q = q.where(Attendance.employee_id == employee_id)
+    if since is not None:
+        q = q.where(Attendance.check_in >= since)
+    if until is not None:
+        q = q.where(Attendance.check_in <= until)
+
+    after = decode_cursor(cursor)
+    if after and len(after) == 2:
+        q = q.where(tuple_(Attendance.check_in, Attendance.id) < tuple_(after[0], after[1]))
+
+    q = q.order_by(desc(Attendance.check_in), desc(Attendance.id)).limit(limit + 1)
+    rows = list((await db.execute(q)).scalars().all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].check_in, rows[-1].id)
+    return rows, next_cursor
@@ -0,0 +1,93 @@
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from typing import Optional
+
+from sqlalchemy import Select, desc, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.audit_log import AuditLog, audit_meta_key
+from app.models.user import User
+from app.queries.pagination import decode_cursor, encode_cursor
+
+PAGE_SIZE = 50
+
+
+@dataclass
+class AuditFilter:
+    action: Optional[str] = None
+    entity: Optional[str] = None
+    entity_id: Optional[int] = None
+    actor_user_id: Optional[int] = None
+    employee_id: Optional[int] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+    def is_empty(self) -> bool:
+        return not any(v is not None for v in self.__dict__.values())
+
+
+def parse_when(value: Optional[str], end_of_day: bool = False) -> Optional[datetime]:
+    # بيقبل "2026-01-31" أو "2026-01-31T10:00"
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        if "T" in value or " " in value:
+            return datetime.fromisoformat(value)
+        d = date.fromisoformat(value)
+    except ValueError:
+        return None
+    return datetime.combine(d, time.max if end_of_day else time.min)
+
+
+async def resolve_actor(db: AsyncSession, actor: Optional[str]) -> Optional[int]:
+    # actor = user id أو username
+    actor = (actor or "").strip()
+    if not actor:
+        return None
+    if actor.isdigit():
+        return int(actor)
+    uid = (await db.execute(select(User.id).where(User.username == actor))).scalar_one_or_none()
+    return uid if uid is not None else -1
+
+
+def apply_filter(q: Select, f: AuditFilter) -> Select:
+    if f.action:
+        q = q.where(AuditLog.action == f.action)
+    if f.entity:
+        q = q.where(AuditLog.entity == f.entity)
+    if f.entity_id is not None:
+        q = q.where(AuditLog.entity_id == f.entity_id)
+    if f.actor_user_id is not None:
+        q = q.where(AuditLog.actor_user_id == f.actor_user_id)
+    if f.employee_id is not None:
+        q = q.where(audit_meta_key("employee_id") == f.employee_id)
+    if f.since is not None:
+        q = q.where(AuditLog.created_at >= f.since)
+    if f.until is not None:
+        q = q.where(AuditLog.created_at <= f.until)
+    return q
+
+
+async def audit_page_query(
+    db: AsyncSession,
+    f: AuditFilter,
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+) -> tuple[list[AuditLog], Optional[str]]:
+    """Newest first, keyset on (created_at, id). Returns (rows, next_cursor)."""
+    q = apply_filter(select(AuditLog), f)
+
+    after = decode_cursor(cursor)
+    if after and len(after) == 2:
+        q = q.where(tuple_(AuditLog.created_at, AuditLog.id) < tuple_(after[0], after[1]))
+
+    q = q.order_by(desc(AuditLog.created_at), desc(AuditLog.id)).limit(limit + 1)
+    rows = list((await db.execute(q)).scalars().all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return rows, next_cursor
@@ -0,0 +1,166 @@
+"""Per-department headcount / payroll cost: current figures (refcache) and per-run snapshots."""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Insert, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.refcache import cached, department_refs
+from app.models.allowance import Allowance
+from app.models.deduction import Deduction
+from app.models.department import Department
+from app.models.department_cost_snapshot import DepartmentCostSnapshot
+from app.models.employee import Employee
+from app.models.payroll_item import PayrollItem
+from app.models.payroll_run import PayrollRun
+
+UNASSIGNED = "Unassigned"
+
+
+@dataclass(frozen=True)
+class DepartmentCost:
+    department_id: Optional[int]
+    name: str
+    headcount: int
+    base_total: float
+    allowances_total: float
+    deductions_total: float
+    net_total: float
+    # net pay of the latest posted run (current report only)
+    last_run_net: Optional[float] = None
+
+
+def totals(rows: tuple[DepartmentCost, ...] | list[DepartmentCost]) -> DepartmentCost:
+    last = [r.last_run_net for r in rows if r.last_run_net is not None]
+    return DepartmentCost(
+        department_id=None,
+        name="Total",
+        headcount=sum(r.headcount for r in rows),
+        base_total=sum(r.base_total for r in rows),
+        allowances_total=sum(r.allowances_total for r in rows),
+        deductions_total=sum(r.deductions_total for r in rows),
+        net_total=sum(r.net_total for r in rows),
+        last_run_net=sum(last) if last else None,
+    )
+
+
+# ---------- snapshots ----------
+
+def snapshot_stmt(run_id: int, created_at: datetime) -> Insert:
+    """INSERT … SELECT of one run's items grouped by department (run inside the run's transaction)."""
+    grouped = (
+        select(
+            literal(run_id),
+            Employee.department_id,
+            func.coalesce(Department.name, ""),
+            func.count(PayrollItem.id),
+            func.coalesce(func.sum(PayrollItem.base_salary), 0),
+            func.coalesce(func.sum(PayrollItem.allowances_total), 0),
+            func.coalesce(func.sum(PayrollItem.deductions_total), 0),
+            func.coalesce(func.sum(PayrollItem.net_pay), 0),
+            literal(created_at, DepartmentCostSnapshot.created_at.type),
+        )
+        .select_from(PayrollItem)
+        .join(Employee, Employee.id == PayrollItem.employee_id)
+        .outerjoin(Department, Department.id == Employee.department_id)
+        .where(PayrollItem.run_id == run_id)
+        .group_by(Employee.department_id, Department.name)
+    )
+    return insert(DepartmentCostSnapshot).from_select(
+        [
+            "run_id", "department_id", "department_name", "headcount",
+            "base_total", "allowances_total", "deductions_total", "net_total", "created_at",
+        ],
+        grouped,
+    )
+
+
+def _from_snapshot(s: DepartmentCostSnapshot) -> DepartmentCost:
+    return DepartmentCost(
+        department_id=s.department_id,
+        name=s.department_name or UNASSIGNED,
+        headcount=int(s.headcount),
+        base_total=float(s.base_total),
+        allowances_total=float(s.allowances_total),
+        deductions_total=float(s.deductions_total),
+        net_total=float(s.net_total),
+    )
+
+
+async def run_department_costs(db: AsyncSession, run_id: int) -> list[DepartmentCost]:
+    rows = (
+        await db.execute(
+            select(DepartmentCostSnapshot)
+            .where(DepartmentCostSnapshot.run_id == run_id)
+            .order_by(DepartmentCostSnapshot.department_name, DepartmentCostSnapshot.id)
+        )
+    ).scalars().all()
+    return [_from_snapshot(s) for s in rows]
+
+
+async def latest_run_id(db: AsyncSession) -> Optional[int]:
+    return (
+        await db.execute(
+            select(PayrollRun.id)
+            .where(PayrollRun.status == "posted")
+            .order_by(PayrollRun.created_at.desc(), PayrollRun.id.desc())
+            .limit(1)
+        )
+    ).scalar_one_or_none()
+
+
+# ---------- current state ----------
+
+async def _load_current(db: AsyncSession) -> tuple[DepartmentCost, ...]:
+    # 3 grouped queries — كل واحدة بترجع صف لكل قسم، مش لكل موظف
+    staff = {
+        dep_id: (int(n), float(base or 0))
+        for dep_id, n, base in (
+            await db.execute(
+                select(Employee.department_id, func.count(Employee.id), func.sum(Employee.base_salary))
+                .group_by(Employee.department_id)
+            )
+        ).all()
+    }
+
+    async def per_department(model) -> dict[Optional[int], float]:
+        res = await db.execute(
+            select(Employee.department_id, func.sum(model.amount))
+            .join(Employee, Employee.id == model.employee_id)
+            .where(model.active.is_(True))
+            .group_by(Employee.department_id)
+        )
+        return {dep_id: float(total or 0) for dep_id, total in res.all()}
+
+    allowances = await per_department(Allowance)
+    deductions = await per_department(Deduction)
+
+    last_net: dict[Optional[int], float] = {}
+    run_id = await latest_run_id(db)
+    if run_id is not None:
+        last_net = {r.department_id: r.net_total for r in await run_department_costs(db, run_id)}
+
+    def row(dep_id: Optional[int], name: str) -> DepartmentCost:
+        headcount, base = staff.get(dep_id, (0, 0.0))
+        allow, ded = allowances.get(dep_id, 0.0), deductions.get(dep_id, 0.0)
+        return DepartmentCost(
+            department_id=dep_id,
+            name=name,
+            headcount=headcount,
+            base_total=base,
+            allowances_total=allow,
+            deductions_total=ded,
+            net_total=base + allow - ded,
+            last_run_net=last_net.get(dep_id),
+        )
+
+    rows = [row(d.id, d.name) for d in await department_refs(db)]
+    if None in staff or None in last_net:
+        rows.append(row(None, UNASSIGNED))
+    return tuple(rows)
+
+
+async def current_department_costs(db: AsyncSession) -> tuple[DepartmentCost, ...]:
+    return await cached(db, "department_costs", ("employees", "departments", "payroll"), _load_current)
@@ -0,0 +1,99 @@
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.department import Department
+from app.models.employee import Employee
+from app.queries.pagination import decode_cursor, encode_cursor
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# sort key -> keyset columns (آخرهم id عشان الترتيب يبقى unique)
+# كل sort مع كل فلتر (department_id / job_title / الاتنين) ليه index في app/models/employee.py:
+# أعمدة الفلتر الأول وبعدها أعمدة الـ sort — الصفحة بتتقرا من الـ index من غير sort.
+# مع الفلترين مع بعض و sort بـ email أو id: index واحد منهم والتاني بيتشيك صف صف.
+SORTS = {
+    "name": (Employee.full_name, Employee.id),
+    "email": (Employee.email, Employee.id),
+    "job_title": (Employee.job_title, Employee.full_name, Employee.id),
+    "id": (Employee.id,),
+}
+DEFAULT_SORT = "name"
+
+DIRECTORY_COLUMNS = (
+    Employee.id,
+    Employee.full_name,
+    Employee.email,
+    Employee.job_title,
+    Employee.hire_date,
+    Employee.department_id,
+    Department.name.label("department_name"),
+)
+
+
+@dataclass
+class EmployeeFilter:
+    department_id: Optional[int] = None
+    job_title: Optional[str] = None
+
+
+def apply_filter(q: Select, f: EmployeeFilter) -> Select:
+    if f.department_id is not None:
+        q = q.where(Employee.department_id == f.department_id)
+    if f.job_title:
+        q = q.where(Employee.job_title == f.job_title)
+    return q
+
+
+def _after(cols: tuple, values: list[Any], desc: bool):
+    left, right = tuple_(*cols), tuple_(*values)
+    return left < right if desc else left > right
+
+
+def directory_select(
+    f: EmployeeFilter,
+    sort: str = DEFAULT_SORT,
+    desc: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+) -> Select:
+    """One page (+1 row to detect the next one) of the directory, in keyset order."""
+    cols = SORTS[sort]
+    q = apply_filter(
+        select(*DIRECTORY_COLUMNS).outerjoin(Department, Department.id == Employee.department_id), f
+    )
+
+    # cursor = (sort, dir, values...) — cursor من ترتيب تاني بيتجاهل
+    after = decode_cursor(cursor)
+    if after and after[:2] == [sort, "desc" if desc else "asc"] and len(after) == len(cols) + 2:
+        q = q.where(_after(cols, after[2:], desc))
+
+    order = [c.desc() if desc else c.asc() for c in cols]
+    return q.order_by(*order).limit(limit + 1)
+
+
+async def directory_page_query(
+    db: AsyncSession,
+    f: EmployeeFilter,
+    sort: str = DEFAULT_SORT,
+    desc: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+) -> tuple[list[Any], Optional[str]]:
+    """Keyset page of the directory (lightweight rows, no ORM objects). Returns (rows, next_cursor)."""
+    sort = sort if sort in SORTS else DEFAULT_SORT
+    cols = SORTS[sort]
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    rows = list((await db.execute(directory_select(f, sort, desc, cursor, limit))).all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        values = [getattr(last, c.key) for c in cols]
+        next_cursor = encode_cursor(sort, "desc" if desc else "asc", *values)
+    return rows, next_cursor
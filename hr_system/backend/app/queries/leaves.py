@@ -0,0 +1,38 @@
+from typing import Optional
+
+from sqlalchemy import desc, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.leave_request import LeaveRequest
+from app.queries.pagination import decode_cursor, encode_cursor
+
+PAGE_SIZE = 50
+STATUSES = ("pending", "approved", "rejected")
+
+
+async def leave_page(
+    db: AsyncSession,
+    employee_id: Optional[int] = None,
+    status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+) -> tuple[list[LeaveRequest], Optional[str]]:
+    """Newest request first, keyset on (created_at, id). Returns (rows, next_cursor)."""
+    q = select(LeaveRequest)
+    if employee_id is not None:
+        q = q.where(LeaveRequest.employee_id == employee_id)
+    if status:
+        q = q.where(LeaveRequest.status == status)
+
+    after = decode_cursor(cursor)
+    if after and len(after) == 2:
+        q = q.where(tuple_(LeaveRequest.created_at, LeaveRequest.id) < tuple_(after[0], after[1]))
+
+    q = q.order_by(desc(LeaveRequest.created_at), desc(LeaveRequest.id)).limit(limit + 1)
+    rows = list((await db.execute(q)).scalars().all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
@@ -0,0 +1,51 @@
+import base64
+from datetime import date, datetime
+from typing import Any, Optional
+
+# keyset cursors: قيم آخر صف في الصفحة، مشفرة base64 عشان تمشي في الـ URL
+
+
+def encode_cursor(*values: Any) -> str:
+    parts = []
+    for v in values:
+        if isinstance(v, datetime):
+            parts.append("t" + v.isoformat())
+        elif isinstance(v, date):
+            parts.append("d" + v.isoformat())
+        elif isinstance(v, int):
+            parts.append("i" + str(v))
+        elif isinstance(v, float):
+            parts.append("f" + repr(v))
+        elif v is None:
+            parts.append("n")
+        else:
+            parts.append("s" + str(v))
+    raw = "\x1f".join(parts).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[list[Any]]:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        values: list[Any] = []
+        for part in raw.split("\x1f"):
+            kind, body = part[:1], part[1:]
+            if kind == "t":
+                values.append(datetime.fromisoformat(body))
+            elif kind == "d":
+                values.append(date.fromisoformat(body))
+            elif kind == "i":
+                values.append(int(body))
+            elif kind == "f":
+                values.append(float(body))
+            elif kind == "n":
+                values.append(None)
+            elif kind == "s":
+                values.append(body)
+            else:
+                return None
+        return values
+    except (ValueError, UnicodeDecodeError):
+        return None
@@ -0,0 +1,145 @@
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import desc, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.department import Department
+from app.models.employee import Employee
+from app.models.payroll_item import PayrollItem
+from app.models.payroll_run import PayrollRun
+from app.queries.pagination import decode_cursor, encode_cursor
+
+PAGE_SIZE = 50
+
+
+@dataclass
+class RunTotals:
+    employees: int = 0
+    base_total: float = 0
+    allowances_total: float = 0
+    deductions_total: float = 0
+    net_total: float = 0
+
+
+def _department_filter(q, department_id: Optional[int]):
+    # 0 = من غير قسم
+    if department_id == 0:
+        return q.where(Employee.department_id.is_(None))
+    if department_id is not None:
+        return q.where(Employee.department_id == department_id)
+    return q
+
+
+async def runs_page(
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+) -> tuple[list[PayrollRun], Optional[str]]:
+    """Newest run first, keyset on (created_at, id). Returns (rows, next_cursor)."""
+    q = select(PayrollRun)
+
+    after = decode_cursor(cursor)
+    if after and len(after) == 2:
+        q = q.where(tuple_(PayrollRun.created_at, PayrollRun.id) < tuple_(after[0], after[1]))
+
+    q = q.order_by(desc(PayrollRun.created_at), desc(PayrollRun.id)).limit(limit + 1)
+    rows = list((await db.execute(q)).scalars().all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
+
+
+async def run_items_page(
+    db: AsyncSession,
+    run_id: int,
+    department_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+) -> tuple[list[Any], Optional[str]]:
+    """Items of one run ordered by employee_id (ix_payroll_items_run_id_employee_id). Returns (rows, next_cursor)."""
+    q = (
+        select(
+            PayrollItem.id,
+            PayrollItem.employee_id,
+            Employee.full_name,
+            Department.name.label("department_name"),
+            PayrollItem.base_salary,
+            PayrollItem.allowances_total,
+            PayrollItem.deductions_total,
+            PayrollItem.net_pay,
+        )
+        .join(Employee, Employee.id == PayrollItem.employee_id)
+        .outerjoin(Department, Department.id == Employee.department_id)
+        .where(PayrollItem.run_id == run_id)
+    )
+    q = _department_filter(q, department_id)
+
+    after = decode_cursor(cursor)
+    if after and len(after) == 2:
+        q = q.where(tuple_(PayrollItem.employee_id, PayrollItem.id) > tuple_(after[0], after[1]))
+
+    q = q.order_by(PayrollItem.employee_id, PayrollItem.id).limit(limit + 1)
+    rows = list((await db.execute(q)).all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].employee_id, rows[-1].id)
+    return rows, next_cursor
+
+
+async def run_totals(db: AsyncSession, run_id: int, department_id: Optional[int] = None) -> RunTotals:
+    # aggregate واحد لكل الـ run (مش مجموع الصفحة)
+    q = select(
+        func.count(PayrollItem.id),
+        func.coalesce(func.sum(PayrollItem.base_salary), 0),
+        func.coalesce(func.sum(PayrollItem.allowances_total), 0),
+        func.coalesce(func.sum(PayrollItem.deductions_total), 0),
+        func.coalesce(func.sum(PayrollItem.net_pay), 0),
+    ).where(PayrollItem.run_id == run_id)
+    if department_id is not None:
+        q = _department_filter(q.join(Employee, Employee.id == PayrollItem.employee_id), department_id)
+
+    n, base, allow, ded, net = (await db.execute(q)).one()
+    return RunTotals(int(n), float(base), float(allow), float(ded), float(net))
+
+
+async def pay_history_page(
+    db: AsyncSession,
+    employee_id: int,
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+) -> tuple[list[Any], Optional[str]]:
+    """One employee's items, newest first; keyset on (generated_at, id) over ix_payroll_items_employee_id_generated_at."""
+    q = (
+        select(
+            PayrollItem.id,
+            PayrollItem.run_id,
+            PayrollRun.period_start,
+            PayrollRun.period_end,
+            PayrollItem.base_salary,
+            PayrollItem.allowances_total,
+            PayrollItem.deductions_total,
+            PayrollItem.net_pay,
+            PayrollItem.generated_at,
+        )
+        .join(PayrollRun, PayrollRun.id == PayrollItem.run_id)
+        .where(PayrollItem.employee_id == employee_id)
+    )
+
+    after = decode_cursor(cursor)
+    if after and len(after) == 2:
+        q = q.where(tuple_(PayrollItem.generated_at, PayrollItem.id) < tuple_(after[0], after[1]))
+
+    q = q.order_by(desc(PayrollItem.generated_at), desc(PayrollItem.id)).limit(limit + 1)
+    rows = list((await db.execute(q)).all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].generated_at, rows[-1].id)
+    return rows, next_cursor
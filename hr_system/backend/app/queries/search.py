@@ -0,0 +1,166 @@
+import re
+from dataclasses import dataclass
+from typing import NamedTuple, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.queries.pagination import decode_cursor, encode_cursor
+
+PAGE_SIZE = 20
+MAX_TERMS = 8
+
+# kind code -> label (search_docs.id = ref_id * 4 + kind, see m0004_search_index)
+KINDS = {1: "employee", 2: "leave", 3: "audit"}
+KIND_CODES = {v: k for k, v in KINDS.items()}
+
+# title أهم من body في الترتيب (SQLite: متخزنة في الـ FTS5 rank config، m0013)
+TITLE_WEIGHT, BODY_WEIGHT = 10.0, 1.0
+
+
+@dataclass
+class SearchHit:
+    kind: str
+    ref_id: int
+    parent_id: Optional[int]
+    title: str
+    snippet: str
+    score: float
+
+
+class _Row(NamedTuple):
+    kind: int
+    ref_id: int
+    parent_id: Optional[int]
+    title: str
+    snippet: str
+    score: float
+    id: int
+
+
+def search_terms(q: str) -> list[str]:
+    # كلمات بس — أي syntax تاني (quotes, operators) بيتشال قبل ما يوصل للـ FTS
+    return re.findall(r"\w+", q or "", flags=re.UNICODE)[:MAX_TERMS]
+
+
+def make_snippet(body: str, terms: list[str], words: int = 16) -> str:
+    """~words around the first hit, matched words wrapped in [ ] (same markers as ts_headline)."""
+    tokens = (body or "").split()
+    prefixes = tuple(t.lower() for t in terms)
+
+    def hit(tok: str) -> bool:
+        return any(w.lower().startswith(prefixes) for w in re.findall(r"\w+", tok, flags=re.UNICODE))
+
+    first = next((i for i, tok in enumerate(tokens) if hit(tok)), 0)
+    start = max(0, first - words // 4)
+    window = tokens[start:start + words]
+    out = " ".join(f"[{tok}]" if hit(tok) else tok for tok in window)
+    return ("…" if start else "") + out + ("…" if start + words < len(tokens) else "")
+
+
+def _fts5_query(terms: list[str]) -> str:
+    # كل كلمة prefix match، والكلمات AND مع بعض
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+def _pg_tsquery(terms: list[str]) -> str:
+    return " & ".join(f"{t}:*" for t in terms)
+
+
+async def search_page_query(
+    db: AsyncSession,
+    q: str,
+    kind: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+    include_audit: bool = True,
+) -> tuple[list[SearchHit], Optional[str]]:
+    """Ranked matches, best first; keyset on (score, id). Returns (hits, next_cursor).
+
+    include_audit=False drops audit events (their meta carries salaries)."""
+    terms = search_terms(q)
+    if not terms or (kind == "audit" and not include_audit):
+        return [], None
+
+    params: dict = {"limit": limit + 1}
+    if kind in KIND_CODES:
+        params["kind"] = KIND_CODES[kind]
+    elif not include_audit:
+        params["not_kind"] = KIND_CODES["audit"]
+
+    keyset = ""
+    after = decode_cursor(cursor)
+    if after and len(after) == 2:
+        params["after_score"], params["after_id"] = after
+        keyset = "WHERE score > :after_score OR (score = :after_score AND id > :after_id)"
+
+    if db.bind.dialect.name == "postgresql":
+        params["q"] = _pg_tsquery(terms)
+        kind_filter = "AND kind = :kind" if "kind" in params else "AND kind <> :not_kind" if "not_kind" in params else ""
+        # score = -rank عشان "أقل = أحسن" في الـ backend الاتنين؛ الـ match من الـ GIN index
+        sql = f"""
+            WITH hits AS (
+                SELECT id, kind, ref_id, parent_id, title, body, query,
+                       -ts_rank_cd('{{0, 0, {BODY_WEIGHT / TITLE_WEIGHT}, 1}}', tsv, query) AS score
+                FROM search_docs, to_tsquery('simple', :q) AS query
+                WHERE tsv @@ query {kind_filter}
+            )
+            SELECT kind, ref_id, parent_id, title,
+                   ts_headline('simple', body, query, 'StartSel=[,StopSel=],MaxWords=24,MinWords=8') AS snippet,
+                   score, id
+            FROM hits
+            {keyset}
+            ORDER BY score, id
+            LIMIT :limit
+        """
+        rows = (await db.execute(text(sql), params)).all()
+    else:
+        params["q"] = _fts5_query(terms)
+        # kind من الـ rowid (ref_id * 4 + kind) عشان الفلتر مايقراش الـ content
+        kind_filter = "AND rowid % 4 = :kind" if "kind" in params else \
+            "AND rowid % 4 <> :not_kind" if "not_kind" in params else ""
+        # خطوة 1: ranking على الـ index بس (من غير snippet) على كل الـ matches؛
+        # rank = bm25 بالـ weights (TITLE_WEIGHT, BODY_WEIGHT) من m0013
+        ranked = (await db.execute(text(f"""
+            SELECT id, score FROM (
+                SELECT rowid AS id, rank AS score
+                FROM search_docs
+                WHERE search_docs MATCH :q {kind_filter}
+            )
+            {keyset}
+            ORDER BY score, id
+            LIMIT :limit
+        """), params)).all()
+
+        # خطوة 2: المحتوى بالـ rowid بس — snippet() كان بيعيد الـ MATCH كله لكل صفحة
+        rows = []
+        if ranked:
+            scores = {r.id: r.score for r in ranked}
+            ids = ", ".join(str(int(r.id)) for r in ranked)
+            docs = (await db.execute(text(
+                f"SELECT rowid AS id, kind, ref_id, parent_id, title, body FROM search_docs WHERE rowid IN ({ids})"
+            ))).all()
+            by_id = {d.id: d for d in docs}
+            rows = [
+                _Row(by_id[i].kind, by_id[i].ref_id, by_id[i].parent_id, by_id[i].title,
+                     make_snippet(by_id[i].body, terms), scores[i], i)
+                for i in scores if i in by_id
+            ]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(float(rows[-1].score), int(rows[-1].id))
+
+    hits = [
+        SearchHit(
+            kind=KINDS.get(int(r.kind), "?"),
+            ref_id=int(r.ref_id),
+            parent_id=r.parent_id,
+            title=r.title,
+            snippet=r.snippet,
+            score=float(r.score),
+        )
+        for r in rows
+    ]
+    return hits, next_cursor
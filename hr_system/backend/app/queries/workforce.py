@@ -0,0 +1,176 @@
+"""Monthly workforce reports, registered with app.core.report_engine."""
+
+from sqlalchemy import Integer, Select, and_, case, cast, func, select
+
+from app.core.config import settings
+from app.core.report_engine import ReportDef, ReportParams, register
+from app.models.attendance import Attendance
+from app.models.department_cost_snapshot import DepartmentCostSnapshot
+from app.models.employee import Employee
+from app.models.leave_request import LeaveRequest
+from app.models.payroll_run import PayrollRun
+
+
+# كل build() = SELECT واحد grouped؛ الشهور دايماً [since, until) على عمود متعمله index
+# (attendance.check_in, leave_requests.from_date)
+
+# ---------- dialect helpers ----------
+
+def _month(col, dialect: str):
+    if dialect == "postgresql":
+        return func.to_char(col, "YYYY-MM")
+    return func.strftime("%Y-%m", col)
+
+
+def _hours(start, end, dialect: str):
+    if dialect == "postgresql":
+        return func.extract("epoch", end - start) / 3600.0
+    return (func.julianday(end) - func.julianday(start)) * 24.0
+
+
+def _days_inclusive(start, end, dialect: str):
+    if dialect == "postgresql":
+        return end - start + 1  # date - date = integer في postgres
+    return func.julianday(end) - func.julianday(start) + 1
+
+
+def _closed_shifts(params: ReportParams):
+    return and_(
+        Attendance.check_in >= params.since,
+        Attendance.check_in < params.until,
+        Attendance.check_out.is_not(None),
+    )
+
+
+# ---------- definitions ----------
+
+def attendance_hours(params: ReportParams, dialect: str) -> Select:
+    month = _month(Attendance.check_in, dialect)
+    return (
+        select(
+            month.label("month"),
+            Employee.id.label("employee_id"),
+            Employee.full_name.label("employee"),
+            func.count(func.distinct(func.date(Attendance.check_in))).label("days"),
+            func.sum(_hours(Attendance.check_in, Attendance.check_out, dialect)).label("hours"),
+        )
+        .join(Employee, Employee.id == Attendance.employee_id)
+        .where(_closed_shifts(params))
+        .group_by(month, Employee.id, Employee.full_name)
+        .order_by(month, Employee.full_name, Employee.id)
+    )
+
+
+def overtime(params: ReportParams, dialect: str) -> Select:
+    # ساعات كل يوم الأول (ممكن أكتر من check-in في اليوم)، وبعدين اللي فوق الـ standard day
+    # نفس الـ expression object في select و group by — postgres بيقارن الـ bind params
+    month = _month(Attendance.check_in, dialect)
+    daily = (
+        select(
+            Attendance.employee_id.label("employee_id"),
+            month.label("month"),
+            func.sum(_hours(Attendance.check_in, Attendance.check_out, dialect)).label("hours"),
+        )
+        .where(_closed_shifts(params))
+        .group_by(Attendance.employee_id, month, func.date(Attendance.check_in))
+        .subquery()
+    )
+    extra = daily.c.hours - settings.REPORT_STANDARD_DAY_HOURS
+    return (
+        select(
+            daily.c.month,
+            Employee.id.label("employee_id"),
+            Employee.full_name.label("employee"),
+            func.count().label("days"),
+            func.sum(daily.c.hours).label("hours"),
+            func.sum(case((extra > 0, extra), else_=0)).label("overtime_hours"),
+        )
+        .join(Employee, Employee.id == daily.c.employee_id)
+        .group_by(daily.c.month, Employee.id, Employee.full_name)
+        .having(func.sum(case((extra > 0, extra), else_=0)) > 0)
+        .order_by(daily.c.month, Employee.full_name, Employee.id)
+    )
+
+
+def leave_utilization(params: ReportParams, dialect: str) -> Select:
+    # الإجازة بتتحسب على شهر from_date
+    month = _month(LeaveRequest.from_date, dialect)
+    approved = LeaveRequest.status == "approved"
+    return (
+        select(
+            month.label("month"),
+            LeaveRequest.leave_type.label("leave_type"),
+            func.count(LeaveRequest.id).label("requests"),
+            func.sum(case((approved, 1), else_=0)).label("approved"),
+            func.sum(case((LeaveRequest.status == "pending", 1), else_=0)).label("pending"),
+            cast(func.sum(
+                case((approved, _days_inclusive(LeaveRequest.from_date, LeaveRequest.to_date, dialect)), else_=0)
+            ), Integer).label("approved_days"),
+        )
+        .where(LeaveRequest.from_date >= params.since, LeaveRequest.from_date < params.until)
+        .group_by(month, LeaveRequest.leave_type)
+        .order_by(month, LeaveRequest.leave_type)
+    )
+
+
+def payroll_trend(params: ReportParams, dialect: str) -> Select:
+    # من الـ snapshots (صف لكل قسم لكل run) بدل payroll_items
+    month = _month(PayrollRun.period_start, dialect)
+    s = DepartmentCostSnapshot
+    return (
+        select(
+            month.label("month"),
+            func.count(func.distinct(PayrollRun.id)).label("runs"),
+            func.sum(s.headcount).label("employees"),
+            func.sum(s.base_total).label("base_total"),
+            func.sum(s.allowances_total).label("allowances_total"),
+            func.sum(s.deductions_total).label("deductions_total"),
+            func.sum(s.net_total).label("net_total"),
+        )
+        .join(s, s.run_id == PayrollRun.id)
+        .where(
+            PayrollRun.status == "posted",
+            PayrollRun.period_start >= params.since,
+            PayrollRun.period_start < params.until,
+        )
+        .group_by(month)
+        .order_by(month)
+    )
+
+
+register(ReportDef(
+    name="attendance_hours",
+    title="Attendance hours",
+    description="Worked hours and days per employee per month (closed shifts only).",
+    columns=("month", "employee_id", "employee", "days", "hours"),
+    depends=("attendance", "employees"),
+    build=attendance_hours,
+))
+
+register(ReportDef(
+    name="overtime",
+    title="Overtime",
+    description="Hours above the standard working day, per employee per month.",
+    columns=("month", "employee_id", "employee", "days", "hours", "overtime_hours"),
+    depends=("attendance", "employees"),
+    build=overtime,
+))
+
+register(ReportDef(
+    name="leave_utilization",
+    title="Leave utilization",
+    description="Requests and approved days per leave type per month.",
+    columns=("month", "leave_type", "requests", "approved", "pending", "approved_days"),
+    depends=("leaves",),
+    build=leave_utilization,
+))
+
+register(ReportDef(
+    name="payroll_trend",
+    title="Payroll cost trend",
+    description="Posted payroll totals per month.",
+    columns=("month", "runs", "employees", "base_total", "allowances_total", "deductions_total", "net_total"),
+    depends=("payroll",),
+    build=payroll_trend,
+    permission="payroll.view",
+))
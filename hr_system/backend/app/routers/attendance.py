@@ -5,28 +5,27 @@ from fastapi.responses import RedirectResponse
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi.templating import Jinja2Templates
 
-from app.db.session import get_db
+from app.db.session import get_uow, get_read_db
+from app.core.templating import templates
 from app.models.attendance import Attendance
+from app.core.refcache import employee_refs, mark_changed
+from app.core import kpi
+from app.queries.attendance import attendance_page as history_page
+from app.core.fragments import fragment, wants_fragment
 
 router = APIRouter(prefix="/attendance", tags=["Attendance"])
 
-templates = Jinja2Templates(directory="app/templates")
 
 
 @router.get("/")
 async def attendance_page(
     request: Request,
     employee_id: int | None = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    # get employees list for dropdown (id + name فقط)
-    from app.models.employee import Employee
-
-    employees_q = select(Employee.id, Employee.full_name).order_by(Employee.full_name.asc())
-    employees_rows = (await db.execute(employees_q)).all()
-    employees = [{"id": r[0], "full_name": r[1]} for r in employees_rows]
+    # employees list for dropdown (id + name فقط) — من الـ reference cache
+    employees = await employee_refs(db)
 
     # لو مفيش موظفين خالص
     if not employees:
@@ -43,10 +42,10 @@ async def attendance_page(
 
     # لو مفيش employee_id في query، اختار أول موظف
     if employee_id is None:
-        employee_id = employees[0]["id"]
+        employee_id = employees[0].id
 
     # validate employee_id موجود فعلاً في القائمة
-    if employee_id not in {e["id"] for e in employees}:
+    if employee_id not in {e.id for e in employees}:
         return RedirectResponse(url="/attendance/?error=employee_not_found", status_code=303)
 
     open_q = (
@@ -57,13 +56,7 @@ async def attendance_page(
     )
     open_row = (await db.execute(open_q)).scalars().first()
 
-    history_q = (
-        select(Attendance)
-        .where(Attendance.employee_id == employee_id)
-        .order_by(Attendance.check_in.desc())
-        .limit(30)
-    )
-    history = (await db.execute(history_q)).scalars().all()
+    history, _ = await history_page(db, employee_id, limit=30)
 
     return templates.TemplateResponse(
         "attendance.html",
@@ -77,10 +70,21 @@ async def attendance_page(
     )
 
 
+async def _panel(request: Request, db: AsyncSession, employee_id: int, open_row: Attendance | None):
+    # fragment: status + history بس، من غير قايمة الموظفين والـ layout
+    history, _ = await history_page(db, employee_id, limit=30)
+    return fragment(
+        request,
+        "_attendance_panel.html",
+        {"employee_id": employee_id, "open_attendance": open_row, "history": history},
+    )
+
+
 @router.post("/check-in")
 async def check_in(
+    request: Request,
     employee_id: int = Form(...),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     # validate employee exists
     from app.models.employee import Employee
@@ -92,21 +96,26 @@ async def check_in(
     row = Attendance(employee_id=employee_id, check_in=datetime.utcnow(), check_out=None)
     db.add(row)
     try:
-        await db.commit()
+        await db.flush()
     except IntegrityError:
         await db.rollback()
         return RedirectResponse(
             url=f"/attendance/?employee_id={employee_id}&error=open_exists",
             status_code=303,
         )
+    await mark_changed(db, "attendance")
+    await kpi.bump(db, "on_site", 1)
 
+    if wants_fragment(request):
+        return await _panel(request, db, employee_id, row)
     return RedirectResponse(url=f"/attendance/?employee_id={employee_id}", status_code=303)
 
 
 @router.post("/check-out")
 async def check_out(
+    request: Request,
     employee_id: int = Form(...),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     # validate employee exists
     from app.models.employee import Employee
@@ -131,6 +140,9 @@ async def check_out(
         )
 
     open_row.check_out = datetime.utcnow()
-    await db.commit()
+    await mark_changed(db, "attendance")
+    await kpi.bump(db, "on_site", -1)
 
+    if wants_fragment(request):
+        return await _panel(request, db, employee_id, None)
     return RedirectResponse(url=f"/attendance/?employee_id={employee_id}", status_code=303)
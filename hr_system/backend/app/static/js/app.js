@@ -0,0 +1,47 @@
+// Progressive enhancement for forms with data-fragment="#target" (see app/core/fragments.py).
+// The post goes through fetch with X-Fragment: 1 and the returned partial replaces #target.
+// Anything else (redirect to an error page, 4xx/5xx, network error) falls back to a normal page load.
+(function () {
+  "use strict";
+
+  document.addEventListener("submit", async function (ev) {
+    var form = ev.target;
+    var target = form.getAttribute("data-fragment");
+    if (!target || ev.defaultPrevented || form.method.toLowerCase() !== "post") return;
+
+    ev.preventDefault();
+    var buttons = form.querySelectorAll("button, input[type=submit]");
+    buttons.forEach(function (b) { b.disabled = true; });
+
+    try {
+      var res = await fetch(form.action, {
+        method: "POST",
+        body: new FormData(form),
+        headers: { "X-Fragment": "1" },
+        credentials: "same-origin",
+      });
+
+      if (!res.ok || res.headers.get("X-Fragment") !== "1") {
+        // مسار الـ error لسه بيعمل redirect لصفحة فيها الرسالة
+        if (res.redirected) window.location.assign(res.url);
+        else window.location.reload();
+        return;
+      }
+
+      var html = await res.text();
+      var el = document.querySelector(target);
+      if (!el) {
+        window.location.reload();
+        return;
+      }
+      var keep = !el.contains(form);
+      el.outerHTML = html;
+      if (keep) form.reset();
+    } catch (err) {
+      // مش بنبعت الـ form تاني: ممكن يكون اتنفذ قبل ما الاتصال يقع
+      window.location.reload();
+    } finally {
+      buttons.forEach(function (b) { b.disabled = false; });
+    }
+  });
+})();
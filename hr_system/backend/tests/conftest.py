@@ -0,0 +1,148 @@
+"""Shared fixtures: the app on a throwaway SQLite file, one TestClient per session.
+
+Run from hr_system/backend:
+    python -m pytest -q
+
+Everything async (queries, caches) goes through `run`, which executes on the
+TestClient's event loop — the engines' pooled connections belong to it.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_TMP = tempfile.mkdtemp(prefix="hr_tests_")
+
+# قبل أي import من app: settings و الـ engines بيتقروا وقت الـ import
+os.chdir(BACKEND)
+sys.path.insert(0, BACKEND)
+os.environ.update({
+    "USE_SQLITE": "1",
+    "SQLITE_PATH": os.path.relpath(os.path.join(_TMP, "hr_test.db"), BACKEND),
+    "AUDIT_ARCHIVE_DIR": os.path.join(_TMP, "audit_archive"),
+    "JINJA_BYTECODE_DIR": "",
+    "KPI_RECONCILE_SECONDS": "0",
+    "AUDIT_FLUSH_INTERVAL": "0.05",
+    "ADMIN_USERNAME": "admin",
+    "ADMIN_PASSWORD": "admin123",
+})
+
+ADMIN = ("admin", "admin123")
+USER = ("viewer", "viewer-pw")
+
+# roles/permissions مش جزء من الـ models (بتتعمل من برا)، زي الـ DB بتاعة الـ deployment
+_RBAC_DDL = (
+    "CREATE TABLE IF NOT EXISTS roles (id INTEGER PRIMARY KEY, name TEXT UNIQUE)",
+    "CREATE TABLE IF NOT EXISTS permissions (id INTEGER PRIMARY KEY, code TEXT UNIQUE)",
+    "CREATE TABLE IF NOT EXISTS user_roles (user_id INTEGER, role_id INTEGER)",
+    "CREATE TABLE IF NOT EXISTS role_permissions (role_id INTEGER, permission_id INTEGER)",
+)
+
+
+def db_path() -> str:
+    return os.path.join(BACKEND, os.environ["SQLITE_PATH"])
+
+
+def sql(statement: str, params: tuple = ()) -> list[tuple]:
+    """Plain sqlite3 on the test DB (setup / assertions outside the app)."""
+    con = sqlite3.connect(db_path())
+    try:
+        rows = con.execute(statement, params).fetchall()
+        con.commit()
+        return rows
+    finally:
+        con.close()
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    for ddl in _RBAC_DDL:
+        sql(ddl)
+
+    with TestClient(app) as c:
+        login(c, *ADMIN)
+        c.post("/users/new", data={"username": USER[0], "password": USER[1]})
+        yield c
+
+
+@pytest.fixture(scope="session")
+def run(client):
+    """run(async_fn, *args) on the app's event loop."""
+    return lambda fn, *args: client.portal.call(fn, *args)
+
+
+def login(c, username: str, password: str):
+    c.cookies.clear()
+    r = c.post("/login", data={"username": username, "password": password}, follow_redirects=False)
+    assert r.status_code == 302, r.status_code
+
+
+@contextmanager
+def _restoring_cookies(c):
+    # الـ jar نفسه مش dict: ممكن يبقى فيه كذا session cookie (domain/path مختلفين)
+    saved = list(c.cookies.jar)
+    try:
+        yield c
+    finally:
+        c.cookies.clear()
+        for cookie in saved:
+            c.cookies.jar.set_cookie(cookie)
+
+
+@contextmanager
+def logged_in(c, username: str, password: str):
+    with _restoring_cookies(c):
+        login(c, username, password)
+        yield c
+
+
+@contextmanager
+def logged_out(c):
+    with _restoring_cookies(c):
+        c.cookies.clear()
+        yield c
+
+
+def user_id(username: str) -> int:
+    return sql("SELECT id FROM users WHERE username = ?", (username,))[0][0]
+
+
+def grant(username: str, *codes: str) -> None:
+    """Role `<username>-role` holding exactly `codes`, assigned to the user."""
+    role = f"{username}-role"
+    sql("INSERT OR IGNORE INTO roles(name) VALUES (?)", (role,))
+    role_id = sql("SELECT id FROM roles WHERE name = ?", (role,))[0][0]
+    sql("DELETE FROM role_permissions WHERE role_id = ?", (role_id,))
+    for code in codes:
+        sql("INSERT OR IGNORE INTO permissions(code) VALUES (?)", (code,))
+        perm_id = sql("SELECT id FROM permissions WHERE code = ?", (code,))[0][0]
+        sql("INSERT INTO role_permissions(role_id, permission_id) VALUES (?, ?)", (role_id, perm_id))
+    uid = user_id(username)
+    sql("DELETE FROM user_roles WHERE user_id = ?", (uid,))
+    sql("INSERT INTO user_roles(user_id, role_id) VALUES (?, ?)", (uid, role_id))
+
+
+_seq = iter(range(1, 10**9))
+
+
+def new_department(c, name: str | None = None) -> int:
+    name = name or f"Dept {next(_seq)}"
+    c.post("/departments/new", data={"name": name})
+    return sql("SELECT id FROM departments WHERE name = ?", (name,))[0][0]
+
+
+def new_employee(c, department_id: int | None = None, **fields) -> int:
+    n = next(_seq)
+    data = {"full_name": f"Employee {n:05d}", "email": f"e{n}@example.com", **fields}
+    if department_id is not None:
+        data["department_id"] = str(department_id)
+    c.post("/employees/new", data=data)
+    return sql("SELECT id FROM employees WHERE email = ?", (data["email"],))[0][0]
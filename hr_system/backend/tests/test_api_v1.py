@@ -0,0 +1,117 @@
+import json
+from decimal import Decimal
+
+import pytest
+
+from app.api.v1.common import MAX_PAGE_SIZE, clamp_limit, dumps
+from app.api.v1.schemas import EmployeeOut
+
+from conftest import USER, grant, logged_in, logged_out, new_department, new_employee
+
+
+@pytest.fixture(scope="module")
+def api_dept(client):
+    dept = new_department(client)
+    ids = [new_employee(client, dept, full_name=f"Api {i:02d}", job_title="Tester") for i in range(7)]
+    return dept, ids
+
+
+def _walk(client, url: str) -> list[dict]:
+    items, cursor = [], None
+    while True:
+        r = client.get(url + (f"&cursor={cursor}" if cursor else ""))
+        assert r.status_code == 200, r.text
+        body = r.json()
+        items.extend(body["items"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            return items
+
+
+def test_requires_session_with_json_errors(client):
+    with logged_out(client):
+        r = client.get("/api/v1/employees", follow_redirects=False)
+    assert r.status_code == 401
+    assert r.json() == {"detail": "not authenticated"}
+
+
+def test_employees_page_matches_the_schema(client, api_dept):
+    dept, ids = api_dept
+    items = _walk(client, f"/api/v1/employees?department_id={dept}&limit=3")
+    assert [i["id"] for i in items] == ids  # sort=name, الأسماء بالترتيب
+    assert set(items[0]) == set(EmployeeOut.model_fields)
+    assert items[0]["department_id"] == dept
+    assert items[0]["department_name"]
+
+
+def test_fields_projection_and_unknown_fields(client, api_dept):
+    dept, ids = api_dept
+    r = client.get(f"/api/v1/employees/{ids[0]}?fields=full_name,id,full_name")
+    assert r.json() == {"full_name": "Api 00", "id": ids[0]}
+
+    r = client.get("/api/v1/employees?fields=id,salary")
+    assert r.status_code == 400
+    detail = r.json()["detail"]
+    assert detail["unknown_fields"] == ["salary"]
+    assert "full_name" in detail["available"]
+
+    assert client.get("/api/v1/employees/999999999").status_code == 404
+
+
+def test_limit_is_clamped():
+    assert clamp_limit(0) == 1
+    assert clamp_limit(10**6) == MAX_PAGE_SIZE
+
+
+def test_stream_returns_every_row_as_ndjson(client, api_dept):
+    dept, ids = api_dept
+    r = client.get(f"/api/v1/employees?department_id={dept}&stream=1&fields=id,email")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    assert r.headers["cache-control"] == "no-store"
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert [row["id"] for row in rows] == ids
+    assert set(rows[0]) == {"id", "email"}
+
+
+def test_departments_report_headcount(client, api_dept):
+    dept, ids = api_dept
+    items = _walk(client, "/api/v1/departments?limit=2")
+    mine = [d for d in items if d["id"] == dept]
+    assert mine and mine[0]["headcount"] == len(ids)
+
+
+def test_list_endpoints_answer_304(client, api_dept):
+    r = client.get("/api/v1/employees?limit=2")
+    again = client.get("/api/v1/employees?limit=2", headers={"If-None-Match": r.headers["etag"]})
+    assert again.status_code == 304
+
+
+def test_payroll_needs_permission(client, api_dept):
+    _, ids = api_dept
+    with logged_in(client, *USER):
+        assert client.get("/api/v1/payroll/runs").status_code == 403
+        assert client.get(f"/api/v1/employees/{ids[0]}/pay-history").status_code == 403
+        grant(USER[0], "payroll.view")
+        try:
+            assert client.get("/api/v1/payroll/runs").status_code == 200
+            assert client.get(f"/api/v1/employees/{ids[0]}/pay-history").json()["items"] == []
+        finally:
+            grant(USER[0])
+
+
+def test_system_stats_admin_only(client):
+    assert "hit_ratio" in client.get("/api/v1/system/page-cache").json()
+    with logged_in(client, *USER):
+        assert client.get("/api/v1/system/page-cache").status_code == 403
+
+
+def test_openapi_documents_the_page_models(client):
+    spec = client.get("/openapi.json").json()
+    op = spec["paths"]["/api/v1/employees"]["get"]
+    ref = op["responses"]["200"]["content"]["application/json"]["schema"]["$ref"]
+    assert ref.endswith("Page_EmployeeOut_")
+
+
+def test_decimals_encode_as_numbers():
+    assert dumps({"net": Decimal("12.50")}) == b'{"net":12.5}'
@@ -0,0 +1,138 @@
+import gzip
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from app.core import assets
+from app.core.compression import accepted_encodings, negotiate
+
+
+@pytest.mark.parametrize("header, available, expected", [
+    ("gzip, deflate, br", ("br", "gzip"), "br"),
+    ("br;q=0, gzip", ("br", "gzip"), "gzip"),
+    ("gzip;q=1, br;q=0.5", ("br", "gzip"), "gzip"),
+    ("*", ("br", "gzip"), "br"),
+    ("*;q=0, gzip;q=0.2", ("br", "gzip"), "gzip"),
+    ("gzip; level=1; q=0", ("gzip",), None),
+    # substring مش token
+    ("x-gzip, brotli", ("br", "gzip"), None),
+    ("", ("br", "gzip"), None),
+])
+def test_negotiate_uses_tokens_and_q_values(header, available, expected):
+    assert negotiate(header, available) == expected
+
+
+def test_accepted_encodings_parses_params():
+    assert accepted_encodings("GZIP;Q=0.5 , br ; q=bogus, ,identity") == {"gzip": 0.5, "br": 0.0, "identity": 1.0}
+
+
+# ---------- manifest / rebuild ----------
+
+@pytest.fixture
+def asset_tree(tmp_path, monkeypatch):
+    templates = tmp_path / "templates"
+    templates.mkdir()
+    (templates / "page.html").write_text('<div class="p-4">x</div>', encoding="utf-8")
+    theme = tmp_path / "theme.css"
+    theme.write_text(".card{color:red}", encoding="utf-8")
+    js = tmp_path / "app.js"
+    js.write_text("console.log(1)", encoding="utf-8")
+    dist = tmp_path / "dist"
+
+    monkeypatch.setattr(assets, "TEMPLATE_DIR", str(templates))
+    monkeypatch.setattr(assets, "SOURCES", [str(theme)])
+    monkeypatch.setattr(assets, "JS_SOURCES", [str(js)])
+    monkeypatch.setattr(assets, "DIST_DIR", str(dist))
+    monkeypatch.setattr(assets, "MANIFEST", str(dist / "manifest.json"))
+    saved = dict(assets._manifest)
+    yield templates, theme, dist
+    assets._manifest.clear()
+    assets._manifest.update(saved)
+
+
+def _css(dist, manifest) -> str:
+    return (dist / os.path.basename(manifest["app.css"])).read_text(encoding="utf-8")
+
+
+def test_ensure_built_reuses_a_current_manifest(asset_tree, monkeypatch):
+    _, _, dist = asset_tree
+    first = dict(assets.ensure_built())
+    assert first[assets.INPUTS] == assets.input_hash()
+
+    calls = []
+    monkeypatch.setattr(assets, "build", lambda: calls.append(1) or {})
+    assert assets.ensure_built() == first
+    assert calls == []
+
+
+def test_template_or_source_change_rebuilds(asset_tree):
+    templates, theme, dist = asset_tree
+    first = dict(assets.ensure_built())
+    assert ".p-8" not in _css(dist, first)
+
+    (templates / "page.html").write_text('<div class="p-8">x</div>', encoding="utf-8")
+    second = dict(assets.ensure_built())
+    assert second["app.css"] != first["app.css"]
+    assert ".p-8" in _css(dist, second)
+    # الـ URL القديم لسه شغال للـ pages اللي اترندرت قبل الـ build
+    assert (dist / os.path.basename(first["app.css"])).exists()
+    assert second[assets.PREVIOUS] == [os.path.basename(first["app.css"])]
+
+    theme.write_text(".card{color:blue}", encoding="utf-8")
+    third = dict(assets.ensure_built())
+    assert third[assets.INPUTS] != second[assets.INPUTS]
+    assert "color:blue" in _css(dist, third)
+    assert third["app.js"] == first["app.js"]
+
+
+def test_old_builds_are_pruned_past_the_limit(asset_tree, monkeypatch):
+    templates, _, dist = asset_tree
+    monkeypatch.setattr(assets.settings, "ASSET_KEEP_BUILDS", 2)
+    builds = []
+    for i in range(4):
+        (templates / "page.html").write_text(f'<div class="p-{i + 1}">x</div>', encoding="utf-8")
+        builds.append(os.path.basename(assets.ensure_built()["app.css"]))
+
+    assert len(set(builds)) == 4
+    assert assets._manifest[assets.PREVIOUS] == [builds[2], builds[1]]
+    # + الـ .gz/.br بتوعهم
+    assert {p.name.split(".css")[0] + ".css" for p in dist.glob("app.*.css*")} == set(builds[1:])
+    assert (dist / f"{builds[1]}.gz").exists()
+
+
+# ---------- serving ----------
+
+@pytest.fixture
+def static_client(tmp_path):
+    (tmp_path / "app.0123456789ab.css").write_bytes(b"body{}" * 50)
+    (tmp_path / "app.0123456789ab.css.gz").write_bytes(gzip.compress(b"body{}" * 50))
+    (tmp_path / "app.0123456789ab.css.br").write_bytes(b"not-really-brotli")
+    (tmp_path / "plain.css").write_bytes(b"a{}")
+    app = Starlette(routes=[Mount("/static", assets.AssetFiles(directory=str(tmp_path)))])
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.mark.parametrize("accept, encoding", [
+    ("br, gzip", "br"),
+    ("gzip, br;q=0", "gzip"),
+    ("gzip;q=0.5, br;q=0.4", "gzip"),
+    ("x-gzip, brotli", None),
+    ("identity", None),
+])
+def test_precompressed_variant_follows_accept_encoding(static_client, accept, encoding):
+    r = static_client.get("/static/app.0123456789ab.css", headers={"Accept-Encoding": accept})
+    assert r.status_code == 200
+    assert r.headers.get("content-encoding") == encoding
+    assert r.headers["content-type"].startswith("text/css")
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert r.headers["cache-control"] == assets.IMMUTABLE
+
+
+def test_unhashed_files_revalidate(static_client):
+    r = static_client.get("/static/plain.css", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["cache-control"] == assets.REVALIDATE
+    assert "content-encoding" not in r.headers
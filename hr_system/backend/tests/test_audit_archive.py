@@ -0,0 +1,120 @@
+import gzip
+import json
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from app.core import audit_retention
+from app.core.audit_retention import archive_path, archived_months, run_retention, search_archive, verify_archive
+from app.queries.audit import AuditFilter
+
+from conftest import db_path, sql
+
+ENTITY = "archtest"
+MONTHS = ("2019-01", "2019-02", "2019-03")
+
+
+@pytest.fixture(scope="module")
+def archive(client, run, tmp_path_factory):
+    folder = str(tmp_path_factory.mktemp("archive"))
+    con = sqlite3.connect(db_path())
+    with con:
+        con.executemany(
+            "INSERT INTO audit_logs(action, entity, entity_id, meta, created_at) VALUES (?, ?, ?, ?, ?)",
+            [
+                ("arch.even" if i % 2 == 0 else "arch.odd", ENTITY, i, json.dumps({"employee_id": i % 5}),
+                 f"{month}-{1 + i % 27:02d} 08:00:{i % 60:02d}.000000")
+                for month in MONTHS
+                for i in range(40)
+            ],
+        )
+    con.close()
+    done = run(run_retention, 3, folder)
+    assert [rows for _, rows in done if "2019" in _] == [40, 40, 40]
+    return folder
+
+
+def _all(folder, f):
+    rows = []
+    for month in archived_months(folder):
+        with gzip.open(archive_path(month, folder), "rt", encoding="utf-8") as fh:
+            rows += [json.loads(line) for line in fh]
+    out = []
+    for r in rows:
+        created = datetime.fromisoformat(r["created_at"])
+        if r["entity"] == f.entity and (f.action is None or r["action"] == f.action):
+            out.append((created, r["id"]))
+    return sorted(out, reverse=True)
+
+
+def test_retention_exports_verified_months_and_deletes_rows(archive):
+    for m in ("2019_01", "2019_02", "2019_03"):
+        path = f"{archive}/audit-{m}.ndjson.gz"
+        assert verify_archive(path) == 40
+    assert sql("SELECT count(*) FROM audit_logs WHERE entity = ?", (ENTITY,)) == [(0,)]
+
+
+def test_pages_walk_newest_first_without_gaps(archive):
+    f = AuditFilter(entity=ENTITY, action="arch.even")
+    seen, before = [], None
+    while True:
+        page = search_archive(f, 7, before, archive)
+        seen += [(r["created_at"], r["id"]) for r in page]
+        if len(page) < 7:
+            break
+        before = (page[-1]["created_at"], page[-1]["id"])
+    assert seen == _all(archive, f)
+    assert len(seen) == 60
+
+
+def test_scan_stops_once_the_page_is_full(archive, monkeypatch):
+    opened = []
+    real = audit_retention._scan_month
+    monkeypatch.setattr(audit_retention, "_scan_month", lambda path, *a: opened.append(path) or real(path, *a))
+
+    page = search_archive(AuditFilter(entity=ENTITY), 5, None, archive)
+    assert len(page) == 5
+    assert opened == [f"{archive}/audit-2019_03.ndjson.gz"]
+
+    # cursor في فبراير: مارس مايتفتحش خالص
+    opened.clear()
+    search_archive(AuditFilter(entity=ENTITY), 5, (datetime(2019, 2, 10), 0), archive)
+    assert opened == [f"{archive}/audit-2019_02.ndjson.gz"]
+
+
+def test_month_scan_holds_only_the_page(archive, monkeypatch):
+    f = AuditFilter(entity=ENTITY)
+    path = f"{archive}/audit-2019_02.ndjson.gz"
+    page = audit_retention._scan_month(path, f, None, 3)
+    newest = _all(archive, f)
+    feb = [k for k in newest if k[0].month == 2]
+    assert [(r["created_at"], r["id"]) for r in page] == feb[:3]
+
+
+def test_since_until_bound_the_months(archive):
+    f = AuditFilter(entity=ENTITY, since=datetime(2019, 2, 1), until=datetime(2019, 2, 28, 23, 59))
+    rows = search_archive(f, 1000, None, archive)
+    assert len(rows) == 40 and {r["created_at"].month for r in rows} == {2}
+
+
+def test_archive_page_runs_off_the_event_loop(client, run, archive, monkeypatch):
+    from app.core.config import settings
+    import threading
+
+    monkeypatch.setattr(settings, "AUDIT_ARCHIVE_DIR", archive)
+    threads = []
+    real = audit_retention._scan_month
+
+    def spy(*a):
+        threads.append(threading.current_thread().name)
+        return real(*a)
+
+    monkeypatch.setattr(audit_retention, "_scan_month", spy)
+    r = client.get(f"/reports/audit?source=archive&entity={ENTITY}&action=arch.odd")
+    assert r.status_code == 200
+    async def loop_thread():
+        return threading.current_thread().name
+
+    assert threads and run(loop_thread) not in threads
+    assert "arch.odd" in r.text and "arch.even" not in r.text
@@ -0,0 +1,94 @@
+import json
+import sqlite3
+
+import pytest
+from sqlalchemy import desc, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models.audit_log import AuditLog, audit_meta_key
+from app.queries.audit import AuditFilter, apply_filter, audit_page_query
+
+from conftest import db_path, sql
+
+EMPLOYEE = 900_001
+
+
+@pytest.fixture(scope="module")
+def audit_rows(client):
+    sql("DELETE FROM audit_logs WHERE action LIKE 'test.%'")
+    con = sqlite3.connect(db_path())
+    with con:
+        con.executemany(
+            "INSERT INTO audit_logs(action, entity, entity_id, meta, created_at) VALUES (?, ?, ?, ?, ?)",
+            [
+                (
+                    "test.update" if i % 2 else "test.create",
+                    "employee",
+                    i,
+                    json.dumps({"employee_id": EMPLOYEE if i % 3 == 0 else i}),
+                    f"2026-01-{1 + i % 28:02d} 10:{i % 60:02d}:00.000000",  # نفس format بتاع SQLAlchemy
+                )
+                for i in range(300)
+            ],
+        )
+    con.close()
+
+
+def _plan(q) -> str:
+    compiled = q.compile(dialect=sqlite.dialect())
+    params = [compiled.params[name] for name in compiled.positiontup]
+    con = sqlite3.connect(db_path())
+    try:
+        rows = con.execute("EXPLAIN QUERY PLAN " + str(compiled), params).fetchall()
+    finally:
+        con.close()
+    return " | ".join(r[-1] for r in rows)
+
+
+def test_employee_filter_uses_meta_expression_index(audit_rows):
+    base = apply_filter(select(AuditLog), AuditFilter(employee_id=EMPLOYEE))
+    assert "USING INDEX ix_audit_logs_meta_employee_id" in _plan(base)
+
+    # نفس شكل audit_page_query (ORDER BY + LIMIT)
+    page = base.order_by(desc(AuditLog.created_at), desc(AuditLog.id)).limit(51)
+    assert "ix_audit_logs_meta_employee_id" in _plan(page)
+
+
+def test_meta_path_is_a_literal_on_both_dialects():
+    q = select(AuditLog.id).where(audit_meta_key("employee_id") == 5)
+    lite = q.compile(dialect=sqlite.dialect())
+    assert "JSON_EXTRACT(audit_logs.meta, '$.\"employee_id\"')" in str(lite)
+    assert list(lite.params.values()) == [5]
+
+    pg = q.compile(dialect=postgresql.dialect())
+    assert "CAST((audit_logs.meta ->> 'employee_id') AS INTEGER)" in str(pg)
+    assert list(pg.params.values()) == [5]
+
+
+def test_meta_key_is_part_of_the_cache_key():
+    a = audit_meta_key("employee_id")
+    b = AuditLog.__table__.c.meta
+    from app.models.audit_log import meta_int
+
+    assert meta_int(b, "other_id")._generate_cache_key() != a._generate_cache_key()
+    with pytest.raises(ValueError):
+        meta_int(b, "x') OR 1=1 --")
+
+
+def test_filtered_pages_walk_every_row_once(audit_rows, run):
+    from app.db.session import ReadSessionLocal
+
+    async def walk(f: AuditFilter):
+        seen, cursor = [], None
+        async with ReadSessionLocal() as db:
+            while True:
+                rows, cursor = await audit_page_query(db, f, cursor, limit=7)
+                seen.extend(rows)
+                if not cursor:
+                    return seen
+
+    rows = run(walk, AuditFilter(employee_id=EMPLOYEE, action="test.create"))
+    expected = {i for i in range(300) if i % 3 == 0 and i % 2 == 0}
+    assert sorted(r.entity_id for r in rows) == sorted(expected)
+    keys = [(r.created_at, r.id) for r in rows]
+    assert keys == sorted(keys, reverse=True)
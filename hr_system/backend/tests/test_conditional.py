@@ -0,0 +1,91 @@
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.compression import CompressionMiddleware
+
+from conftest import USER, logged_in, new_department, new_employee
+
+
+def _get(client, url: str, **headers):
+    return client.get(url, headers=headers, follow_redirects=False)
+
+
+def test_etag_only_validators(client):
+    r = _get(client, "/departments")
+    assert r.status_code == 200
+    assert r.headers["etag"].startswith('W/"')
+    assert r.headers["cache-control"] == "private, no-cache"
+    assert "last-modified" not in r.headers
+
+    again = _get(client, "/departments", **{"If-None-Match": r.headers["etag"]})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == r.headers["etag"]
+    assert "content-encoding" not in again.headers
+
+    # If-None-Match list / strong form of the same tag
+    strong = r.headers["etag"].removeprefix("W/")
+    assert _get(client, "/departments", **{"If-None-Match": f'"nope", {strong}'}).status_code == 304
+
+
+def test_if_modified_since_is_ignored(client):
+    r = _get(client, "/departments", **{"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"})
+    assert r.status_code == 200
+
+
+def test_write_changes_the_etag_immediately(client):
+    etag = _get(client, "/departments").headers["etag"]
+    # نفس الثانية: Last-Modified كان هيرجع 304 هنا
+    new_department(client)
+    r = _get(client, "/departments", **{"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+
+
+def test_etag_is_per_user_and_url(client):
+    admin = _get(client, "/employees").headers["etag"]
+    assert _get(client, "/employees?sort=email").headers["etag"] != admin
+    with logged_in(client, *USER):
+        viewer = _get(client, "/employees")
+        assert viewer.headers["etag"] != admin
+        assert _get(client, "/employees", **{"If-None-Match": admin}).status_code == 200
+
+
+def test_html_is_compressed_by_accept_encoding(client):
+    for i in range(5):
+        new_employee(client, full_name=f"Compressible {i}")
+
+    r = _get(client, "/employees", **{"Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in r.headers["vary"]
+    assert r.headers["etag"].startswith("W/")
+    assert "Compressible 0" in r.text
+
+    plain = _get(client, "/employees", **{"Accept-Encoding": "gzip;q=0, identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.text == r.text
+
+
+def test_streamed_export_is_compressed_in_chunks(client):
+    new_employee(client, full_name="Streamed Person")
+    r = _get(client, "/employees/export?format=csv", **{"Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert "content-length" not in r.headers
+    assert "Streamed Person" in r.text
+
+
+def test_small_and_precompressed_bodies_pass_through(client):
+    # ?gzip=1 = ملف .gz جاهز؛ الـ middleware مايضغطش تاني
+    r = _get(client, "/employees/export?format=csv&gzip=1", **{"Accept-Encoding": "gzip"})
+    assert r.headers["content-type"] == "application/gzip"
+    assert "content-encoding" not in r.headers
+
+    app = Starlette(routes=[Route("/", lambda request: PlainTextResponse("x" * 100))])
+    with TestClient(CompressionMiddleware(app, minimum_size=1024)) as c:
+        small = c.get("/", headers={"Accept-Encoding": "gzip"})
+    assert small.text == "x" * 100
+    assert "content-encoding" not in small.headers
@@ -0,0 +1,95 @@
+from app.core import current_user, refcache
+from app.core.current_user import invalidate_user, load_current_user, mark_user_changed
+
+from conftest import ADMIN, USER, sql, user_id
+
+
+def test_cached_until_invalidated(client, run):
+    uid = user_id(USER[0])
+    first = run(load_current_user, uid)
+    assert first.username == USER[0]
+    assert run(load_current_user, uid) is first
+
+    invalidate_user(uid)
+    again = run(load_current_user, uid)
+    assert again is not first
+    assert again.perm_version != first.perm_version
+
+
+def test_user_edit_keeps_other_users_cached(client, run):
+    admin = run(load_current_user, user_id(ADMIN[0]))
+    viewer = run(load_current_user, user_id(USER[0]))
+
+    invalidate_user(viewer.id)
+
+    assert run(load_current_user, admin.id) is admin
+    assert run(load_current_user, viewer.id) is not viewer
+
+
+def test_role_wide_change_reloads_everyone(client, run):
+    admin = run(load_current_user, user_id(ADMIN[0]))
+    viewer = run(load_current_user, user_id(USER[0]))
+
+    invalidate_user()
+
+    assert run(load_current_user, admin.id) is not admin
+    assert run(load_current_user, viewer.id) is not viewer
+
+
+def test_load_racing_an_edit_is_not_cached(client, run, monkeypatch):
+    uid = user_id(USER[0])
+    invalidate_user(uid)
+    real_session = current_user.ReadSessionLocal
+
+    def session_with_edit():
+        # تعديل بيحصل والـ SELECT شغال
+        invalidate_user(uid)
+        return real_session()
+
+    monkeypatch.setattr(current_user, "ReadSessionLocal", session_with_edit)
+    stale = run(load_current_user, uid)
+    monkeypatch.setattr(current_user, "ReadSessionLocal", real_session)
+
+    assert run(load_current_user, uid) is not stale
+
+
+def _users_version() -> int:
+    return sql("SELECT version FROM ref_versions WHERE name = 'users'")[0][0]
+
+
+def test_staged_change_applies_after_commit(client, run):
+    from app.db.session import AsyncSessionLocal
+
+    uid = user_id(USER[0])
+    before = run(load_current_user, uid)
+    shared = _users_version()
+
+    async def edit(commit: bool):
+        async with AsyncSessionLocal() as db:
+            await mark_user_changed(db, uid)
+            # لسه مفيش commit: load هنا مايشوفش version جديدة
+            during = await load_current_user(uid)
+            await (db.commit() if commit else db.rollback())
+            return during
+
+    assert run(edit, False) is before
+    assert run(load_current_user, uid) is before
+    assert _users_version() == shared
+
+    assert run(edit, True) is before
+    assert run(load_current_user, uid) is not before
+    assert _users_version() == shared + 1
+
+
+def test_other_worker_edit_reloads_through_ref_versions(client, run):
+    uid = user_id(USER[0])
+    before = run(load_current_user, uid)
+    # worker تاني عمل commit لتعديل
+    sql("UPDATE ref_versions SET version = version + 1 WHERE name = 'users'")
+    refcache.poll_soon()
+    assert run(load_current_user, uid) is not before
+
+
+def test_missing_user(client, run):
+    assert run(load_current_user, None) is None
+    assert run(load_current_user, 10**9) is None
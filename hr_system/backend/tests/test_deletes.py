@@ -0,0 +1,35 @@
+from sqlalchemy import text
+
+from conftest import new_department, new_employee, sql
+
+
+def test_app_connections_enforce_foreign_keys(client, run):
+    from app.db.session import AsyncSessionLocal, ReadSessionLocal
+
+    async def pragma(factory):
+        async with factory() as db:
+            return (await db.execute(text("PRAGMA foreign_keys"))).scalar()
+
+    assert run(pragma, AsyncSessionLocal) == 1
+    assert run(pragma, ReadSessionLocal) == 1
+
+
+def test_employee_delete_cascades(client):
+    emp = new_employee(client)
+    client.post("/attendance/check-in", data={"employee_id": str(emp)})
+    client.post("/leaves/new", data={"employee_id": str(emp), "from_date": "2026-07-01", "to_date": "2026-07-02"})
+    assert sql("SELECT count(*) FROM attendance WHERE employee_id = ?", (emp,)) == [(1,)]
+    assert sql("SELECT count(*) FROM leave_requests WHERE employee_id = ?", (emp,)) == [(1,)]
+
+    client.post(f"/employees/{emp}/delete")
+    assert sql("SELECT count(*) FROM attendance WHERE employee_id = ?", (emp,)) == [(0,)]
+    assert sql("SELECT count(*) FROM leave_requests WHERE employee_id = ?", (emp,)) == [(0,)]
+
+
+def test_department_delete_unassigns_its_employees(client):
+    dept = new_department(client)
+    emp = new_employee(client, dept)
+    r = client.post(f"/departments/{dept}/delete", follow_redirects=False)
+    assert r.status_code == 302
+    assert sql("SELECT count(*) FROM departments WHERE id = ?", (dept,)) == [(0,)]
+    assert sql("SELECT department_id FROM employees WHERE id = ?", (emp,)) == [(None,)]
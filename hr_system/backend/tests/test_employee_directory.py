@@ -0,0 +1,107 @@
+import sqlite3
+
+import pytest
+from sqlalchemy.dialects import sqlite
+
+from app.queries.employees import SORTS, EmployeeFilter, directory_page_query, directory_select
+
+from conftest import db_path, new_department, new_employee, sql
+
+
+@pytest.fixture(scope="module")
+def directory(client):
+    dept = new_department(client)
+    # أسامي متكررة عشان الـ id يفصل بينهم في الـ keyset
+    for i in range(13):
+        new_employee(
+            client, dept,
+            full_name=f"Dir {'Same' if i % 3 == 0 else i:>4}",
+            email=f"dir{(i * 7) % 13:02d}-{i}@example.com",
+            job_title="Analyst" if i % 2 else "Engineer",
+        )
+    return dept
+
+
+def _rows(dept: int, job_title: str | None = None) -> list[dict]:
+    q = "SELECT id, full_name, email, job_title FROM employees WHERE department_id = ?"
+    params: tuple = (dept,)
+    if job_title:
+        q += " AND job_title = ?"
+        params += (job_title,)
+    return [dict(zip(("id", "full_name", "email", "job_title"), r)) for r in sql(q, params)]
+
+
+def _plan(q) -> str:
+    compiled = q.compile(dialect=sqlite.dialect())
+    params = [compiled.params[name] for name in compiled.positiontup]
+    con = sqlite3.connect(db_path())
+    try:
+        rows = con.execute("EXPLAIN QUERY PLAN " + str(compiled), params).fetchall()
+    finally:
+        con.close()
+    return " | ".join(r[-1] for r in rows)
+
+
+@pytest.mark.parametrize("f", [
+    EmployeeFilter(),
+    EmployeeFilter(department_id=1),
+    EmployeeFilter(job_title="Analyst"),
+    EmployeeFilter(department_id=1, job_title="Analyst"),
+], ids=["none", "department", "job_title", "both"])
+@pytest.mark.parametrize("sort", sorted(SORTS))
+@pytest.mark.parametrize("desc", [False, True], ids=["asc", "desc"])
+def test_every_filter_and_sort_reads_in_index_order(directory, f, sort, desc):
+    plan = _plan(directory_select(f, sort, desc))
+    assert "TEMP B-TREE" not in plan, plan
+    if f.department_id is not None or f.job_title:
+        assert "SEARCH employees USING" in plan, plan
+
+
+@pytest.mark.parametrize("sort", sorted(SORTS))
+@pytest.mark.parametrize("desc", [False, True], ids=["asc", "desc"])
+def test_keyset_pages_walk_every_row_once(directory, run, sort, desc):
+    from app.db.session import ReadSessionLocal
+
+    async def walk(f: EmployeeFilter):
+        seen, cursor = [], None
+        async with ReadSessionLocal() as db:
+            while True:
+                rows, cursor = await directory_page_query(db, f, sort, desc, cursor, limit=4)
+                seen.extend(r.id for r in rows)
+                if not cursor:
+                    return seen
+
+    keys = [c.key for c in SORTS[sort]]
+    for job_title in (None, "Analyst"):
+        expected = sorted(_rows(directory, job_title), key=lambda r: [r[k] for k in keys], reverse=desc)
+        got = run(walk, EmployeeFilter(department_id=directory, job_title=job_title))
+        assert got == [r["id"] for r in expected]
+
+
+def test_cursor_from_another_sort_restarts(directory, run):
+    from app.db.session import ReadSessionLocal
+
+    async def pages():
+        f = EmployeeFilter(department_id=directory)
+        async with ReadSessionLocal() as db:
+            _, cursor = await directory_page_query(db, f, "email", False, None, limit=3)
+            again, _ = await directory_page_query(db, f, "name", False, cursor, limit=3)
+            fresh, _ = await directory_page_query(db, f, "name", False, None, limit=3)
+            return again, fresh
+
+    again, fresh = run(pages)
+    assert [r.id for r in again] == [r.id for r in fresh]
+
+
+def test_json_directory_follows_next_cursor(client, directory):
+    url = f"/employees?format=json&department_id={directory}&sort=email&dir=desc&limit=5"
+    seen, cursor = [], None
+    while True:
+        r = client.get(url + (f"&cursor={cursor}" if cursor else ""))
+        assert r.status_code == 200
+        body = r.json()
+        seen.extend(e["email"] for e in body["items"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert seen == sorted((r["email"] for r in _rows(directory)), reverse=True)
@@ -0,0 +1,120 @@
+import csv
+import io
+
+import pytest
+
+from app.core.employee_import import ImportFileError, import_employees, iter_csv
+
+from conftest import USER, logged_in, new_department, new_employee, sql
+
+
+def _upload(client, text: str, dry_run: bool = False, filename: str = "employees.csv"):
+    return client.post(
+        "/employees/import",
+        files={"file": (filename, text.encode("utf-8-sig"), "text/csv")},
+        data={"dry_run": "1" if dry_run else ""},
+        follow_redirects=False,
+    )
+
+
+def _report(r) -> dict[tuple[str, str], tuple[str, str]]:
+    assert r.status_code == 200, r.status_code
+    return {(row["line"], row["email"]): (row["status"], row["error"]) for row in csv.DictReader(io.StringIO(r.text))}
+
+
+def _employee(email: str):
+    rows = sql("SELECT full_name, job_title, department_id, base_salary FROM employees WHERE email = ?", (email,))
+    return rows[0] if rows else None
+
+
+def _kpi_employees() -> float:
+    return sql("SELECT value FROM kpi_counters WHERE name = 'employees'")[0][0]
+
+
+@pytest.fixture
+def existing(client):
+    dept = new_department(client)
+    emp = new_employee(client, dept, full_name="Old Name", job_title="Keeper")
+    email = sql("SELECT email FROM employees WHERE id = ?", (emp,))[0][0]
+    return dept, email
+
+
+def _file(dept_name: str, existing_email: str, tag: str) -> str:
+    return (
+        "full_name,email,job_title,hire_date,department,base_salary\n"
+        f"New Person,{tag}-new@example.com,Analyst,2026-02-01,{dept_name.upper()},1500.50\n"
+        f"Renamed,{existing_email.upper()},,,,\n"
+        f"Bad Date,{tag}-bad@example.com,,2026-13-01,,\n"
+        f"No Dept,{tag}-nodept@example.com,,,Nowhere,\n"
+        f"Twice,{tag}-new@example.com,,,,\n"
+    )
+
+
+def test_dry_run_reports_without_writing(client, existing):
+    dept, email = existing
+    dept_name = sql("SELECT name FROM departments WHERE id = ?", (dept,))[0][0]
+    before = _kpi_employees()
+
+    assert _report(_upload(client, _file(dept_name, email, "dry"), dry_run=True)) == {
+        ("2", "dry-new@example.com"): ("would_create", ""),
+        ("3", email): ("would_update", ""),
+        ("4", "dry-bad@example.com"): ("error", "invalid_hire_date"),
+        ("5", "dry-nodept@example.com"): ("error", "unknown_department"),
+        ("6", "dry-new@example.com"): ("error", "duplicate_in_file"),
+    }
+
+    assert _employee("dry-new@example.com") is None
+    assert _employee(email)[0] == "Old Name"
+    assert _kpi_employees() == before
+
+
+def test_import_upserts_on_email(client, existing):
+    dept, email = existing
+    dept_name = sql("SELECT name FROM departments WHERE id = ?", (dept,))[0][0]
+    before = _kpi_employees()
+
+    report = _report(_upload(client, _file(dept_name, email, "real")))
+    assert {k: status for k, (status, _) in report.items()} == {
+        ("2", "real-new@example.com"): "created",
+        ("3", email): "updated",
+        ("4", "real-bad@example.com"): "error",
+        ("5", "real-nodept@example.com"): "error",
+        ("6", "real-new@example.com"): "error",
+    }
+
+    full_name, job_title, department_id, salary = _employee("real-new@example.com")
+    assert (full_name, job_title, department_id, float(salary)) == ("New Person", "Analyst", dept, 1500.5)
+    # الخانات الفاضية في الـ update بتسيب القديم
+    assert _employee(email)[:3] == ("Renamed", "Keeper", dept)
+    assert _kpi_employees() == before + 1
+
+
+def test_duplicates_are_caught_across_batches(client, run):
+    from app.db.session import AsyncSessionLocal
+
+    rows = [(i + 2, {"full_name": f"B {i}", "email": f"batch{i % 3}@example.com"}) for i in range(5)]
+
+    async def go():
+        async with AsyncSessionLocal() as db:
+            report = await import_employees(db, rows, dry_run=True, batch_size=2)
+            await db.rollback()
+            return report
+
+    assert [r.status for r in run(go)] == ["would_create"] * 3 + ["error"] * 2
+
+
+def test_unreadable_files(client):
+    r = _upload(client, "name,mail\nx,y\n")
+    assert r.status_code == 302
+    assert r.headers["location"].endswith("error=missing_header")
+
+    with pytest.raises(ImportFileError):
+        list(iter_csv(io.BytesIO(b"full_name,email\n\xff\xfe,x@example.com\n")))
+
+
+def test_import_is_admin_only(client):
+    with logged_in(client, *USER):
+        r = _upload(client, "full_name,email\nX,sneaky@example.com\n")
+    assert r.status_code == 302
+    assert r.headers["location"].endswith("error=forbidden")
+    assert _employee("sneaky@example.com") is None
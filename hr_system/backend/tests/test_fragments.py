@@ -0,0 +1,87 @@
+from conftest import new_department, new_employee, sql
+
+FRAGMENT = {"X-Fragment": "1"}
+
+
+def _post(client, url: str, data: dict | None = None, fragment: bool = True):
+    return client.post(url, data=data or {}, headers=FRAGMENT if fragment else {}, follow_redirects=False)
+
+
+def _is_fragment(r, root_id: str):
+    assert r.status_code == 200, r.status_code
+    assert r.headers["x-fragment"] == "1"
+    assert r.headers["cache-control"] == "no-store"
+    assert f'id="{root_id}"' in r.text
+    # الـ partial بس، من غير الـ layout
+    assert "<html" not in r.text.lower()
+    assert "<nav" not in r.text.lower()
+
+
+def _new_leave(client, emp: int, **extra):
+    data = {"employee_id": str(emp), "from_date": "2026-05-01", "to_date": "2026-05-02", "reason": "fragment test"}
+    return _post(client, "/leaves/new", {**data, **extra})
+
+
+def test_new_leave_returns_the_requests_table(client):
+    emp = new_employee(client)
+    r = _new_leave(client, emp)
+    _is_fragment(r, "leave-requests")
+    leave_id = sql("SELECT id FROM leave_requests WHERE employee_id = ?", (emp,))[0][0]
+    assert f'id="leave-{leave_id}"' in r.text
+
+    # من غير الـ header => redirect عادي
+    plain = _post(client, "/leaves/new", {"employee_id": str(emp), "from_date": "2026-06-01", "to_date": "2026-06-01"},
+                  fragment=False)
+    assert plain.status_code == 302
+
+
+def test_approve_returns_the_updated_row(client):
+    emp = new_employee(client)
+    _new_leave(client, emp)
+    leave_id = sql("SELECT id FROM leave_requests WHERE employee_id = ?", (emp,))[0][0]
+
+    r = _post(client, f"/leaves/{leave_id}/approve")
+    _is_fragment(r, f"leave-{leave_id}")
+    assert "approved" in r.text
+    assert "/approve" not in r.text  # مفيش buttons بعد القرار
+    assert sql("SELECT status FROM leave_requests WHERE id = ?", (leave_id,)) == [("approved",)]
+
+
+def test_error_paths_still_redirect(client):
+    r = _post(client, "/leaves/999999999/approve")
+    assert r.status_code == 302
+    assert "x-fragment" not in r.headers
+    assert r.headers["location"].endswith("error=not_found")
+
+    r = _new_leave(client, new_employee(client), to_date="2026-04-01")
+    assert r.status_code == 302
+    assert r.headers["location"].endswith("error=range")
+
+
+def test_check_in_and_out_swap_the_panel(client):
+    emp = new_employee(client)
+    r = _post(client, "/attendance/check-in", {"employee_id": str(emp)})
+    _is_fragment(r, "attendance-panel")
+    assert sql("SELECT count(*) FROM attendance WHERE employee_id = ? AND check_out IS NULL", (emp,)) == [(1,)]
+
+    r = _post(client, "/attendance/check-out", {"employee_id": str(emp)})
+    _is_fragment(r, "attendance-panel")
+    assert sql("SELECT count(*) FROM attendance WHERE employee_id = ? AND check_out IS NULL", (emp,)) == [(0,)]
+
+
+def test_salary_update_returns_the_salary_card(client):
+    emp = new_employee(client)
+    r = _post(client, f"/payroll/employee/{emp}/salary", {"base_salary": "4321.5"})
+    _is_fragment(r, "payroll-salary")
+    assert "4321.5" in r.text
+
+
+def test_deletes_return_an_empty_fragment(client):
+    emp = new_employee(client)
+    r = _post(client, f"/employees/{emp}/delete")
+    assert (r.status_code, r.content, r.headers["x-fragment"]) == (200, b"", "1")
+    assert sql("SELECT count(*) FROM employees WHERE id = ?", (emp,)) == [(0,)]
+
+    dept = new_department(client)
+    r = _post(client, f"/departments/{dept}/delete")
+    assert (r.status_code, r.content, r.headers["x-fragment"]) == (200, b"", "1")
@@ -0,0 +1,94 @@
+import pytest
+
+from app.core import security
+from app.core.config import settings
+from app.core.security import login_blocked, record_login_failure, reset_login_failures
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    security._failures.clear()
+    clock = Clock()
+    monkeypatch.setattr(security.time, "monotonic", clock)
+    monkeypatch.setattr(settings, "LOGIN_MAX_FAILURES", 3)
+    monkeypatch.setattr(settings, "LOGIN_IP_FAILURE_FACTOR", 2)
+    monkeypatch.setattr(settings, "LOGIN_LOCKOUT_SECONDS", 60.0)
+    yield clock
+    security._failures.clear()
+
+
+def test_blocks_username_after_max_failures(clock):
+    for _ in range(2):
+        record_login_failure("Ali", "10.0.0.1")
+    assert not login_blocked("ali", "10.0.0.2")
+    record_login_failure("ali ", "10.0.0.1")
+    # username normalised (case / spaces), blocked from any IP
+    assert login_blocked("ALI", "10.0.0.9")
+    assert not login_blocked("bob", "10.0.0.9")
+
+
+def test_blocks_ip_across_usernames(clock):
+    for i in range(6):
+        record_login_failure(f"user{i}", "10.0.0.1")
+    assert login_blocked("someone-else", "10.0.0.1")
+    assert not login_blocked("someone-else", "10.0.0.2")
+
+
+def test_lockout_expires(clock):
+    for _ in range(3):
+        record_login_failure("ali", None)
+    assert login_blocked("ali", None)
+    clock.now += 61
+    assert not login_blocked("ali", None)
+    assert "u:ali" not in security._failures
+
+
+def test_reset_clears_username_but_not_ip(clock):
+    for i in range(6):
+        record_login_failure("ali" if i < 3 else f"x{i}", "10.0.0.1")
+    reset_login_failures("ali", "10.0.0.1")
+    assert "u:ali" not in security._failures
+    assert login_blocked("ali", "10.0.0.1")  # IP still over its limit
+    assert not login_blocked("ali", "10.0.0.2")
+
+
+def test_expired_entries_pruned_on_insert(clock):
+    for i in range(50):
+        record_login_failure(f"random{i}", None)
+    clock.now += 61
+    record_login_failure("fresh", None)
+    assert list(security._failures) == ["u:fresh"]
+
+
+def test_random_usernames_stay_bounded(clock, monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_THROTTLE_MAX_KEYS", 100)
+    for i in range(10_000):
+        record_login_failure(f"stuffing{i}", "10.0.0.1")
+    assert len(security._failures) <= 100
+    # الـ IP key بيتعمل refresh مع كل محاولة فمش بيطلع برا
+    assert login_blocked("anyone", "10.0.0.1")
+
+
+def test_idle_keys_evicted_first(clock, monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_THROTTLE_MAX_KEYS", 2)
+    record_login_failure("a", None)
+    record_login_failure("b", None)
+    record_login_failure("a", None)
+    record_login_failure("c", None)
+    assert list(security._failures) == ["u:a", "u:c"]
+
+
+def test_login_endpoint_returns_429_when_blocked(client, clock):
+    for _ in range(3):
+        r = client.post("/login", data={"username": "nobody", "password": "bad"})
+        assert r.status_code == 401
+    r = client.post("/login", data={"username": "nobody", "password": "bad"})
+    assert r.status_code == 429
@@ -0,0 +1,119 @@
+import ast
+import asyncio
+import os
+import pathlib
+import sqlite3
+import tempfile
+
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.schema import CreateIndex
+
+import app.models  # noqa: F401
+from app.db.base import Base
+from app.db.migrate import ensure_schema, load_migrations
+
+MIGRATIONS = pathlib.Path(__file__).resolve().parent.parent / "app" / "db" / "migrations"
+
+
+def _migrate(path: str) -> int:
+    async def go():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        try:
+            return await ensure_schema(engine)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(go())
+
+
+def _norm(ddl: str) -> str:
+    return " ".join(ddl.replace("IF NOT EXISTS ", "").replace("( ", "(").replace(" )", ")").split())
+
+
+def test_migrations_do_not_read_live_code():
+    for path in sorted(MIGRATIONS.glob("m*.py")):
+        for node in ast.walk(ast.parse(path.read_text())):
+            if isinstance(node, ast.Import):
+                names = [a.name for a in node.names]
+            elif isinstance(node, ast.ImportFrom):
+                names = [node.module or ""]
+            else:
+                continue
+            for name in names:
+                # app.db.migrate (helpers) مسموح؛ الـ models / core لأ
+                assert not name.startswith(("app.models", "app.core")), (path.name, name)
+
+
+def test_fresh_database_matches_models():
+    path = os.path.join(tempfile.mkdtemp(prefix="hr_migrate_"), "fresh.db")
+    assert _migrate(path) == load_migrations()[-1].version
+
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        insp = inspect(engine)
+        got_columns = {t: {(c["name"], c["nullable"]) for c in insp.get_columns(t)} for t in Base.metadata.tables}
+    finally:
+        engine.dispose()
+    assert got_columns == {t.name: {(c.name, c.nullable) for c in t.columns} for t in Base.metadata.tables.values()}
+
+    # نص الـ index نفسه (expression indexes مابتتعملهاش reflection)
+    con = sqlite3.connect(path)
+    try:
+        got_indexes = {
+            name: _norm(ddl)
+            for name, ddl in con.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")
+            if not name.startswith("ix_search_")
+        }
+        want_indexes = {
+            ix.name: _norm(str(CreateIndex(ix).compile(dialect=sqlite.dialect())))
+            for t in Base.metadata.tables.values() for ix in t.indexes
+        }
+        assert got_indexes == want_indexes
+
+        # m0008 seeded from the (empty) data; m0005/6/7/10/12 version rows
+        assert dict(con.execute("SELECT name, value FROM kpi_counters WHERE name NOT LIKE 'audit:%'")) == {
+            "employees": 0, "on_site": 0, "pending_leaves": 0, "last_payroll_net": 0,
+        }
+        assert {r[0] for r in con.execute("SELECT name FROM ref_versions")} >= {
+            "employees", "departments", "payroll", "attendance", "leaves", "audit", "users",
+        }
+    finally:
+        con.close()
+
+    # تاني مرة = fast path، مفيش حاجة تتعمل
+    assert _migrate(path) == load_migrations()[-1].version
+
+
+def test_orphans_are_cleared_for_foreign_keys():
+    from app.db.migrations import m0014_sqlite_foreign_keys
+
+    path = os.path.join(tempfile.mkdtemp(prefix="hr_migrate_"), "orphans.db")
+    _migrate(path)
+    # كانت بتحصل وforeign_keys مقفولة
+    con = sqlite3.connect(path)
+    with con:
+        con.execute("INSERT INTO departments(id, name) VALUES (1, 'Kept')")
+        con.execute("INSERT INTO employees(id, full_name, email, job_title, department_id, base_salary) VALUES (1, 'A', 'a@x', '', 1, 0)")
+        con.execute("INSERT INTO employees(id, full_name, email, job_title, department_id, base_salary) VALUES (2, 'B', 'b@x', '', 99, 0)")
+        con.execute("INSERT INTO attendance(employee_id, check_in) VALUES (1, '2026-01-01 09:00:00')")
+        con.execute("INSERT INTO attendance(employee_id, check_in) VALUES (42, '2026-01-01 09:00:00')")
+    con.close()
+
+    async def go():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        try:
+            async with engine.begin() as conn:
+                await m0014_sqlite_foreign_keys.upgrade(conn)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(go())
+    con = sqlite3.connect(path)
+    try:
+        assert con.execute("SELECT employee_id FROM attendance").fetchall() == [(1,)]
+        assert con.execute("SELECT id, department_id FROM employees ORDER BY id").fetchall() == [(1, 1), (2, None)]
+        assert con.execute("PRAGMA foreign_key_check").fetchall() == []
+    finally:
+        con.close()
@@ -0,0 +1,155 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import page_cache
+from app.core.config import settings
+from app.core.current_user import invalidate_user, load_current_user, mark_user_changed
+
+from conftest import USER, grant, logged_in, new_department, sql, user_id
+
+OTHER = ("viewer2", "viewer2-pw")
+
+_probe = iter(range(1, 10**9))
+
+
+@pytest.fixture(scope="module")
+def other_user(client):
+    client.post("/users/new", data={"username": OTHER[0], "password": OTHER[1]})
+    yield OTHER
+    grant(OTHER[0])
+    invalidate_user(user_id(OTHER[0]))
+
+
+@pytest.fixture
+def url():
+    # query param جديد لكل test = entry جديدة (الـ params جزء من الـ key)
+    return f"/departments?probe={next(_probe)}"
+
+
+def _state(client, url: str) -> str:
+    r = client.get(url, follow_redirects=False)
+    assert r.status_code == 200, r.status_code
+    return r.headers[page_cache.HEADER]
+
+
+def _set_permissions(username: str, *codes: str):
+    grant(username, *codes)
+    invalidate_user(user_id(username))
+
+
+def test_admin_hits_and_params_are_keyed(client, url):
+    assert _state(client, url) == "miss"
+    assert _state(client, url) == "hit"
+    assert _state(client, url + "&x=1") == "miss"
+    # نفس الـ params بترتيب تاني = نفس الـ key
+    assert _state(client, url + "&x=1&y=2") == "miss"
+    assert _state(client, url + "&y=2&x=1") == "hit"
+
+
+def test_same_permissions_share_an_entry(client, other_user, url):
+    _set_permissions(USER[0])
+    _set_permissions(OTHER[0])
+    with logged_in(client, *USER):
+        assert _state(client, url) == "miss"
+    with logged_in(client, *OTHER):
+        assert _state(client, url) == "hit"
+
+
+def test_admin_does_not_share_with_users(client, url):
+    with logged_in(client, *USER):
+        assert _state(client, url) == "miss"
+    assert _state(client, url) == "miss"
+
+
+def test_grant_rekeys_the_user(client, other_user, url):
+    _set_permissions(USER[0])
+    _set_permissions(OTHER[0])
+    with logged_in(client, *USER):
+        assert _state(client, url) == "miss"
+
+    _set_permissions(OTHER[0], "payroll.view")
+    try:
+        with logged_in(client, *OTHER):
+            assert _state(client, url) == "miss"
+            assert _state(client, url) == "hit"
+        # الأول لسه على الـ entry القديمة
+        with logged_in(client, *USER):
+            assert _state(client, url) == "hit"
+    finally:
+        _set_permissions(OTHER[0])
+
+
+def test_write_makes_the_entry_stale(client, url):
+    assert _state(client, url) == "miss"
+    before = page_cache.stats()["stale"]
+    name = f"Cached Dept {url.rsplit('=', 1)[1]}"
+    new_department(client, name)
+    r = client.get(url)
+    assert r.headers[page_cache.HEADER] == "miss"
+    assert name in r.text
+    assert page_cache.stats()["stale"] > before
+    assert _state(client, url) == "hit"
+
+
+def _role(name: str, *codes: str) -> int:
+    sql("INSERT OR IGNORE INTO roles(name) VALUES (?)", (name,))
+    role_id = sql("SELECT id FROM roles WHERE name = ?", (name,))[0][0]
+    for code in codes:
+        sql("INSERT OR IGNORE INTO permissions(code) VALUES (?)", (code,))
+        sql("INSERT INTO role_permissions(role_id, permission_id) SELECT ?, id FROM permissions WHERE code = ?",
+            (role_id, code))
+    return role_id
+
+
+def test_grant_is_keyed_only_after_commit(client, run):
+    from sqlalchemy import text
+    from app.db.session import AsyncSessionLocal, ReadSessionLocal
+
+    uid = user_id(USER[0])
+    _set_permissions(USER[0])
+    role_id = _role("page-cache-committed", "audit.view")
+
+    async def key():
+        async with ReadSessionLocal() as db:
+            return await page_cache.permission_key(db, await load_current_user(uid))
+
+    async def assign():
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("INSERT INTO user_roles(user_id, role_id) VALUES (:u, :r)"), {"u": uid, "r": role_id})
+            await mark_user_changed(db, uid)
+            during = await key()
+            await db.commit()
+        return during, await key()
+
+    try:
+        assert run(key) == ()
+        during, after = run(assign)
+        # الـ read قبل الـ commit لسه على الـ roles القديمة، وماتتخزنش تحت الـ version الجديدة
+        assert during == ()
+        assert after == ("audit.view",)
+    finally:
+        _set_permissions(USER[0])
+
+
+def test_permission_codes_expire(client, run, monkeypatch):
+    from app.db.session import ReadSessionLocal
+
+    uid = user_id(USER[0])
+    _set_permissions(USER[0])
+
+    async def key():
+        async with ReadSessionLocal() as db:
+            return await page_cache.permission_key(db, await load_current_user(uid))
+
+    assert run(key) == ()
+    # تعديل من برا التطبيق (من غير mark_user_changed)
+    grant(USER[0], "audit.view")
+    try:
+        assert run(key) == ()
+        later = time.monotonic() + settings.CURRENT_USER_CACHE_TTL + 1
+        monkeypatch.setattr(page_cache, "time", SimpleNamespace(monotonic=lambda: later))
+        assert run(key) == ("audit.view",)
+    finally:
+        _set_permissions(USER[0])
@@ -0,0 +1,50 @@
+import csv
+import io
+
+from app.core.provisioning import parse_csv, start_provisioning_pool
+
+from conftest import USER, logged_in, sql
+
+
+def _upload(client, text: str):
+    return client.post("/users/bulk", files={"file": ("users.csv", text.encode(), "text/csv")})
+
+
+def test_parse_csv_generates_missing_passwords():
+    rows = parse_csv("username,password,is_admin,roles\nann,pw1,yes,\nben,,0,a; b\n")
+    assert [(r.line, r.username, r.is_admin, r.roles, r.generated) for r in rows] == [
+        (2, "ann", True, [], False),
+        (3, "ben", False, ["a", "b"], True),
+    ]
+    assert rows[1].password
+
+
+def test_pool_is_long_lived_and_spawned(client):
+    pool = start_provisioning_pool()
+    assert start_provisioning_pool() is pool
+    assert pool._mp_context.get_start_method() == "spawn"
+
+
+def test_bulk_upload_creates_users_and_reports_errors(client):
+    r = _upload(client, "username,password,is_admin,roles\nprov1,secret-1,,\nprov2,,,\nprov1,x,,\nadmin,x,,\n")
+    assert r.status_code == 200
+    report = {row["username"] + ":" + row["line"]: row for row in csv.DictReader(io.StringIO(r.text))}
+
+    assert report["prov1:2"]["status"] == "created"
+    assert report["prov2:3"]["status"] == "created"
+    assert report["prov2:3"]["generated_password"]
+    assert report["prov1:4"]["error"] == "duplicate_in_file"
+    assert report["admin:5"]["error"] == "username_exists"
+    assert sql("SELECT count(*) FROM users WHERE username IN ('prov1', 'prov2')") == [(2,)]
+
+    # الـ hashes اتعملت في الـ process pool وبتتقبل في الـ login
+    with logged_in(client, "prov1", "secret-1"):
+        pass
+    with logged_in(client, "prov2", report["prov2:3"]["generated_password"]):
+        pass
+
+
+def test_bulk_upload_is_admin_only(client):
+    with logged_in(client, *USER):
+        r = _upload(client, "username,password\nsneaky,pw\n")
+    assert r.status_code in (200, 302) and not sql("SELECT 1 FROM users WHERE username = 'sneaky'")
@@ -0,0 +1,137 @@
+import json
+import sqlite3
+
+from app.queries.search import PAGE_SIZE, make_snippet, search_page_query, search_terms
+
+from conftest import USER, db_path, grant, logged_in, logged_out, new_department, new_employee, sql
+
+
+def _search(client, q: str, **params) -> dict:
+    r = client.get("/search", params={"q": q, "format": "json", **params})
+    assert r.status_code == 200
+    return r.json()
+
+
+def test_terms_drop_query_syntax():
+    assert search_terms('"ali" OR ahm* -x NEAR(a b)') == ["ali", "OR", "ahm", "x", "NEAR", "a", "b"]
+    assert search_terms("   ") == []
+    assert len(search_terms("w " * 50)) == 8
+
+
+def test_snippet_marks_prefix_matches():
+    body = " ".join(f"w{i}" for i in range(40)) + " Kayaking trip"
+    snippet = make_snippet(body, ["kayak"])
+    assert "[Kayaking]" in snippet
+    assert snippet.startswith("…")
+
+
+def test_employee_prefix_match_ranks_title_first(client):
+    dept = new_department(client)
+    named = new_employee(client, dept, full_name="Zephyrine Quillfeather", job_title="Clerk")
+    titled = new_employee(client, dept, full_name="Plain Person", job_title="Zephyrine liaison")
+
+    items = _search(client, "zephy")["items"]
+    ids = [i["ref_id"] for i in items if i["kind"] == "employee"]
+    assert ids[:2] == [named, titled]
+    assert items[0]["parent_id"] == dept
+
+    # كذا كلمة = AND
+    assert [i["ref_id"] for i in _search(client, "zephyrine quill")["items"]] == [named]
+    # operators بتتعامل ككلمات عادية، مش syntax error
+    assert _search(client, '"zephyrine" OR quill*')["items"] == []
+
+
+def test_leave_reason_is_searchable_by_employee_name(client):
+    emp = new_employee(client, full_name="Ottoline Brackwater")
+    client.post("/leaves/new", data={
+        "employee_id": str(emp), "from_date": "2026-03-01", "to_date": "2026-03-03",
+        "reason": "Kayaking trip up the fjords",
+    })
+    leave_id = sql("SELECT id FROM leave_requests WHERE employee_id = ?", (emp,))[0][0]
+
+    items = _search(client, "brackwater kayak", kind="leave")["items"]
+    assert [(i["kind"], i["ref_id"], i["parent_id"]) for i in items] == [("leave", leave_id, emp)]
+    assert "[Kayaking]" in items[0]["snippet"]
+
+    # الـ triggers: rename => title الإجازة يتغير؛ delete => الاتنين يختفوا
+    sql("UPDATE employees SET full_name = 'Ottoline Fenwick' WHERE id = ?", (emp,))
+    assert _search(client, "brackwater")["items"] == []
+    assert [i["ref_id"] for i in _search(client, "fenwick kayak", kind="leave")["items"]] == [leave_id]
+
+    client.post(f"/employees/{emp}/delete")
+    assert _search(client, "fenwick")["items"] == []
+
+
+def test_pages_follow_the_cursor_without_repeats(client):
+    n = PAGE_SIZE + 7
+    for i in range(n):
+        sql(
+            "INSERT INTO employees(full_name, email, job_title, base_salary) VALUES (?, ?, ?, 0)",
+            (f"Pager {i}", f"pager{i}@example.com", "Mariner " * (1 + i % 3)),
+        )
+
+    seen, scores, cursor = [], [], None
+    while True:
+        body = _search(client, "mariner", kind="employee", **({"cursor": cursor} if cursor else {}))
+        seen.extend(i["ref_id"] for i in body["items"])
+        scores.extend(i["score"] for i in body["items"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == n == len(set(seen))
+    assert scores == sorted(scores)
+
+
+def test_search_requires_login(client):
+    with logged_out(client):
+        r = client.get("/search", params={"q": "x"}, follow_redirects=False)
+    assert r.status_code == 302
+
+
+def test_ranks_the_whole_match_set(client, run):
+    from app.db.session import ReadSessionLocal
+
+    # أقدم match هو الأحسن (في الـ title)، وبعده أكتر من 2000 match أحدث في الـ body بس
+    best = new_employee(client, full_name="Wombatry Lead", job_title="Keeper")
+    con = sqlite3.connect(db_path())
+    with con:
+        con.executemany(
+            "INSERT INTO employees(full_name, email, job_title, base_salary) VALUES (?, ?, ?, 0)",
+            [(f"Filler {i}", f"wombat{i}@example.com", "Wombatry helper") for i in range(2100)],
+        )
+    con.close()
+
+    async def walk():
+        seen, cursor = [], None
+        async with ReadSessionLocal() as db:
+            while True:
+                hits, cursor = await search_page_query(db, "wombatry", "employee", cursor, limit=500)
+                seen.extend(h.ref_id for h in hits)
+                if not cursor:
+                    return seen
+
+    seen = run(walk)
+    assert seen[0] == best
+    assert len(seen) == len(set(seen)) == 2101
+
+
+def test_audit_hits_need_the_audit_permission(client):
+    sql(
+        "INSERT INTO audit_logs(action, entity, entity_id, meta, created_at) VALUES (?, ?, ?, ?, ?)",
+        ("payroll.salary.update", "employee", 1, json.dumps({"base_salary": 4242, "note": "Quibblesalary"}),
+         "2026-02-01 10:00:00.000000"),
+    )
+    assert [i["kind"] for i in _search(client, "quibblesalary")["items"]] == ["audit"]
+
+    grant(USER[0])
+    with logged_in(client, *USER):
+        assert _search(client, "quibblesalary")["items"] == []
+        assert _search(client, "quibblesalary", kind="audit")["items"] == []
+        assert 'value="audit"' not in client.get("/search", params={"q": "x"}).text
+
+        grant(USER[0], "audit.view")
+        try:
+            assert [i["kind"] for i in _search(client, "quibblesalary", kind="audit")["items"]] == ["audit"]
+        finally:
+            grant(USER[0])